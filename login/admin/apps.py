@@ -3,3 +3,5 @@ from django.apps import AppConfig
 
 class AdminConfig(AppConfig):
     name = 'admin'
+    # 'admin' ya es la etiqueta de django.contrib.admin
+    label = 'administracion'
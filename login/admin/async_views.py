@@ -0,0 +1,202 @@
+import json
+import logging
+import secrets
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+
+from login.eventos import HubLleno
+from usuarios.async_views import AsyncAPIView, _jwt
+from usuarios.cambios import cambios_desde, codificar_cursor_cambios, decodificar_cursor_cambios
+from usuarios.decorators import rol_obligatorio
+from usuarios.eventos import evento_usuario, hub, posiciones_actuales, publicador_feed
+from usuarios.models import Usuario
+from usuarios.paginacion import CursorInvalido
+
+logger = logging.getLogger(__name__)
+
+
+def _sse(evento, datos, id_evento=None):
+    lineas = [f'id: {id_evento}'] if id_evento is not None else []
+    lineas.append(f'event: {evento}')
+    lineas.append('data: ' + json.dumps(datos, separators=(',', ':')))
+    return '\n'.join(lineas) + '\n\n'
+
+
+def _preparar(cursor):
+    """
+    Posiciones del cursor del cliente (o las actuales si no trae) y los
+    eventos pendientes desde ahí. Retorna (posiciones, eventos, hay_mas).
+    """
+    if settings.EVENTOS_USUARIOS['BROKER'] == 'feed':
+        publicador_feed.asegurar()
+    if not cursor:
+        return posiciones_actuales(), [], False
+    usuarios, eliminados, _nuevo, hay_mas = cambios_desde(cursor, settings.EVENTOS_USUARIOS['BACKLOG'])
+    eventos = sorted(
+        (evento_usuario(fila) for fila in usuarios + eliminados), key=lambda evento: evento['seq']
+    )
+    return decodificar_cursor_cambios(cursor), eventos, hay_mas
+
+
+async def _stream(request, suscripcion, cursor, vence):
+    config = settings.EVENTOS_USUARIOS
+    try:
+        try:
+            posiciones, pendientes, hay_mas = await sync_to_async(_preparar)(cursor)
+        except CursorInvalido:
+            yield _sse('error', {'error': 'Cursor no válido'})
+            return
+
+        # Espera de EventSource antes de reconectar, en milisegundos
+        yield 'retry: 3000\n\n'
+        if hay_mas:
+            # Demasiado atrás: ponerse al día con el feed de cambios
+            yield _sse('reset', {'cursor': cursor})
+            return
+        for evento in pendientes:
+            posiciones[evento['base']] = evento['seq']
+            yield _sse('usuario', _datos(evento), codificar_cursor_cambios(posiciones))
+        # Ya entregado: los eventos en vivo hasta aquí se omiten
+        vistos = list(posiciones)
+
+        while True:
+            restante = vence - time.time()
+            if restante <= 0:
+                # El cliente vuelve a conectar con un token y un ticket nuevos
+                yield _sse('expirado', {'cursor': codificar_cursor_cambios(posiciones)})
+                return
+            evento = await suscripcion.siguiente(min(config['KEEPALIVE'], restante))
+            if suscripcion.desbordada:
+                yield _sse('reset', {'cursor': codificar_cursor_cambios(posiciones)})
+                return
+            if evento is None:
+                yield ': ping\n\n'
+                continue
+            base = evento['base']
+            if evento['seq'] <= vistos[base]:
+                continue
+            posiciones[base] = max(posiciones[base], evento['seq'])
+            yield _sse('usuario', _datos(evento), codificar_cursor_cambios(posiciones))
+    finally:
+        hub.cancelar(suscripcion)
+        logger.info(
+            "Stream de eventos cerrado: %s", request.user.username,
+            extra={'evento': 'eventos_cerrado', 'usuario': request.user.username}
+        )
+
+
+def _datos(evento):
+    return {clave: valor for clave, valor in evento.items() if clave not in ('base', 'seq')}
+
+
+def _clave_ticket(ticket):
+    return f'eventos:ticket:{ticket}'
+
+
+async def _usuario_de_ticket(ticket):
+    """
+    Consumir un ticket del stream. Retorna (usuario, vencimiento del
+    access token con que se pidió); AuthenticationFailed si no sirve.
+    """
+    clave = _clave_ticket(ticket)
+    datos = await cache.aget(clave)
+    # Solo quien lo borra lo usa: dos conexiones con el mismo ticket no abren dos streams
+    if datos is None or not await cache.adelete(clave):
+        raise AuthenticationFailed("Ticket no válido o vencido")
+    user_id, vence = datos
+    try:
+        user = await Usuario.objects.select_related('rol_usuario').aget(pk=user_id)
+    except Usuario.DoesNotExist:
+        raise AuthenticationFailed("Usuario no encontrado")
+    if not user.is_active:
+        raise AuthenticationFailed("Usuario inactivo")
+    return user, vence
+
+
+def _vencimiento(request):
+    # El token ya se validó al autenticar; aquí solo se lee su 'exp'
+    return _jwt.get_validated_token(_jwt.get_raw_token(_jwt.get_header(request)))['exp']
+
+
+class TicketEventosView(AsyncAPIView):
+    """
+    Ticket para abrir el stream de eventos.
+    POST /api/admin/eventos/ticket/ (access token en Authorization)
+
+    EventSource no envía cabeceras y la URL del stream queda en logs e
+    historial, así que en ella va este ticket y no el access token: vale
+    una sola conexión y EVENTOS_USUARIOS['TICKET_SEGUNDOS'] segundos. Se
+    guarda en CACHES, compartida, así que el stream puede abrirse en otro
+    worker.
+    """
+
+    @rol_obligatorio(roles_permitidos=["Admin"])
+    async def post(self, request):
+        ticket = secrets.token_urlsafe(32)
+        segundos = settings.EVENTOS_USUARIOS['TICKET_SEGUNDOS']
+        await cache.aset(_clave_ticket(ticket), (request.user.pk, _vencimiento(request)), segundos)
+        return JsonResponse({'ticket': ticket, 'expira_en': segundos})
+
+
+class EventosUsuariosView(AsyncAPIView):
+    """
+    Stream SSE (text/event-stream) con los cambios de usuarios en vivo.
+    GET /api/admin/eventos/?ticket=<ticket>&since=<cursor>
+
+    Cada evento 'usuario' lleva como id el cursor del feed de cambios; al
+    reconectar, EventSource lo manda en Last-Event-ID y se reenvía lo que
+    faltó. Un evento 'reset' indica que el cliente quedó atrás: ponerse al
+    día con /api/admin/usuarios/cambios/?since=<cursor> y reconectar.
+    Como EventSource no envía cabeceras, se autentica con un ticket de
+    TicketEventosView (o con Authorization, para otros clientes). El stream
+    se cierra cuando vence el access token ('expirado'); cada reconexión
+    pide un ticket nuevo.
+    """
+
+    async def autenticar(self, request):
+        ticket = request.GET.get('ticket')
+        if ticket and 'HTTP_AUTHORIZATION' not in request.META:
+            user, self.vence = await _usuario_de_ticket(ticket)
+            return user
+        user = await super().autenticar(request)
+        if user.is_authenticated:
+            self.vence = _vencimiento(request)
+        return user
+
+    @rol_obligatorio(roles_permitidos=["Admin"])
+    async def get(self, request):
+        if not isinstance(request, ASGIRequest):
+            return JsonResponse(
+                {"error": "El stream de eventos requiere el servidor ASGI"},
+                status=status.HTTP_501_NOT_IMPLEMENTED
+            )
+
+        cursor = request.headers.get('Last-Event-ID') or request.GET.get('since')
+        try:
+            # Suscribir antes de leer posiciones: nada queda entre ambas
+            suscripcion = hub.suscribir(settings.EVENTOS_USUARIOS['CAPACIDAD_CLIENTE'])
+        except HubLleno:
+            return JsonResponse(
+                {"error": "Demasiados clientes conectados"},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        logger.info(
+            "Stream de eventos abierto: %s", request.user.username,
+            extra={'evento': 'eventos_abierto', 'usuario': request.user.username}
+        )
+        response = StreamingHttpResponse(
+            _stream(request, suscripcion, cursor, self.vence),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        # Sin buffer en nginx: cada evento sale apenas se genera
+        response['X-Accel-Buffering'] = 'no'
+        return response
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.utils import timezone
+
+from login.lotes import EscritorEnLotes
+
+from .models import RegistroAuditoria
+
+# Campos de Usuario que se comparan. La contraseña solo se marca como
+# cambiada: el hash nunca se guarda en la auditoría.
+CAMPOS_AUDITADOS = [
+    'username', 'email', 'first_name', 'last_name', 'telefono',
+    'fecha_nacimiento', 'fecha_contrato', 'rol_usuario_id', 'is_active',
+]
+OCULTO = '***'
+
+
+def instantanea(usuario):
+    """Valores auditados de un usuario, para comparar antes y después."""
+    valores = {campo: getattr(usuario, campo) for campo in CAMPOS_AUDITADOS}
+    valores['password'] = usuario.password
+    return valores
+
+
+def diferencias(antes, despues):
+    """
+    {campo: [antes, después]} de los campos que cambiaron. En un alta
+    `antes` es {} y en una baja lo es `despues`.
+    """
+    cambios = {}
+    for campo in dict.fromkeys([*antes, *despues]):
+        anterior, nuevo = antes.get(campo), despues.get(campo)
+        if anterior != nuevo:
+            cambios[campo] = [OCULTO, OCULTO] if campo == 'password' else [anterior, nuevo]
+    return cambios
+
+
+_config = getattr(settings, 'AUDITORIA_BUFFER', {})
+escritor = EscritorEnLotes(
+    RegistroAuditoria,
+    tamano_lote=_config.get('TAMANO_LOTE', 200),
+    intervalo=_config.get('INTERVALO', 2.0),
+    nombre='escritor-auditoria'
+)
+
+
+def registrar_auditoria(actor, accion, objetivo_id, objetivo_username, cambios):
+    """
+    Registrar un cambio de un admin sin escribir en la base en la petición.
+    Recibe el id y el username del afectado porque tras un borrado la
+    instancia ya no tiene pk.
+    """
+    escritor.agregar(RegistroAuditoria(
+        actor_id=actor.pk,
+        actor_username=actor.username,
+        objetivo_id=objetivo_id,
+        objetivo_username=objetivo_username,
+        accion=accion,
+        cambios=cambios,
+        created=timezone.now()
+    ))
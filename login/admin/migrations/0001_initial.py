@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:25
+
+import django.core.serializers.json
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroAuditoria',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('actor_username', models.CharField(max_length=150, verbose_name='Username del actor')),
+                ('objetivo_username', models.CharField(max_length=150, verbose_name='Username afectado')),
+                ('accion', models.CharField(choices=[('crear', 'Crear'), ('actualizar', 'Actualizar'), ('actualizar_parcial', 'Actualizar parcialmente'), ('eliminar', 'Eliminar'), ('activar', 'Activar'), ('desactivar', 'Desactivar')], max_length=20, verbose_name='Acción')),
+                ('cambios', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder, verbose_name='Cambios')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Actor')),
+                ('objetivo', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Usuario afectado')),
+            ],
+            options={
+                'verbose_name': 'Registro de Auditoría',
+                'verbose_name_plural': 'Registros de Auditoría',
+                'db_table': 'auditoria_admin',
+                'indexes': [models.Index(fields=['objetivo', '-created'], name='auditoria_objetivo_idx'), models.Index(fields=['actor', '-created'], name='auditoria_actor_idx'), models.Index(fields=['-created', '-id'], name='auditoria_created_idx')],
+            },
+        ),
+    ]
@@ -1,3 +1,73 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class RegistroAuditoria(models.Model):
+    """
+    Cambio hecho por un admin sobre un usuario, con el diff por campo.
+    Tabla de solo inserción, escrita en lotes desde admin/auditoria.py.
+    Los registros sobreviven al borrado del actor o del usuario afectado:
+    las FK no tienen restricción ni cascada y el username queda copiado.
+    """
+    ACCION_CREAR = 'crear'
+    ACCION_ACTUALIZAR = 'actualizar'
+    ACCION_ACTUALIZAR_PARCIAL = 'actualizar_parcial'
+    ACCION_ELIMINAR = 'eliminar'
+    ACCION_ACTIVAR = 'activar'
+    ACCION_DESACTIVAR = 'desactivar'
+    ACCIONES = [
+        (ACCION_CREAR, 'Crear'),
+        (ACCION_ACTUALIZAR, 'Actualizar'),
+        (ACCION_ACTUALIZAR_PARCIAL, 'Actualizar parcialmente'),
+        (ACCION_ELIMINAR, 'Eliminar'),
+        (ACCION_ACTIVAR, 'Activar'),
+        (ACCION_DESACTIVAR, 'Desactivar'),
+    ]
+
+    actor = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        db_index=False,  # Cubierto por el índice compuesto
+        verbose_name="Actor"
+    )
+    actor_username = models.CharField(max_length=150, verbose_name="Username del actor")
+    objetivo = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='+',
+        db_index=False,  # Cubierto por el índice compuesto
+        verbose_name="Usuario afectado"
+    )
+    objetivo_username = models.CharField(max_length=150, verbose_name="Username afectado")
+    accion = models.CharField(max_length=20, choices=ACCIONES, verbose_name="Acción")
+    # {campo: [antes, después]}
+    cambios = models.JSONField(default=dict, encoder=DjangoJSONEncoder, verbose_name="Cambios")
+    # Se fija al registrar el cambio, no al escribir el lote
+    created = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'auditoria_admin'
+        verbose_name = "Registro de Auditoría"
+        verbose_name_plural = "Registros de Auditoría"
+        indexes = [
+            models.Index(
+                fields=['objetivo', '-created'],
+                name='auditoria_objetivo_idx'
+            ),
+            models.Index(
+                fields=['actor', '-created'],
+                name='auditoria_actor_idx'
+            ),
+            models.Index(
+                fields=['-created', '-id'],
+                name='auditoria_created_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.actor_username} {self.accion} {self.objetivo_username}"
@@ -1,3 +1,94 @@
-from django.test import TestCase
+from unittest import mock
 
-# Create your tests here.
+from rest_framework.test import APITestCase
+
+from usuarios.models import Rol, Usuario
+
+
+class EscriturasUsuarioTests(APITestCase):
+    """
+    Cada mutación de AdminUsuarioViewSet hace una sola escritura del
+    usuario, solo con los campos que cambiaron. Alrededor van la lectura
+    del usuario, las validaciones y la reserva de la secuencia de cambios
+    (UPDATE + SELECT) dentro de un savepoint (SAVEPOINT + RELEASE).
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rol_admin = Rol.objects.create(name="Admin")
+        cls.rol_estudiante = Rol.objects.create(name="Estudiante")
+        cls.admin = Usuario.objects.create_user(
+            username="admin", email="admin@test.com", password="Clave12345!",
+            rol_usuario=cls.rol_admin
+        )
+        cls.usuario = Usuario.objects.create_user(
+            username="estudiante", email="estudiante@test.com", password="Clave12345!",
+            first_name="Ana", rol_usuario=cls.rol_estudiante
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.admin)
+        self.url = f'/api/admin/usuarios/{self.usuario.pk}/'
+
+    def datos_completos(self, **cambios):
+        datos = {
+            'username': self.usuario.username, 'email': self.usuario.email,
+            'first_name': self.usuario.first_name, 'last_name': self.usuario.last_name,
+            'rol_id': self.rol_estudiante.pk, 'is_active': True,
+        }
+        datos.update(cambios)
+        return datos
+
+    def test_crear_con_password_un_insert(self):
+        datos = {
+            'username': 'nuevo', 'email': 'nuevo@test.com', 'password': 'OtraClave123!',
+            'rol_id': self.rol_estudiante.pk,
+        }
+        # Rol, validación de rol y de username, savepoint con secuencia e INSERT
+        with self.assertNumQueries(8):
+            response = self.client.post('/api/admin/usuarios/', datos, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Usuario.objects.get(username='nuevo').check_password('OtraClave123!'))
+
+    def test_actualizar_un_update(self):
+        # Usuario, username único, rol, savepoint con secuencia y UPDATE
+        with self.assertNumQueries(8):
+            response = self.client.put(self.url, self.datos_completos(first_name="Ana María"), format='json')
+        self.assertEqual(response.status_code, 200)
+        self.usuario.refresh_from_db()
+        self.assertEqual(self.usuario.first_name, "Ana María")
+
+    def test_actualizar_sin_cambios_no_escribe(self):
+        # Solo lecturas: usuario, username único y rol; nada que auditar
+        with self.assertNumQueries(3), mock.patch('admin.views.registrar_auditoria') as auditoria:
+            response = self.client.put(self.url, self.datos_completos(), format='json')
+        self.assertEqual(response.status_code, 200)
+        auditoria.assert_not_called()
+
+    def test_patch_un_update(self):
+        with self.assertNumQueries(6):
+            response = self.client.patch(self.url, {'last_name': 'Pérez'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.usuario.refresh_from_db()
+        self.assertEqual(self.usuario.last_name, 'Pérez')
+
+    def test_patch_password_un_update(self):
+        with self.assertNumQueries(6):
+            response = self.client.patch(self.url, {'password': 'NuevaClave123!'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.usuario.refresh_from_db()
+        self.assertTrue(self.usuario.check_password('NuevaClave123!'))
+
+    def test_patch_sin_cambios_no_escribe(self):
+        # Solo la lectura del usuario; nada que auditar
+        with self.assertNumQueries(1), mock.patch('admin.views.registrar_auditoria') as auditoria:
+            response = self.client.patch(self.url, {'first_name': 'Ana'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        auditoria.assert_not_called()
+
+    def test_toggle_activo_un_update(self):
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url + 'toggle-activo/')
+        self.assertEqual(response.status_code, 200)
+        self.usuario.refresh_from_db()
+        self.assertFalse(self.usuario.is_active)
@@ -1,10 +1,14 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import AdminUsuarioViewSet
+from .async_views import EventosUsuariosView, TicketEventosView
+from .views import AdminUsuarioViewSet, AuditoriaView
 
 router = DefaultRouter()
 router.register(r'usuarios', AdminUsuarioViewSet, basename='admin-usuarios')
 
 urlpatterns = [
+    path('auditoria/', AuditoriaView.as_view(), name='admin-auditoria'),
+    path('eventos/', EventosUsuariosView.as_view(), name='admin-eventos'),
+    path('eventos/ticket/', TicketEventosView.as_view(), name='admin-eventos-ticket'),
     path('', include(router.urls)),
 ]
\ No newline at end of file
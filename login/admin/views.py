@@ -2,16 +2,32 @@ from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.views import APIView
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
 from django.db.models import Q
+from usuarios.cambios import cambios_desde
 from usuarios.decorators import rol_obligatorio
+from usuarios.depuracion import depurador
+from usuarios.paginacion import CursorInvalido, leer_limite, paginar_por_cursor, paginar_por_cursor_varios
 from usuarios.serializers import UsuarioSerializer
 from usuarios.models import Rol
+from .auditoria import diferencias, instantanea, registrar_auditoria
+from .models import RegistroAuditoria
 import logging
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
+
+def _con_password(request):
+    """{'password': hash} si la petición trae contraseña, para guardarla con el resto."""
+    password = request.data.get('password')
+    return {'password': make_password(password)} if password else {}
+
+
 class AdminUsuarioViewSet(viewsets.ViewSet):
     """
     ViewSet para administración completa de usuarios.
@@ -50,15 +66,51 @@ class AdminUsuarioViewSet(viewsets.ViewSet):
         if activo.lower() in ['true', 'false']:
             is_active = activo.lower() == 'true'
             queryset = queryset.filter(is_active=is_active)
+
+        if settings.USUARIOS_SHARDS:
+            return self.listar_shards(request, queryset)
         
         serializer = UsuarioSerializer(queryset, many=True)
         
-        logger.info(f"Admin {request.user.username} listó usuarios")
+        logger.info(
+            "Admin %s listó usuarios", request.user.username,
+            extra={'evento': 'listado_usuarios', 'usuario': request.user.username}
+        )
         return Response({
             'count': queryset.count(),
             'results': serializer.data
         })
 
+    def listar_shards(self, request, queryset):
+        """
+        Listado con sharding: no hay una tabla única que ordenar, así que
+        cada shard entrega su página por cursor (date_joined, id) y se
+        mezclan. GET /api/admin/usuarios/?cursor=...&limit=...
+        """
+        querysets = [queryset.using(alias) for alias in settings.USUARIOS_SHARDS_ALIAS]
+        try:
+            usuarios, siguiente = paginar_por_cursor_varios(
+                querysets,
+                cursor=request.query_params.get('cursor'),
+                limite=leer_limite(request.query_params.get('limit')),
+                campo='date_joined'
+            )
+        except CursorInvalido:
+            return Response(
+                {'error': 'Cursor no válido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        logger.info(
+            "Admin %s listó usuarios", request.user.username,
+            extra={'evento': 'listado_usuarios', 'usuario': request.user.username}
+        )
+        return Response({
+            'count': sum(qs.count() for qs in querysets),
+            'results': UsuarioSerializer(usuarios, many=True).data,
+            'next': siguiente
+        })
+
     @rol_obligatorio(roles_permitidos=["Admin"])
     def create(self, request):
         """
@@ -84,15 +136,17 @@ class AdminUsuarioViewSet(viewsets.ViewSet):
         # Crear usuario
         serializer = UsuarioSerializer(data=request.data)
         if serializer.is_valid():
-            user = serializer.save()
-            
-            # Establecer contraseña
-            password = request.data.get('password')
-            if password:
-                user.set_password(password)
-                user.save()
+            # La contraseña va hasheada en el mismo INSERT
+            user = serializer.save(**_con_password(request))
             
-            logger.info(f"Admin {request.user.username} creó usuario: {user.username}")
+            registrar_auditoria(
+                request.user, RegistroAuditoria.ACCION_CREAR, user.pk, user.username,
+                diferencias({}, instantanea(user))
+            )
+            logger.info(
+                "Admin %s creó usuario: %s", request.user.username, user.username,
+                extra={'evento': 'usuario_creado', 'usuario': request.user.username}
+            )
             return Response(
                 UsuarioSerializer(user).data,
                 status=status.HTTP_201_CREATED
@@ -128,19 +182,24 @@ class AdminUsuarioViewSet(viewsets.ViewSet):
             # Verificar que no se está intentando modificar el propio admin
             if user.id == request.user.id and request.data.get('rol_id'):
                 # Permitir cambios pero con precaución
-                logger.warning(f"Admin {request.user.username} se está modificando a sí mismo")
+                logger.warning("Admin %s se está modificando a sí mismo", request.user.username)
             
+            antes = instantanea(user)
             serializer = UsuarioSerializer(user, data=request.data)
             if serializer.is_valid():
-                serializer.save()
+                # Un UPDATE con los campos que cambiaron, contraseña incluida
+                serializer.save(**_con_password(request))
                 
-                # Actualizar contraseña si se proporciona
-                password = request.data.get('password')
-                if password:
-                    user.set_password(password)
-                    user.save()
-                
-                logger.info(f"Admin {request.user.username} actualizó usuario: {user.username}")
+                # Sin cambios no hay nada que auditar
+                if serializer.campos_cambiados:
+                    registrar_auditoria(
+                        request.user, RegistroAuditoria.ACCION_ACTUALIZAR, user.pk, user.username,
+                        diferencias(antes, instantanea(user))
+                    )
+                    logger.info(
+                        "Admin %s actualizó usuario: %s", request.user.username, user.username,
+                        extra={'evento': 'usuario_actualizado', 'usuario': request.user.username}
+                    )
                 return Response(serializer.data)
             
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -160,17 +219,22 @@ class AdminUsuarioViewSet(viewsets.ViewSet):
         try:
             user = self.get_queryset().get(pk=pk)
             
+            antes = instantanea(user)
             serializer = UsuarioSerializer(user, data=request.data, partial=True)
             if serializer.is_valid():
-                serializer.save()
-                
-                # Actualizar contraseña si se proporciona
-                password = request.data.get('password')
-                if password:
-                    user.set_password(password)
-                    user.save()
+                # Un UPDATE con los campos que cambiaron, contraseña incluida
+                serializer.save(**_con_password(request))
                 
-                logger.info(f"Admin {request.user.username} actualizó parcialmente usuario: {user.username}")
+                # Sin cambios no hay nada que auditar
+                if serializer.campos_cambiados:
+                    registrar_auditoria(
+                        request.user, RegistroAuditoria.ACCION_ACTUALIZAR_PARCIAL, user.pk, user.username,
+                        diferencias(antes, instantanea(user))
+                    )
+                    logger.info(
+                        "Admin %s actualizó parcialmente usuario: %s", request.user.username, user.username,
+                        extra={'evento': 'usuario_actualizado', 'usuario': request.user.username}
+                    )
                 return Response(serializer.data)
             
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -186,6 +250,8 @@ class AdminUsuarioViewSet(viewsets.ViewSet):
         """
         Eliminar usuario.
         DELETE /api/admin/usuarios/{id}/
+        Con BAJAS_USUARIOS['LOGICA'] es una baja lógica: el usuario
+        desaparece al instante y sus datos se borran en segundo plano.
         """
         try:
             user = self.get_queryset().get(pk=pk)
@@ -197,10 +263,23 @@ class AdminUsuarioViewSet(viewsets.ViewSet):
                     status=status.HTTP_400_BAD_REQUEST
                 )
             
-            username = user.username
-            user.delete()
+            user_id, username = user.pk, user.username
+            antes = instantanea(user)
+            if settings.BAJAS_USUARIOS['LOGICA']:
+                # Un UPDATE; tokens y demás datos se borran en segundo plano
+                User.objects.dar_de_baja(user)
+                transaction.on_commit(depurador.despertar)
+            else:
+                user.delete()
             
-            logger.info(f"Admin {request.user.username} eliminó usuario: {username}")
+            registrar_auditoria(
+                request.user, RegistroAuditoria.ACCION_ELIMINAR, user_id, username,
+                diferencias(antes, {})
+            )
+            logger.info(
+                "Admin %s eliminó usuario: %s", request.user.username, username,
+                extra={'evento': 'usuario_eliminado', 'usuario': request.user.username}
+            )
             return Response(status=status.HTTP_204_NO_CONTENT)
             
         except User.DoesNotExist:
@@ -227,10 +306,19 @@ class AdminUsuarioViewSet(viewsets.ViewSet):
                 )
             
             user.is_active = not user.is_active
-            user.save()
+            user.save(update_fields=['is_active'])
             
+            registrar_auditoria(
+                request.user,
+                RegistroAuditoria.ACCION_ACTIVAR if user.is_active else RegistroAuditoria.ACCION_DESACTIVAR,
+                user.pk, user.username,
+                {'is_active': [not user.is_active, user.is_active]}
+            )
             estado = 'activado' if user.is_active else 'desactivado'
-            logger.info(f"Admin {request.user.username} {estado} usuario: {user.username}")
+            logger.info(
+                "Admin %s %s usuario: %s", request.user.username, estado, user.username,
+                extra={'evento': 'usuario_activo', 'usuario': request.user.username}
+            )
             
             return Response({
                 'is_active': user.is_active,
@@ -243,6 +331,34 @@ class AdminUsuarioViewSet(viewsets.ViewSet):
                 status=status.HTTP_404_NOT_FOUND
             )
 
+    @action(detail=False, methods=['get'], url_path='cambios')
+    @rol_obligatorio(roles_permitidos=["Admin"])
+    def cambios(self, request):
+        """
+        Usuarios creados, modificados o eliminados desde un cursor, para
+        mantener una copia local sin volver a descargar el listado.
+        GET /api/admin/usuarios/cambios/?since=<cursor>&limit=...
+        Sin since entrega todo desde el principio; repetir con el cursor
+        recibido mientras hay_mas sea true.
+        """
+        try:
+            usuarios, eliminados, cursor, hay_mas = cambios_desde(
+                request.query_params.get('since'),
+                leer_limite(request.query_params.get('limit'), por_defecto=100, maximo=1000)
+            )
+        except CursorInvalido:
+            return Response(
+                {'error': 'Cursor no válido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'cambios': UsuarioSerializer(usuarios, many=True).data,
+            'eliminados': [eliminado.usuario_id for eliminado in eliminados],
+            'cursor': cursor,
+            'hay_mas': hay_mas
+        })
+
     @action(detail=False, methods=['get'], url_path='roles')
     @rol_obligatorio(roles_permitidos=["Admin"])
     def list_roles(self, request):
@@ -251,4 +367,59 @@ class AdminUsuarioViewSet(viewsets.ViewSet):
         GET /api/admin/usuarios/roles/
         """
         roles = Rol.objects.all().values('id', 'name', 'descripcion')
-        return Response(list(roles))
\ No newline at end of file
+        return Response(list(roles))
+
+
+class AuditoriaView(APIView):
+    """
+    Cambios hechos por admins, más reciente primero.
+    GET /api/admin/auditoria/?objetivo=<id>&actor=<id>&accion=...&cursor=...&limit=20
+    Los filtros por objetivo y actor usan sus índices (campo, -created).
+    """
+    permission_classes = [IsAuthenticated]
+
+    @rol_obligatorio(roles_permitidos=["Admin"])
+    def get(self, request):
+        queryset = RegistroAuditoria.objects.all()
+        try:
+            for filtro in ('objetivo', 'actor'):
+                valor = request.query_params.get(filtro)
+                if valor:
+                    queryset = queryset.filter(**{f'{filtro}_id': int(valor)})
+        except ValueError:
+            return Response(
+                {'error': 'Filtro no válido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        accion = request.query_params.get('accion')
+        if accion:
+            queryset = queryset.filter(accion=accion)
+
+        try:
+            registros, siguiente = paginar_por_cursor(
+                queryset,
+                cursor=request.query_params.get('cursor'),
+                limite=leer_limite(request.query_params.get('limit'))
+            )
+        except CursorInvalido:
+            return Response(
+                {'error': 'Cursor no válido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'results': [
+                {
+                    'id': registro.id,
+                    'actor_id': registro.actor_id,
+                    'actor_username': registro.actor_username,
+                    'objetivo_id': registro.objetivo_id,
+                    'objetivo_username': registro.objetivo_username,
+                    'accion': registro.accion,
+                    'cambios': registro.cambios,
+                    'created': registro.created
+                }
+                for registro in registros
+            ],
+            'next': siguiente
+        })
@@ -0,0 +1,25 @@
+from django.http import JsonResponse
+from rest_framework import status
+from usuarios.async_views import AsyncAPIView
+from usuarios.decorators import rol_obligatorio
+from .views import datos_dashboard, estadisticas_empresa, ofertas_recientes
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmpresaDashboardAsyncView(AsyncAPIView):
+    """
+    Versión async de EmpresaDashboardView.
+    """
+
+    @rol_obligatorio(roles_permitidos=["Empresa", "Admin"])
+    async def get(self, request):
+        estadisticas = await estadisticas_empresa(request.user).afirst()
+        ofertas = [oferta async for oferta in ofertas_recientes(request.user)]
+        data = datos_dashboard(request.user, estadisticas, ofertas)
+        logger.info(
+            "Acceso a dashboard empresa: %s", request.user.username,
+            extra={'evento': 'dashboard', 'usuario': request.user.username}
+        )
+        return JsonResponse(data, status=status.HTTP_200_OK)
@@ -0,0 +1,191 @@
+import logging
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Count
+from django.utils import timezone
+
+from empresas.models import EstadisticasEmpresa, Oferta, Postulacion
+from login.lotes import detener_escritores
+from usuarios.models import Rol, Usuario
+from usuarios.paginacion import paginar_por_cursor
+
+LOTE = 50_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de ofertas/postulaciones sobre una base temporal: "
+        "contadores denormalizados vs COUNT(*) y cursor vs OFFSET."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--empresas', type=int, default=1_000)
+        parser.add_argument('--estudiantes', type=int, default=100_000)
+        parser.add_argument('--ofertas', type=int, default=100_000)
+        parser.add_argument('--postulaciones', type=int, default=10_000_000)
+        parser.add_argument('--repeticiones', type=int, default=200)
+        parser.add_argument('--semilla', type=int, default=42)
+
+    def handle(self, *args, **options):
+        random.seed(options['semilla'])
+        # Nunca se toca la base configurada: se usa la base de pruebas
+        # (TEST.NAME en settings, en memoria por defecto para SQLite)
+        nombre_original = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        logging.disable(logging.WARNING)
+        try:
+            self.sembrar(options)
+            self.medir(options)
+        finally:
+            logging.disable(logging.NOTSET)
+            # Lo que quede en los escritores en lotes iría a la base ya borrada
+            detener_escritores(escribir=False)
+            connection.creation.destroy_test_db(nombre_original, verbosity=0)
+
+    # Carga de datos
+
+    def sembrar(self, options):
+        inicio = time.perf_counter()
+        rol_empresa = Rol.objects.create(name="Empresa")
+        rol_estudiante = Rol.objects.create(name="Estudiante")
+
+        Usuario.objects.bulk_create(
+            (Usuario(username=f"empresa{i}", password="!", rol_usuario=rol_empresa)
+             for i in range(options['empresas'])),
+            batch_size=LOTE
+        )
+        Usuario.objects.bulk_create(
+            (Usuario(username=f"estudiante{i}", password="!", rol_usuario=rol_estudiante)
+             for i in range(options['estudiantes'])),
+            batch_size=LOTE
+        )
+        self.empresas = list(
+            Usuario.objects.filter(rol_usuario=rol_empresa).values_list('id', flat=True)
+        )
+        estudiantes = list(
+            Usuario.objects.filter(rol_usuario=rol_estudiante).values_list('id', flat=True)
+        )
+
+        Oferta.objects.bulk_create(
+            (Oferta(empresa_id=random.choice(self.empresas), titulo=f"Oferta {i}",
+                    estado=Oferta.ESTADO_ACTIVA if random.random() < 0.8 else Oferta.ESTADO_CERRADA)
+             for i in range(options['ofertas'])),
+            batch_size=LOTE
+        )
+        ofertas = list(Oferta.objects.values_list('id', flat=True))
+
+        # Las postulaciones se insertan con executemany: construir millones
+        # de instancias del modelo dominaría el tiempo de carga
+        tabla = Postulacion._meta.db_table
+        sql = (
+            f"INSERT INTO {tabla} (oferta_id, estudiante_id, estado, created) "
+            f"VALUES (%s, %s, %s, %s)"
+        )
+        por_oferta, resto = divmod(options['postulaciones'], len(ofertas))
+        ahora = timezone.now()
+        lote = []
+        with connection.cursor() as cursor:
+            for indice, oferta_id in enumerate(ofertas):
+                cantidad = por_oferta + (1 if indice < resto else 0)
+                desplazamiento = random.randrange(len(estudiantes))
+                for j in range(min(cantidad, len(estudiantes))):
+                    estudiante_id = estudiantes[(desplazamiento + j) % len(estudiantes)]
+                    lote.append((oferta_id, estudiante_id, Postulacion.ESTADO_PENDIENTE, ahora))
+                if len(lote) >= LOTE:
+                    cursor.executemany(sql, lote)
+                    lote = []
+            if lote:
+                cursor.executemany(sql, lote)
+
+        # Inicializar los contadores una sola vez a partir de los datos cargados
+        conteos = Postulacion.objects.values('oferta_id').annotate(total=Count('id'))
+        for fila in conteos.iterator(chunk_size=LOTE):
+            Oferta.objects.filter(pk=fila['oferta_id']).update(postulaciones_count=fila['total'])
+        EstadisticasEmpresa.objects.bulk_create(
+            EstadisticasEmpresa(
+                empresa_id=empresa_id,
+                ofertas_activas=Oferta.objects.filter(
+                    empresa_id=empresa_id, estado=Oferta.ESTADO_ACTIVA
+                ).count(),
+                postulaciones_recibidas=Postulacion.objects.filter(
+                    oferta__empresa_id=empresa_id
+                ).count(),
+            )
+            for empresa_id in self.empresas
+        )
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        self.stdout.write(
+            f"Carga: {options['empresas']} empresas, {len(ofertas)} ofertas, "
+            f"{Postulacion.objects.count()} postulaciones "
+            f"en {time.perf_counter() - inicio:.1f}s"
+        )
+
+    # Mediciones
+
+    def medir(self, options):
+        repeticiones = options['repeticiones']
+        muestras = [random.choice(self.empresas) for _ in range(repeticiones)]
+
+        self.reportar("dashboard: contadores", muestras, lambda empresa_id: (
+            EstadisticasEmpresa.objects.filter(empresa_id=empresa_id).values(
+                'ofertas_activas', 'postulaciones_recibidas'
+            ).first()
+        ))
+        self.reportar("dashboard: COUNT(*)", muestras, lambda empresa_id: (
+            Oferta.objects.filter(empresa_id=empresa_id, estado=Oferta.ESTADO_ACTIVA).count(),
+            Postulacion.objects.filter(oferta__empresa_id=empresa_id).count(),
+        ))
+
+        def ultima_pagina_cursor(empresa_id):
+            queryset = Oferta.objects.filter(empresa_id=empresa_id, estado=Oferta.ESTADO_ACTIVA)
+            elementos, siguiente = paginar_por_cursor(queryset, limite=20)
+            while siguiente:
+                elementos, siguiente = paginar_por_cursor(queryset, siguiente, limite=20)
+            return elementos
+
+        self.reportar("listado: primera página (cursor)", muestras, lambda empresa_id: (
+            paginar_por_cursor(
+                Oferta.objects.filter(empresa_id=empresa_id, estado=Oferta.ESTADO_ACTIVA),
+                limite=20
+            )
+        ))
+        self.reportar("listado: recorrido completo (cursor)", muestras, ultima_pagina_cursor)
+        self.reportar("listado: página profunda (OFFSET 60)", muestras, lambda empresa_id: (
+            list(Oferta.objects.filter(
+                empresa_id=empresa_id, estado=Oferta.ESTADO_ACTIVA
+            ).order_by('-created', '-id')[60:80])
+        ))
+
+        # Postulaciones nuevas: cada estudiante de prueba postula una vez
+        rol_estudiante = Rol.objects.get(name="Estudiante")
+        nuevos = Usuario.objects.bulk_create(
+            Usuario(username=f"bench{i}", password="!", rol_usuario=rol_estudiante)
+            for i in range(repeticiones)
+        )
+        ofertas_activas = list(
+            Oferta.objects.filter(estado=Oferta.ESTADO_ACTIVA)
+            .only('id', 'empresa_id')[:repeticiones]
+        )
+        pares = list(zip(ofertas_activas, nuevos))
+        self.reportar("postular (F() + insert)", pares, lambda par: (
+            Postulacion.objects.postular(*par)
+        ))
+
+    def reportar(self, nombre, muestras, funcion):
+        tiempos = []
+        for muestra in muestras:
+            inicio = time.perf_counter()
+            funcion(muestra)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        tiempos.sort()
+        p95 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]
+        self.stdout.write(
+            f"{nombre:40} media={statistics.mean(tiempos):8.3f}ms "
+            f"p95={p95:8.3f}ms"
+        )
@@ -0,0 +1,74 @@
+# Generated by Django 6.0.2 on 2026-10-19 17:41
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('usuarios', '0002_alter_usuario_rol_usuario'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstadisticasEmpresa',
+            fields=[
+                ('empresa', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estadisticas_empresa', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Empresa')),
+                ('ofertas_activas', models.PositiveIntegerField(default=0)),
+                ('postulaciones_recibidas', models.PositiveIntegerField(default=0)),
+                ('entrevistas_pendientes', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Estadísticas de Empresa',
+                'verbose_name_plural': 'Estadísticas de Empresas',
+                'db_table': 'estadisticas_empresa',
+            },
+        ),
+        migrations.CreateModel(
+            name='Oferta',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('titulo', models.CharField(max_length=200, verbose_name='Título')),
+                ('descripcion', models.TextField(blank=True, verbose_name='Descripción')),
+                ('estado', models.CharField(choices=[('activa', 'Activa'), ('cerrada', 'Cerrada')], default='activa', max_length=20, verbose_name='Estado')),
+                ('postulaciones_count', models.PositiveIntegerField(default=0)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('empresa', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ofertas', to=settings.AUTH_USER_MODEL, verbose_name='Empresa')),
+            ],
+            options={
+                'verbose_name': 'Oferta',
+                'verbose_name_plural': 'Ofertas',
+                'db_table': 'ofertas',
+                'ordering': ['-created', '-id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Postulacion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('estado', models.CharField(choices=[('pendiente', 'Pendiente'), ('entrevista', 'Entrevista'), ('rechazada', 'Rechazada')], default='pendiente', max_length=20, verbose_name='Estado')),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('estudiante', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postulaciones', to=settings.AUTH_USER_MODEL, verbose_name='Estudiante')),
+                ('oferta', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postulaciones', to='empresas.oferta', verbose_name='Oferta')),
+            ],
+            options={
+                'verbose_name': 'Postulación',
+                'verbose_name_plural': 'Postulaciones',
+                'db_table': 'postulaciones',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='oferta',
+            index=models.Index(fields=['empresa', 'estado', 'created'], name='ofertas_emp_est_created_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='postulacion',
+            constraint=models.UniqueConstraint(fields=('oferta', 'estudiante'), name='postulacion_unica_por_oferta'),
+        ),
+    ]
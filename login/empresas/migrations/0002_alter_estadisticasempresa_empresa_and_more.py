@@ -0,0 +1,31 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:05
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('empresas', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='estadisticasempresa',
+            name='empresa',
+            field=models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estadisticas_empresa', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Empresa'),
+        ),
+        migrations.AlterField(
+            model_name='oferta',
+            name='empresa',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='ofertas', to=settings.AUTH_USER_MODEL, verbose_name='Empresa'),
+        ),
+        migrations.AlterField(
+            model_name='postulacion',
+            name='estudiante',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.CASCADE, related_name='postulaciones', to=settings.AUTH_USER_MODEL, verbose_name='Estudiante'),
+        ),
+    ]
@@ -1,3 +1,250 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import Count, F, Q
 
-# Create your models here.
+
+class EstadisticasEmpresa(models.Model):
+    """
+    Contadores denormalizados por empresa.
+    Se actualizan con expresiones F() en la misma transacción que la
+    escritura que los modifica, así el dashboard lee una sola fila
+    en vez de ejecutar COUNT(*) sobre ofertas y postulaciones.
+    """
+    empresa = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_constraint=False,  # Con sharding el usuario vive en otra base
+        primary_key=True,
+        related_name='estadisticas_empresa',
+        verbose_name="Empresa"
+    )
+    ofertas_activas = models.PositiveIntegerField(default=0)
+    postulaciones_recibidas = models.PositiveIntegerField(default=0)
+    entrevistas_pendientes = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'estadisticas_empresa'
+        verbose_name = "Estadísticas de Empresa"
+        verbose_name_plural = "Estadísticas de Empresas"
+
+    def __str__(self):
+        return f"Estadísticas de {self.empresa_id}"
+
+
+class OfertaManager(models.Manager):
+
+    @transaction.atomic
+    def publicar(self, empresa, **datos):
+        """Crear una oferta activa y sumar el contador de la empresa."""
+        oferta = self.create(empresa=empresa, estado=Oferta.ESTADO_ACTIVA, **datos)
+        EstadisticasEmpresa.objects.get_or_create(empresa=empresa)
+        EstadisticasEmpresa.objects.filter(empresa=empresa).update(
+            ofertas_activas=F('ofertas_activas') + 1
+        )
+        return oferta
+
+    @transaction.atomic
+    def cerrar(self, oferta):
+        """Cerrar una oferta activa y descontarla del contador de la empresa."""
+        cerradas = self.filter(pk=oferta.pk, estado=Oferta.ESTADO_ACTIVA).update(
+            estado=Oferta.ESTADO_CERRADA
+        )
+        if cerradas:
+            EstadisticasEmpresa.objects.filter(empresa_id=oferta.empresa_id).update(
+                ofertas_activas=F('ofertas_activas') - 1
+            )
+            oferta.estado = Oferta.ESTADO_CERRADA
+        return bool(cerradas)
+
+    def borrar_en_lote(self, ids):
+        """
+        Borrar las ofertas `ids` (y en cascada sus postulaciones) descontando
+        las activas del contador de su empresa en la misma transacción.
+        Retorna las filas borradas.
+        """
+        with transaction.atomic(using=self.db):
+            activas = (
+                self.filter(pk__in=ids, estado=Oferta.ESTADO_ACTIVA)
+                .values('empresa_id').annotate(total=Count('pk'))
+            )
+            for fila in activas:
+                EstadisticasEmpresa.objects.db_manager(self.db).filter(empresa_id=fila['empresa_id']).update(
+                    ofertas_activas=F('ofertas_activas') - fila['total']
+                )
+            return self.filter(pk__in=ids).delete()[0]
+
+
+class Oferta(models.Model):
+    """
+    Oferta laboral publicada por un usuario con rol Empresa.
+    """
+    ESTADO_ACTIVA = 'activa'
+    ESTADO_CERRADA = 'cerrada'
+    ESTADOS = [
+        (ESTADO_ACTIVA, 'Activa'),
+        (ESTADO_CERRADA, 'Cerrada'),
+    ]
+
+    empresa = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_constraint=False,  # Con sharding el usuario vive en otra base
+        related_name='ofertas',
+        verbose_name="Empresa"
+    )
+    titulo = models.CharField(max_length=200, verbose_name="Título")
+    descripcion = models.TextField(blank=True, verbose_name="Descripción")
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADOS,
+        default=ESTADO_ACTIVA,
+        verbose_name="Estado"
+    )
+    # Contador denormalizado: se incrementa con F() al postular
+    postulaciones_count = models.PositiveIntegerField(default=0)
+    created = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    objects = OfertaManager()
+
+    class Meta:
+        db_table = 'ofertas'
+        verbose_name = "Oferta"
+        verbose_name_plural = "Ofertas"
+        ordering = ['-created', '-id']
+        indexes = [
+            # Soporta el listado paginado por cursor de una empresa:
+            # WHERE empresa = ? AND estado = ? ORDER BY created DESC, id DESC
+            models.Index(
+                fields=['empresa', 'estado', 'created'],
+                name='ofertas_emp_est_created_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return self.titulo
+
+
+class PostulacionManager(models.Manager):
+
+    @transaction.atomic
+    def postular(self, oferta, estudiante):
+        """
+        Registrar la postulación de un estudiante.
+        El UPDATE condicional sobre la oferta toma el bloqueo de escritura y
+        verifica que siga activa; los contadores se incrementan con F() en la
+        misma transacción, sin leer ni contar filas.
+        Retorna None si la oferta ya no está activa.
+        """
+        actualizadas = Oferta.objects.filter(
+            pk=oferta.pk, estado=Oferta.ESTADO_ACTIVA
+        ).update(postulaciones_count=F('postulaciones_count') + 1)
+        if not actualizadas:
+            return None
+
+        postulacion = self.create(oferta=oferta, estudiante=estudiante)
+        EstadisticasEmpresa.objects.filter(empresa_id=oferta.empresa_id).update(
+            postulaciones_recibidas=F('postulaciones_recibidas') + 1
+        )
+        return postulacion
+
+    @transaction.atomic
+    def cambiar_estado(self, postulacion, estado):
+        """
+        Cambiar el estado con un UPDATE condicional sobre el estado leído y
+        ajustar con F() las entrevistas pendientes de la empresa al entrar
+        o salir de 'entrevista'. `postulacion` debe traer su oferta.
+        Retorna False si otra petición la cambió antes.
+        """
+        anterior = postulacion.estado
+        if estado == anterior:
+            return True
+        if not self.filter(pk=postulacion.pk, estado=anterior).update(estado=estado):
+            return False
+
+        diferencia = (estado == Postulacion.ESTADO_ENTREVISTA) - (anterior == Postulacion.ESTADO_ENTREVISTA)
+        if diferencia:
+            EstadisticasEmpresa.objects.filter(empresa_id=postulacion.oferta.empresa_id).update(
+                entrevistas_pendientes=F('entrevistas_pendientes') + diferencia
+            )
+        postulacion.estado = estado
+        return True
+
+    def borrar_en_lote(self, ids):
+        """
+        Borrar las postulaciones `ids` descontando en la misma transacción
+        lo que sumaron postular y cambiar_estado: postulaciones de cada
+        oferta, recibidas y entrevistas pendientes de cada empresa.
+        Retorna las filas borradas.
+        """
+        with transaction.atomic(using=self.db):
+            por_oferta = (
+                self.filter(pk__in=ids)
+                .values('oferta_id', 'oferta__empresa_id')
+                .annotate(
+                    total=Count('pk'),
+                    entrevistas=Count('pk', filter=Q(estado=Postulacion.ESTADO_ENTREVISTA)),
+                )
+            )
+            for fila in por_oferta:
+                Oferta.objects.db_manager(self.db).filter(pk=fila['oferta_id']).update(
+                    postulaciones_count=F('postulaciones_count') - fila['total']
+                )
+                EstadisticasEmpresa.objects.db_manager(self.db).filter(
+                    empresa_id=fila['oferta__empresa_id']
+                ).update(
+                    postulaciones_recibidas=F('postulaciones_recibidas') - fila['total'],
+                    entrevistas_pendientes=F('entrevistas_pendientes') - fila['entrevistas'],
+                )
+            return self.filter(pk__in=ids).delete()[0]
+
+
+class Postulacion(models.Model):
+    """
+    Postulación de un estudiante a una oferta.
+    """
+    ESTADO_PENDIENTE = 'pendiente'
+    ESTADO_ENTREVISTA = 'entrevista'
+    ESTADO_RECHAZADA = 'rechazada'
+    ESTADOS = [
+        (ESTADO_PENDIENTE, 'Pendiente'),
+        (ESTADO_ENTREVISTA, 'Entrevista'),
+        (ESTADO_RECHAZADA, 'Rechazada'),
+    ]
+
+    oferta = models.ForeignKey(
+        Oferta,
+        on_delete=models.CASCADE,
+        related_name='postulaciones',
+        verbose_name="Oferta"
+    )
+    estudiante = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_constraint=False,  # Con sharding el usuario vive en otra base
+        related_name='postulaciones',
+        verbose_name="Estudiante"
+    )
+    estado = models.CharField(
+        max_length=20,
+        choices=ESTADOS,
+        default=ESTADO_PENDIENTE,
+        verbose_name="Estado"
+    )
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = PostulacionManager()
+
+    class Meta:
+        db_table = 'postulaciones'
+        verbose_name = "Postulación"
+        verbose_name_plural = "Postulaciones"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['oferta', 'estudiante'],
+                name='postulacion_unica_por_oferta'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.estudiante_id} -> {self.oferta_id}"
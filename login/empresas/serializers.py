@@ -0,0 +1,27 @@
+from rest_framework import serializers
+from login.metrics import SerializacionMedida
+from .models import Oferta, Postulacion
+
+
+class OfertaSerializer(SerializacionMedida, serializers.ModelSerializer):
+    """
+    Serializador para ofertas de empresa.
+    El contador de postulaciones es de solo lectura: lo mantiene el modelo.
+    """
+    class Meta:
+        model = Oferta
+        fields = [
+            'id', 'titulo', 'descripcion', 'estado',
+            'postulaciones_count', 'created'
+        ]
+        read_only_fields = ['id', 'estado', 'postulaciones_count', 'created']
+
+
+class PostulacionSerializer(SerializacionMedida, serializers.ModelSerializer):
+    """
+    Serializador básico para postulaciones
+    """
+    class Meta:
+        model = Postulacion
+        fields = ['id', 'oferta', 'estudiante', 'estado', 'created']
+        read_only_fields = fields
@@ -1,9 +1,19 @@
+from django.conf import settings
 from django.urls import path
-from .views import EmpresaDashboardView, OfertasEmpresaView
+from .views import (
+    EmpresaDashboardView, OfertasEmpresaView, CerrarOfertaView, PostularOfertaView,
+    EstadoPostulacionView
+)
+
+if settings.API_ASYNC:
+    from .async_views import EmpresaDashboardAsyncView as EmpresaDashboardView
 
 app_name = 'empresas'
 
 urlpatterns = [
     path('dashboard/', EmpresaDashboardView.as_view(), name='dashboard'),
     path('ofertas/', OfertasEmpresaView.as_view(), name='ofertas'),
+    path('ofertas/<int:pk>/cerrar/', CerrarOfertaView.as_view(), name='cerrar_oferta'),
+    path('ofertas/<int:pk>/postular/', PostularOfertaView.as_view(), name='postular'),
+    path('postulaciones/<int:pk>/estado/', EstadoPostulacionView.as_view(), name='estado_postulacion'),
 ]
\ No newline at end of file
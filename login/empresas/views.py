@@ -1,42 +1,84 @@
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.db import IntegrityError
 from usuarios.decorators import rol_obligatorio
+from usuarios.paginacion import CursorInvalido, leer_limite, paginar_por_cursor
+from estudiantes.actividad import registrar_actividad
+from estudiantes.models import Actividad
+from .models import EstadisticasEmpresa, Oferta, Postulacion
+from .serializers import OfertaSerializer, PostulacionSerializer
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+ESTADISTICAS_VACIAS = {
+    "ofertas_activas": 0,
+    "postulaciones_recibidas": 0,
+    "entrevistas_pendientes": 0
+}
+
+
+def estadisticas_empresa(usuario):
+    """Queryset de los contadores denormalizados de la empresa (una fila)."""
+    return EstadisticasEmpresa.objects.filter(empresa=usuario).values(
+        'ofertas_activas', 'postulaciones_recibidas', 'entrevistas_pendientes'
+    )
+
+
+def ofertas_recientes(usuario):
+    """Queryset de las últimas ofertas activas (usa el índice de ofertas)."""
+    return Oferta.objects.filter(
+        empresa=usuario,
+        estado=Oferta.ESTADO_ACTIVA
+    ).order_by('-created', '-id').values('id', 'titulo', 'postulaciones_count')[:5]
+
+
+def datos_dashboard(usuario, estadisticas, ofertas):
+    """Cuerpo del dashboard, compartido por la vista síncrona y la async."""
+    return {
+        "mensaje": "Bienvenido al dashboard de empresa",
+        "usuario": {
+            "username": usuario.username,
+            "nombre": f"{usuario.first_name} {usuario.last_name}",
+            "email": usuario.email,
+            "rol": usuario.rol_usuario.name
+        },
+        "estadisticas": estadisticas or ESTADISTICAS_VACIAS,
+        "ofertas_recientes": [
+            {
+                "id": oferta['id'],
+                "titulo": oferta['titulo'],
+                "postulaciones": oferta['postulaciones_count']
+            }
+            for oferta in ofertas
+        ]
+    }
+
+
 class EmpresaDashboardView(APIView):
     """
-    Vista de ejemplo para el dashboard de empresas.
+    Vista para el dashboard de empresas.
     Solo accesible para usuarios con rol 'Empresa' o 'Admin'.
     """
-    
+
     @rol_obligatorio(roles_permitidos=["Empresa", "Admin"])
     def get(self, request):
         """
         Retorna información básica del dashboard de la empresa.
+        Las estadísticas salen de los contadores denormalizados
+        (una fila), no de COUNT(*) sobre ofertas y postulaciones.
         """
-        data = {
-            "mensaje": "Bienvenido al dashboard de empresa",
-            "usuario": {
-                "username": request.user.username,
-                "nombre": f"{request.user.first_name} {request.user.last_name}",
-                "email": request.user.email,
-                "rol": request.user.rol_usuario.name
-            },
-            "estadisticas": {
-                "ofertas_activas": 5,
-                "postulaciones_recibidas": 23,
-                "entrevistas_pendientes": 4
-            },
-            "ofertas_recientes": [
-                {"titulo": "Desarrollador Django", "postulaciones": 8},
-                {"titulo": "Frontend React", "postulaciones": 12}
-            ]
-        }
-        logger.info(f"Acceso a dashboard empresa: {request.user.username}")
+        data = datos_dashboard(
+            request.user,
+            estadisticas_empresa(request.user).first(),
+            ofertas_recientes(request.user)
+        )
+        logger.info(
+            "Acceso a dashboard empresa: %s", request.user.username,
+            extra={'evento': 'dashboard', 'usuario': request.user.username}
+        )
         return Response(data, status=status.HTTP_200_OK)
 
 
@@ -44,23 +86,171 @@ class OfertasEmpresaView(APIView):
     """
     Vista para gestionar ofertas de la empresa.
     """
-    
+
     @rol_obligatorio(roles_permitidos=["Empresa", "Admin"])
     def get(self, request):
-        """Listar ofertas"""
-        # Simulación de datos
-        ofertas = [
-            {"id": 1, "titulo": "Desarrollador Django", "estado": "activa"},
-            {"id": 2, "titulo": "Frontend React", "estado": "activa"},
-            {"id": 3, "titulo": "DevOps", "estado": "cerrada"}
-        ]
-        return Response(ofertas, status=status.HTTP_200_OK)
-    
+        """
+        Listar ofertas de la empresa paginadas por cursor.
+        GET /api/empresas/ofertas/?estado=activa&cursor=...&limit=20
+        Un Admin puede consultar otra empresa con ?empresa=<id>.
+        """
+        estado = request.query_params.get('estado', Oferta.ESTADO_ACTIVA)
+        if estado not in dict(Oferta.ESTADOS):
+            return Response(
+                {"error": "Estado no válido"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        empresa_id = request.user.id
+        if request.user.rol_usuario.name == "Admin" and request.query_params.get('empresa'):
+            try:
+                empresa_id = int(request.query_params.get('empresa'))
+            except ValueError:
+                return Response(
+                    {"error": "Empresa no válida"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        queryset = Oferta.objects.filter(empresa_id=empresa_id, estado=estado)
+        try:
+            ofertas, siguiente = paginar_por_cursor(
+                queryset,
+                cursor=request.query_params.get('cursor'),
+                limite=leer_limite(request.query_params.get('limit'))
+            )
+        except CursorInvalido:
+            return Response(
+                {"error": "Cursor no válido"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            "results": OfertaSerializer(ofertas, many=True).data,
+            "next": siguiente
+        }, status=status.HTTP_200_OK)
+
     @rol_obligatorio(roles_permitidos=["Empresa", "Admin"])
     def post(self, request):
         """Crear nueva oferta"""
-        # Aquí iría la lógica para crear oferta
+        serializer = OfertaSerializer(data=request.data)
+        if serializer.is_valid():
+            oferta = Oferta.objects.publicar(request.user, **serializer.validated_data)
+            logger.info(
+                "Oferta creada por %s: %s", request.user.username, oferta.titulo,
+                extra={'evento': 'oferta_creada', 'usuario': request.user.username}
+            )
+            return Response(
+                OfertaSerializer(oferta).data,
+                status=status.HTTP_201_CREATED
+            )
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CerrarOfertaView(APIView):
+    """
+    Vista para cerrar una oferta propia.
+    POST /api/empresas/ofertas/{id}/cerrar/
+    """
+
+    @rol_obligatorio(roles_permitidos=["Empresa", "Admin"])
+    def post(self, request, pk):
+        try:
+            oferta = Oferta.objects.get(pk=pk, empresa=request.user)
+        except Oferta.DoesNotExist:
+            return Response(
+                {"error": "Oferta no encontrada"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if not Oferta.objects.cerrar(oferta):
+            return Response(
+                {"error": "La oferta ya está cerrada"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        logger.info(
+            "Oferta %s cerrada por %s", oferta.pk, request.user.username,
+            extra={'evento': 'oferta_cerrada', 'usuario': request.user.username}
+        )
+        return Response(OfertaSerializer(oferta).data, status=status.HTTP_200_OK)
+
+
+class PostularOfertaView(APIView):
+    """
+    Vista para que un estudiante postule a una oferta.
+    POST /api/empresas/ofertas/{id}/postular/
+    """
+
+    @rol_obligatorio(roles_permitidos=["Estudiante"])
+    def post(self, request, pk):
+        try:
+            oferta = Oferta.objects.only('id', 'empresa_id', 'titulo').get(pk=pk)
+        except Oferta.DoesNotExist:
+            return Response(
+                {"error": "Oferta no encontrada"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        try:
+            postulacion = Postulacion.objects.postular(oferta, request.user)
+        except IntegrityError:
+            return Response(
+                {"error": "Ya postulaste a esta oferta"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if postulacion is None:
+            return Response(
+                {"error": "La oferta no está activa"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        registrar_actividad(
+            request.user, Actividad.TIPO_POSTULACION, f"Postuló a {oferta.titulo}"
+        )
+        logger.info(
+            "Postulación de %s a oferta %s", request.user.username, oferta.pk,
+            extra={'evento': 'postulacion', 'usuario': request.user.username}
+        )
         return Response(
-            {"mensaje": "Oferta creada exitosamente"},
+            PostulacionSerializer(postulacion).data,
             status=status.HTTP_201_CREATED
-        )
\ No newline at end of file
+        )
+
+
+class EstadoPostulacionView(APIView):
+    """
+    Vista para que la empresa cambie el estado de una postulación a sus ofertas.
+    POST /api/empresas/postulaciones/{id}/estado/ {"estado": "entrevista"}
+    """
+
+    @rol_obligatorio(roles_permitidos=["Empresa", "Admin"])
+    def post(self, request, pk):
+        estado = request.data.get('estado')
+        if estado not in dict(Postulacion.ESTADOS):
+            return Response(
+                {"error": "Estado no válido"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            postulacion = Postulacion.objects.select_related('oferta').get(
+                pk=pk, oferta__empresa=request.user
+            )
+        except Postulacion.DoesNotExist:
+            return Response(
+                {"error": "Postulación no encontrada"},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        if not Postulacion.objects.cambiar_estado(postulacion, estado):
+            return Response(
+                {"error": "La postulación cambió mientras tanto, reintenta"},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        logger.info(
+            "Postulación %s en estado %s por %s", postulacion.pk, estado, request.user.username,
+            extra={'evento': 'postulacion_estado', 'usuario': request.user.username}
+        )
+        return Response(PostulacionSerializer(postulacion).data, status=status.HTTP_200_OK)
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.utils import timezone
+
+from login.lotes import EscritorEnLotes
+
+from .models import Actividad
+
+
+class EscritorActividad(EscritorEnLotes):
+    """
+    Acumula eventos de actividad en memoria y los escribe en lotes.
+    La vista que registra un evento solo agrega un objeto a una lista;
+    el INSERT lo hace un hilo en segundo plano con bulk_create.
+    """
+
+    def __init__(self, tamano_lote=200, intervalo=2.0):
+        super().__init__(Actividad, tamano_lote, intervalo, nombre='escritor-actividad')
+
+    def registrar(self, usuario, tipo, descripcion):
+        self.agregar(Actividad(
+            usuario_id=getattr(usuario, 'pk', usuario),
+            tipo=tipo,
+            descripcion=descripcion[:255],
+            created=timezone.now()
+        ))
+
+
+_config = getattr(settings, 'ACTIVIDAD_BUFFER', {})
+escritor = EscritorActividad(
+    tamano_lote=_config.get('TAMANO_LOTE', 200),
+    intervalo=_config.get('INTERVALO', 2.0)
+)
+
+
+def registrar_actividad(usuario, tipo, descripcion):
+    """Registrar un evento de actividad sin escribir en la base en la petición."""
+    escritor.registrar(usuario, tipo, descripcion)
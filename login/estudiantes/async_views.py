@@ -0,0 +1,24 @@
+from django.http import JsonResponse
+from rest_framework import status
+from usuarios.async_views import AsyncAPIView
+from usuarios.decorators import rol_obligatorio
+from .views import actividad_reciente, datos_dashboard
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EstudianteDashboardAsyncView(AsyncAPIView):
+    """
+    Versión async de EstudianteDashboardView.
+    """
+
+    @rol_obligatorio(roles_permitidos=["Estudiante", "Admin"])
+    async def get(self, request):
+        eventos = [evento async for evento in actividad_reciente(request.user)]
+        data = datos_dashboard(request.user, eventos)
+        logger.info(
+            "Acceso a dashboard estudiante: %s", request.user.username,
+            extra={'evento': 'dashboard', 'usuario': request.user.username}
+        )
+        return JsonResponse(data, status=status.HTTP_200_OK)
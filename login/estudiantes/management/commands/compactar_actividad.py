@@ -0,0 +1,85 @@
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from estudiantes.models import Actividad, ResumenActividadDiario
+
+
+class Command(BaseCommand):
+    help = (
+        "Agrupa los eventos de actividad más antiguos que el período de "
+        "retención en resúmenes diarios y elimina los eventos originales."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dias', type=int, default=settings.ACTIVIDAD_RETENCION_DIAS,
+            help="Días de eventos a conservar sin compactar"
+        )
+        parser.add_argument(
+            '--lote', type=int, default=5_000,
+            help="Cantidad máxima de eventos eliminados por sentencia"
+        )
+
+    def handle(self, *args, **options):
+        # El corte se alinea a medianoche para que cada día se compacte
+        # una sola vez y completo
+        hoy = timezone.localdate()
+        limite = timezone.make_aware(
+            datetime.combine(hoy - timedelta(days=options['dias']), time.min)
+        )
+        antiguos = Actividad.objects.filter(created__lt=limite)
+
+        primero = antiguos.order_by('created').values_list('created', flat=True).first()
+        if primero is None:
+            self.stdout.write("No hay eventos para compactar.")
+            return
+
+        total_eventos = 0
+        dia = timezone.localtime(primero).date()
+        while dia < limite.date():
+            desde = timezone.make_aware(datetime.combine(dia, time.min))
+            hasta = desde + timedelta(days=1)
+            total_eventos += self.compactar_dia(desde, hasta, options['lote'])
+            dia += timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Compactados {total_eventos} eventos anteriores a {limite.date()}."
+        ))
+
+    @transaction.atomic
+    def compactar_dia(self, desde, hasta, lote):
+        eventos = Actividad.objects.filter(created__gte=desde, created__lt=hasta)
+        grupos = (
+            eventos.annotate(fecha=TruncDate('created'))
+            .values('usuario_id', 'fecha', 'tipo')
+            .annotate(total=Count('id'))
+        )
+
+        # Si el día ya tenía resúmenes (eventos escritos tarde), se suman
+        existentes = set(
+            ResumenActividadDiario.objects.filter(fecha=desde.date())
+            .values_list('usuario_id', 'tipo')
+        )
+        nuevos = []
+        for grupo in grupos:
+            if (grupo['usuario_id'], grupo['tipo']) in existentes:
+                ResumenActividadDiario.objects.filter(
+                    usuario_id=grupo['usuario_id'], fecha=grupo['fecha'], tipo=grupo['tipo']
+                ).update(total=F('total') + grupo['total'])
+            else:
+                nuevos.append(ResumenActividadDiario(**grupo))
+        ResumenActividadDiario.objects.bulk_create(nuevos, batch_size=lote)
+
+        # Eliminar por lotes de ids acota el tamaño de cada DELETE
+        eliminados = 0
+        while True:
+            ids = list(eventos.values_list('id', flat=True)[:lote])
+            if not ids:
+                return eliminados
+            eliminados += Actividad.objects.filter(id__in=ids).delete()[0]
@@ -0,0 +1,50 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:02
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Actividad',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('tipo', models.CharField(choices=[('postulacion', 'Postulación'), ('perfil', 'Perfil')], max_length=30, verbose_name='Tipo')),
+                ('descripcion', models.CharField(max_length=255, verbose_name='Descripción')),
+                ('created', models.DateTimeField(default=django.utils.timezone.now)),
+                ('usuario', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='actividades', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Actividad',
+                'verbose_name_plural': 'Actividades',
+                'db_table': 'actividad_estudiantes',
+                'indexes': [models.Index(fields=['usuario', '-created'], name='actividad_usuario_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ResumenActividadDiario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha', models.DateField(verbose_name='Fecha')),
+                ('tipo', models.CharField(max_length=30, verbose_name='Tipo')),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('usuario', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='resumenes_actividad', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Resumen de Actividad',
+                'verbose_name_plural': 'Resúmenes de Actividad',
+                'db_table': 'actividad_resumen_diario',
+                'constraints': [models.UniqueConstraint(fields=('usuario', 'fecha', 'tipo'), name='resumen_actividad_unico')],
+            },
+        ),
+    ]
@@ -1,3 +1,78 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
-# Create your models here.
+
+class Actividad(models.Model):
+    """
+    Registro de actividad de un estudiante.
+    La tabla es de solo inserción: los eventos nunca se modifican, se
+    escriben en lotes desde EscritorActividad y se leen por cursor
+    usando el índice (usuario, created DESC).
+    """
+    TIPO_POSTULACION = 'postulacion'
+    TIPO_PERFIL = 'perfil'
+    TIPOS = [
+        (TIPO_POSTULACION, 'Postulación'),
+        (TIPO_PERFIL, 'Perfil'),
+    ]
+
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_constraint=False,  # Con sharding el usuario vive en otra base
+        related_name='actividades',
+        db_index=False,  # Cubierto por el índice compuesto
+        verbose_name="Usuario"
+    )
+    tipo = models.CharField(max_length=30, choices=TIPOS, verbose_name="Tipo")
+    descripcion = models.CharField(max_length=255, verbose_name="Descripción")
+    # Se fija al registrar el evento, no al escribir el lote
+    created = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'actividad_estudiantes'
+        verbose_name = "Actividad"
+        verbose_name_plural = "Actividades"
+        indexes = [
+            models.Index(
+                fields=['usuario', '-created'],
+                name='actividad_usuario_created_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} {self.tipo}: {self.descripcion}"
+
+
+class ResumenActividadDiario(models.Model):
+    """
+    Resumen diario de eventos ya compactados.
+    Lo genera el comando compactar_actividad a partir de los eventos
+    más antiguos que el período de retención.
+    """
+    usuario = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        db_constraint=False,  # Con sharding el usuario vive en otra base
+        related_name='resumenes_actividad',
+        db_index=False,  # Cubierto por la restricción única
+        verbose_name="Usuario"
+    )
+    fecha = models.DateField(verbose_name="Fecha")
+    tipo = models.CharField(max_length=30, verbose_name="Tipo")
+    total = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = 'actividad_resumen_diario'
+        verbose_name = "Resumen de Actividad"
+        verbose_name_plural = "Resúmenes de Actividad"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['usuario', 'fecha', 'tipo'],
+                name='resumen_actividad_unico'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} {self.fecha} {self.tipo}: {self.total}"
@@ -1,3 +1,32 @@
-from django.test import TestCase
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from usuarios.models import Rol, Usuario
+
+
+class PerfilEstudianteTests(APITestCase):
+    """PATCH /api/estudiantes/perfil/ escribe solo los campos que cambiaron."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.rol = Rol.objects.create(name="Estudiante")
+        Usuario.objects.create_user(
+            username="estudiante", email="estudiante@test.com", password="Clave12345!",
+            first_name="Ana", rol_usuario=cls.rol
+        )
+
+    def setUp(self):
+        self.usuario = Usuario.objects.select_related('rol_usuario').get(username="estudiante")
+        self.client.force_authenticate(user=self.usuario)
+
+    def test_patch_un_update(self):
+        # Savepoint con la secuencia de cambios (UPDATE + SELECT) y el UPDATE
+        with self.assertNumQueries(5):
+            response = self.client.patch('/api/estudiantes/perfil/', {'telefono': '555-1234'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.usuario.refresh_from_db()
+        self.assertEqual(self.usuario.telefono, '555-1234')
+
+    def test_patch_sin_cambios_no_escribe(self):
+        with self.assertNumQueries(0):
+            response = self.client.patch('/api/estudiantes/perfil/', {'first_name': 'Ana'}, format='json')
+        self.assertEqual(response.status_code, 200)
@@ -1,9 +1,14 @@
+from django.conf import settings
 from django.urls import path
-from .views import EstudianteDashboardView, PerfilEstudianteView
+from .views import EstudianteDashboardView, PerfilEstudianteView, ActividadEstudianteView
+
+if settings.API_ASYNC:
+    from .async_views import EstudianteDashboardAsyncView as EstudianteDashboardView
 
 app_name = 'estudiantes'
 
 urlpatterns = [
     path('dashboard/', EstudianteDashboardView.as_view(), name='dashboard'),
     path('perfil/', PerfilEstudianteView.as_view(), name='perfil'),
+    path('actividad/', ActividadEstudianteView.as_view(), name='actividad'),
 ]
\ No newline at end of file
@@ -4,14 +4,49 @@ from rest_framework import status
 from usuarios.decorators import rol_obligatorio
 from usuarios.models import Usuario
 from usuarios.serializers import UsuarioSerializer
+from usuarios.paginacion import CursorInvalido, leer_limite, paginar_por_cursor
+from .actividad import registrar_actividad
+from .models import Actividad
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def actividad_reciente(usuario):
+    """Queryset con los últimos eventos del usuario (usa el índice de actividad)."""
+    return Actividad.objects.filter(
+        usuario=usuario
+    ).order_by('-created', '-id').values('created', 'descripcion')[:5]
+
+
+def datos_dashboard(usuario, eventos):
+    """Cuerpo del dashboard, compartido por la vista síncrona y la async."""
+    return {
+        "mensaje": "Bienvenido al dashboard de estudiante",
+        "usuario": {
+            "username": usuario.username,
+            "nombre": f"{usuario.first_name} {usuario.last_name}",
+            "email": usuario.email,
+            "rol": usuario.rol_usuario.name
+        },
+        "estadisticas": {
+            "cursos_inscritos": 3,
+            "tareas_pendientes": 2,
+            "promedio_notas": 4.5
+        },
+        "actividad_reciente": [
+            {
+                "fecha": evento['created'].date().isoformat(),
+                "descripcion": evento['descripcion']
+            }
+            for evento in eventos
+        ]
+    }
+
+
 class EstudianteDashboardView(APIView):
     """
-    Vista de ejemplo para el dashboard de estudiantes.
+    Vista para el dashboard de estudiantes.
     Solo accesible para usuarios con rol 'Estudiante' o 'Admin'.
     """
     
@@ -20,25 +55,11 @@ class EstudianteDashboardView(APIView):
         """
         Retorna información básica del dashboard del estudiante.
         """
-        data = {
-            "mensaje": "Bienvenido al dashboard de estudiante",
-            "usuario": {
-                "username": request.user.username,
-                "nombre": f"{request.user.first_name} {request.user.last_name}",
-                "email": request.user.email,
-                "rol": request.user.rol_usuario.name
-            },
-            "estadisticas": {
-                "cursos_inscritos": 3,
-                "tareas_pendientes": 2,
-                "promedio_notas": 4.5
-            },
-            "actividad_reciente": [
-                {"fecha": "2025-02-18", "descripcion": "Inscrito en Matemáticas"},
-                {"fecha": "2025-02-17", "descripcion": "Entregó tarea de Física"}
-            ]
-        }
-        logger.info(f"Acceso a dashboard estudiante: {request.user.username}")
+        data = datos_dashboard(request.user, actividad_reciente(request.user))
+        logger.info(
+            "Acceso a dashboard estudiante: %s", request.user.username,
+            extra={'evento': 'dashboard', 'usuario': request.user.username}
+        )
         return Response(data, status=status.HTTP_200_OK)
 
 
@@ -62,7 +83,48 @@ class PerfilEstudianteView(APIView):
             partial=True
         )
         if serializer.is_valid():
+            # Solo escribe los campos que cambiaron; un PATCH sin cambios no escribe
             serializer.save()
-            logger.info(f"Perfil actualizado: {request.user.username}")
+            if serializer.campos_cambiados:
+                registrar_actividad(request.user, Actividad.TIPO_PERFIL, "Actualizó su perfil")
+                logger.info(
+                    "Perfil actualizado: %s", request.user.username,
+                    extra={'evento': 'perfil_actualizado', 'usuario': request.user.username}
+                )
             return Response(serializer.data, status=status.HTTP_200_OK)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class ActividadEstudianteView(APIView):
+    """
+    Vista para leer la actividad del estudiante, más reciente primero.
+    GET /api/estudiantes/actividad/?cursor=...&limit=20
+    """
+
+    @rol_obligatorio(roles_permitidos=["Estudiante", "Admin"])
+    def get(self, request):
+        queryset = Actividad.objects.filter(usuario=request.user)
+        try:
+            eventos, siguiente = paginar_por_cursor(
+                queryset,
+                cursor=request.query_params.get('cursor'),
+                limite=leer_limite(request.query_params.get('limit'))
+            )
+        except CursorInvalido:
+            return Response(
+                {"error": "Cursor no válido"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            "results": [
+                {
+                    "id": evento.id,
+                    "tipo": evento.tipo,
+                    "descripcion": evento.descripcion,
+                    "created": evento.created
+                }
+                for evento in eventos
+            ],
+            "next": siguiente
+        }, status=status.HTTP_200_OK)
\ No newline at end of file
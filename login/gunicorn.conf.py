@@ -0,0 +1,21 @@
+# gunicorn -c gunicorn.conf.py login.wsgi
+#
+# Con preload, login/wsgi.py (y su calentamiento) se ejecuta una vez en el
+# master; los workers nacen con las URLs, serializadores y JWT ya cargados.
+import multiprocessing
+
+bind = '0.0.0.0:8000'
+workers = multiprocessing.cpu_count() * 2 + 1
+preload_app = True
+
+
+def pre_fork(server, worker):
+    # Un socket o archivo de base abierto no se comparte entre procesos
+    from django.db import connections
+    connections.close_all()
+
+
+def post_worker_init(worker):
+    # Cada worker abre sus conexiones antes de aceptar peticiones
+    from login.arranque import abrir_conexiones
+    abrir_conexiones()
@@ -0,0 +1,130 @@
+"""
+Calentamiento de workers (settings.CALENTAR_AL_ARRANCAR).
+
+Las primeras peticiones de un worker nuevo pagan la compilación de las
+URLs, la construcción de los campos de los serializadores, la carga de
+las clases por defecto de DRF y simplejwt, el primer hasher y la primera
+conexión a la base. calentar() recorre esos caminos antes de aceptar
+tráfico: desde wsgi.py/asgi.py en cada worker, o una sola vez en el
+master con gunicorn --preload (ver gunicorn.conf.py).
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.db import connections
+from django.urls import URLResolver, get_resolver
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SERIALIZADORES = [
+    'usuarios.serializers.RolSerializer',
+    'usuarios.serializers.UsuarioSerializer',
+    'usuarios.serializers.LoginSerializer',
+    'usuarios.serializers.TokenResponseSerializer',
+    'usuarios.serializers.RefreshTokenSerializer',
+    'empresas.serializers.OfertaSerializer',
+    'empresas.serializers.PostulacionSerializer',
+]
+
+# Duración de cada paso del último calentamiento, en segundos
+INFORME = {}
+
+
+def _urls():
+    def recorrer(patrones):
+        for patron in patrones:
+            patron.pattern.regex
+            if isinstance(patron, URLResolver):
+                patron.reverse_dict
+                recorrer(patron.url_patterns)
+
+    resolver = get_resolver()
+    resolver.reverse_dict
+    recorrer(resolver.url_patterns)
+
+
+def _drf():
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.settings import api_settings
+    from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+    for nombre in (
+        'DEFAULT_RENDERER_CLASSES', 'DEFAULT_PARSER_CLASSES',
+        'DEFAULT_AUTHENTICATION_CLASSES', 'DEFAULT_PERMISSION_CLASSES',
+        'DEFAULT_THROTTLE_CLASSES', 'DEFAULT_CONTENT_NEGOTIATION_CLASS',
+        'DEFAULT_METADATA_CLASS', 'DEFAULT_VERSIONING_CLASS', 'EXCEPTION_HANDLER',
+    ):
+        getattr(api_settings, nombre)
+    for nombre in ('AUTH_TOKEN_CLASSES', 'TOKEN_USER_CLASS', 'TOKEN_OBTAIN_SERIALIZER',
+                   'TOKEN_REFRESH_SERIALIZER', 'USER_AUTHENTICATION_RULE'):
+        getattr(jwt_settings, nombre)
+    JSONRenderer().render({'calentamiento': True})
+
+
+def _jwt():
+    from usuarios.claves_jwt import backend
+
+    # Firma y verificación reales: cargan las claves y los algoritmos de PyJWT
+    backend.decode(backend.encode({'calentamiento': True}))
+
+
+def _serializadores():
+    for ruta in SERIALIZADORES:
+        serializador = import_string(ruta)
+        serializador().fields
+        # Validar datos vacíos carga los mensajes de error sin tocar la base
+        serializador(data={}).is_valid()
+
+
+def _hasher():
+    from django.contrib.auth.hashers import get_hasher
+
+    get_hasher('default')
+
+
+def abrir_conexiones():
+    """Conecta a cada base y compila una consulta del ORM."""
+    from usuarios.models import Rol
+
+    for alias in connections:
+        connections[alias].ensure_connection()
+    Rol.objects.exists()
+
+
+PASOS = [
+    ('urls', _urls),
+    ('drf', _drf),
+    ('jwt', _jwt),
+    ('serializadores', _serializadores),
+    ('hasher', _hasher),
+    ('base_de_datos', abrir_conexiones),
+]
+
+
+def calentar(conexiones=True):
+    """
+    Ejecuta los pasos de calentamiento y registra cuánto tardó cada uno.
+    Un paso que falla se informa pero no impide el arranque. Con
+    conexiones=False las conexiones se cierran al terminar (antes de un
+    fork, o cuando las peticiones las abrirán en otros hilos).
+    """
+    if not settings.CALENTAR_AL_ARRANCAR:
+        return INFORME
+
+    inicio = time.perf_counter()
+    for nombre, paso in PASOS:
+        inicio_paso = time.perf_counter()
+        try:
+            paso()
+        except Exception as e:
+            logger.warning("Calentamiento: falló el paso %s: %s", nombre, e)
+        INFORME[nombre] = time.perf_counter() - inicio_paso
+    if not conexiones:
+        connections.close_all()
+
+    total = time.perf_counter() - inicio
+    detalle = ', '.join(f'{nombre} {segundos * 1000:.1f}' for nombre, segundos in INFORME.items())
+    logger.info("Worker calentado en %.1f ms (%s)", total * 1000, detalle)
+    return INFORME
@@ -14,3 +14,14 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'login.settings')
 
 application = get_asgi_application()
+
+# /healthz y /readyz se responden sin pasar por Django
+from .salud import SondasASGI
+
+application = SondasASGI(application)
+
+# Las vistas síncronas usan la base desde el hilo de sync_to_async: las
+# conexiones abiertas aquí no les servirían
+from .arranque import calentar
+
+calentar(conexiones=False)
@@ -0,0 +1,168 @@
+"""
+Varias peticiones GET de la API en un solo viaje (POST /api/batch/).
+
+    {"peticiones": [{"url": "/api/auth/me/"}, {"url": "/api/admin/usuarios/?rol=Admin"}],
+     "paralelo": true}
+
+    {"respuestas": [{"url": "/api/auth/me/", "status": 200, "body": {...}}, ...]}
+
+Solo se admiten URLs bajo /api/. El batch se autentica una vez: cada
+subpetición se resuelve con el resolver de URLs y llega a su vista con el
+mismo usuario ya autenticado, sin volver a pasar por los middlewares. Solo se admiten GET, así que con
+"paralelo" se ejecutan en hilos (settings.BATCH['HILOS']). Las respuestas
+vuelven en el orden de las peticiones, cada una con su status.
+"""
+import contextvars
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from inspect import iscoroutine
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import close_old_connections
+from django.http import Http404, HttpRequest, QueryDict
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+PREFIJO_API = '/api/'
+
+_pool = None
+
+
+def _pool_batch():
+    global _pool
+    if _pool is None:
+        _pool = ThreadPoolExecutor(max_workers=settings.BATCH['HILOS'], thread_name_prefix='batch')
+    return _pool
+
+
+def _subpeticion(request, url):
+    """HttpRequest GET para `url` con las cabeceras y el usuario del batch."""
+    partes = urlsplit(url)
+    sub = HttpRequest()
+    sub.method = 'GET'
+    sub.path = sub.path_info = partes.path
+    sub.GET = QueryDict(partes.query)
+    sub.COOKIES = request.COOKIES
+    sub.META = {
+        clave: valor for clave, valor in request.META.items()
+        if clave not in ('CONTENT_LENGTH', 'CONTENT_TYPE', 'wsgi.input')
+    }
+    sub.META.update(REQUEST_METHOD='GET', PATH_INFO=partes.path, QUERY_STRING=partes.query)
+    # DRF usa este usuario en vez de volver a autenticar (como force_authenticate)
+    sub.user = request.user
+    sub._force_auth_user = request.user
+    sub._force_auth_token = request.auth
+    return sub
+
+
+async def _esperar(corutina):
+    return await corutina
+
+
+def _cuerpo(response):
+    if hasattr(response, 'data'):
+        return response.data
+    if hasattr(response, 'render') and not response.is_rendered:
+        # TemplateResponse (u otra SimpleTemplateResponse) sin renderizar
+        response.render()
+    if response.get('Content-Type', '').startswith('application/json'):
+        return json.loads(response.content)
+    return response.content.decode(response.charset)
+
+
+def _ejecutar(request, url):
+    try:
+        match = resolve(urlsplit(url).path)
+    except Resolver404:
+        return status.HTTP_404_NOT_FOUND, {"error": "No encontrado"}
+    if getattr(match.func, 'view_class', None) is BatchView:
+        return status.HTTP_400_BAD_REQUEST, {"error": "No se puede anidar un batch"}
+
+    sub = _subpeticion(request, url)
+    sub.resolver_match = match
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+        if iscoroutine(response):
+            response = async_to_sync(_esperar)(response)
+        if response.streaming:
+            return status.HTTP_400_BAD_REQUEST, {"error": "Respuesta en streaming no admitida en batch"}
+        return response.status_code, _cuerpo(response)
+    except Http404:
+        return status.HTTP_404_NOT_FOUND, {"error": "No encontrado"}
+    except PermissionDenied:
+        return status.HTTP_403_FORBIDDEN, {"error": "Sin permiso"}
+    except Exception:
+        logger.exception("Error en subpetición de batch: %s", url, extra={'evento': 'batch_error'})
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, {"error": "Error interno"}
+
+
+def _ejecutar_en_hilo(request, url):
+    # Como una petición: conexiones viejas o rotas se cierran antes y después
+    close_old_connections()
+    try:
+        return _ejecutar(request, url)
+    finally:
+        close_old_connections()
+
+
+class BatchView(APIView):
+    """
+    Ejecuta hasta BATCH['MAX_PETICIONES'] GET de la API y devuelve sus
+    respuestas juntas. Requiere autenticación.
+    """
+
+    def post(self, request):
+        peticiones = request.data.get('peticiones') if isinstance(request.data, dict) else None
+        if not isinstance(peticiones, list) or not peticiones:
+            return Response(
+                {"error": "Se requiere una lista de peticiones"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(peticiones) > settings.BATCH['MAX_PETICIONES']:
+            return Response(
+                {"error": f"Máximo {settings.BATCH['MAX_PETICIONES']} peticiones por batch"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        urls = []
+        for peticion in peticiones:
+            url = peticion.get('url') if isinstance(peticion, dict) else None
+            metodo = peticion.get('metodo', 'GET') if isinstance(peticion, dict) else None
+            # Solo la API: el resto (p. ej. /admin/) espera sesión y CSRF,
+            # que las subpeticiones no tienen
+            if not isinstance(url, str) or not url.startswith(PREFIJO_API):
+                return Response(
+                    {"error": "Cada petición requiere una url de la API ('/api/...')"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if str(metodo).upper() != 'GET':
+                return Response(
+                    {"error": "Solo se admiten peticiones GET"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            urls.append(url)
+
+        if request.data.get('paralelo') and len(urls) > 1:
+            # Cada hilo con una copia del contexto (router de réplicas, métricas)
+            futuros = [
+                _pool_batch().submit(contextvars.copy_context().run, _ejecutar_en_hilo, request, url)
+                for url in urls
+            ]
+            resultados = [futuro.result() for futuro in futuros]
+        else:
+            resultados = [_ejecutar(request, url) for url in urls]
+
+        return Response({
+            'respuestas': [
+                {'url': url, 'status': codigo, 'body': cuerpo}
+                for url, (codigo, cuerpo) in zip(urls, resultados)
+            ]
+        }, status=status.HTTP_200_OK)
@@ -0,0 +1,187 @@
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+
+# Estado de la petición en curso. Se guarda un dict mutable (y no valores
+# sueltos) para que los cambios hechos por el router dentro de una vista
+# síncrona ejecutada en otro hilo (ASGI) sigan visibles en el middleware.
+_peticion = ContextVar('peticion_db', default=None)
+
+METODOS_SEGUROS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+# POST que solo leen: el batch solo admite subpeticiones GET (login/batch.py)
+RUTAS_SOLO_LECTURA = frozenset({'/api/batch/'})
+
+# Tablas que siempre se leen del primario: una lectura atrasada de tokens
+# o sesiones se traduce en tokens revocados aceptados o logins perdidos, y
+# una de la caché en base, en candados y tickets que no se ven
+APPS_SOLO_PRIMARIO = frozenset({'token_blacklist', 'sessions', 'django_cache'})
+# La caché en base (settings.CACHES) no es un dato del usuario: escribir en
+# ella no cuenta para la lectura propia
+APPS_CACHE = frozenset({'django_cache'})
+
+
+def _clave_fijacion(user_id):
+    return f'db:leer-primario:{user_id}'
+
+
+def _user_id_desde_token(request):
+    """
+    Obtener el id de usuario del access token sin tocar la base.
+    La autenticación real la sigue haciendo DRF; aquí solo se decide
+    desde qué conexión leer.
+    """
+    from rest_framework_simplejwt.exceptions import InvalidToken
+    from rest_framework_simplejwt.settings import api_settings
+    from usuarios.backends import JWTAutenticacionCacheada
+
+    # El token verificado queda en cache para la autenticación de DRF
+    autenticacion = JWTAutenticacionCacheada()
+    header = autenticacion.get_header(request)
+    raw_token = autenticacion.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+    try:
+        return autenticacion.get_validated_token(raw_token).get(api_settings.USER_ID_CLAIM)
+    except InvalidToken:
+        return None
+
+
+class ReplicasMiddleware:
+    """
+    Decide si las lecturas de la petición pueden ir a una réplica.
+    - Peticiones que modifican datos: todo al primario.
+    - Peticiones seguras: réplicas, salvo que el usuario haya escrito hace
+      menos de REPLICAS_VENTANA_LECTURA_PROPIA segundos (lee sus escrituras).
+    Funciona tanto bajo WSGI como bajo ASGI (sin adaptar a hilos).
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        estado, token = self._iniciar(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _peticion.reset(token)
+        self._finalizar(request, estado)
+        return response
+
+    async def __acall__(self, request):
+        estado, token = self._iniciar(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _peticion.reset(token)
+        self._finalizar(request, estado)
+        return response
+
+    def _iniciar(self, request):
+        estado = {'replica': False, 'escribio': False}
+        if request.method in METODOS_SEGUROS or request.path_info in RUTAS_SOLO_LECTURA:
+            user_id = _user_id_desde_token(request)
+            estado['replica'] = user_id is None or not cache.get(_clave_fijacion(user_id))
+        return estado, _peticion.set(estado)
+
+    def _finalizar(self, request, estado):
+        if not estado['escribio']:
+            return
+        # DRF deja el usuario autenticado (JWT o login) en la HttpRequest
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            cache.set(
+                _clave_fijacion(user.pk), True,
+                timeout=settings.REPLICAS_VENTANA_LECTURA_PROPIA
+            )
+
+
+class ReplicasRouter:
+    """
+    Escrituras -> 'default'. Lecturas de peticiones seguras -> una réplica
+    al azar entre settings.REPLICAS; el resto -> 'default'.
+    Réplicas y primario tienen el mismo esquema, así que las relaciones
+    entre objetos leídos de una u otra base siempre son válidas.
+    """
+
+    def db_for_read(self, model, **hints):
+        estado = _peticion.get()
+        if (
+            estado is None
+            or not estado['replica']
+            or model._meta.app_label in APPS_SOLO_PRIMARIO
+        ):
+            return 'default'
+        return random.choice(settings.REPLICAS)
+
+    def db_for_write(self, model, **hints):
+        estado = _peticion.get()
+        if estado is not None and model._meta.app_label not in APPS_CACHE:
+            estado['escribio'] = True
+            # El resto de la petición lee lo que acaba de escribir
+            estado['replica'] = False
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Las réplicas se pueblan copiando el primario (sincronizar_replicas)
+        return db == 'default'
+
+
+class ShardsRouter:
+    """
+    Con settings.USUARIOS_SHARDS: los usuarios y sus tokens van al shard de
+    su id (usuarios/shards.py). Solo decide cuando la consulta trae el
+    objeto (hint 'instance'); las consultas por id/username/email las
+    dirige UsuarioQuerySet, y el resto sigue al siguiente router.
+    Va primero en DATABASE_ROUTERS.
+    """
+
+    def _shard(self, model, hints):
+        from usuarios.shards import MODELOS_REPLICADOS, MODELOS_SHARD, shard_de_id
+
+        etiqueta = model._meta.label_lower
+        if etiqueta not in MODELOS_SHARD and etiqueta not in MODELOS_REPLICADOS:
+            return None
+        instancia = hints.get('instance')
+        if instancia is None:
+            return None
+        # Objetos relacionados de un objeto ya leído o guardado en un shard
+        if instancia._state.db in settings.USUARIOS_SHARDS_ALIAS:
+            return instancia._state.db
+        # Objetos nuevos: el shard sale del id del usuario
+        if instancia._meta.label_lower == 'usuarios.usuario' and instancia.pk is not None:
+            return shard_de_id(instancia.pk)
+        user_id = getattr(instancia, 'user_id', None)
+        if etiqueta in MODELOS_SHARD and user_id is not None:
+            return shard_de_id(user_id)
+        return None
+
+    def db_for_read(self, model, **hints):
+        return self._shard(model, hints)
+
+    def db_for_write(self, model, **hints):
+        return self._shard(model, hints)
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Los roles están copiados en todos los shards con el mismo id
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.USUARIOS_SHARDS_ALIAS:
+            # Mismo esquema que 'default' (el borrado en cascada del shard
+            # consulta tablas de otras apps), salvo el directorio
+            return not (app_label == 'usuarios' and model_name == 'directoriousuario')
+        if model_name == 'directoriousuario':
+            return db == 'default'
+        return None
@@ -0,0 +1,79 @@
+"""
+Fan-out en proceso para los streams SSE.
+
+Los eventos se publican desde cualquier hilo (vistas síncronas, señales,
+hilos de fondo) y se reparten a cada suscriptor, que es un stream async
+con su propia cola acotada. Publicar nunca espera a un cliente: si uno
+lento llena su cola se lo marca como desbordado y su stream termina con
+un aviso para que se ponga al día por otro medio. Así la memoria por
+cliente tiene tope y un cliente lento no frena al resto.
+"""
+import asyncio
+import threading
+
+from .metrics import EVENTOS_CLIENTES_DESCARTADOS
+
+
+class HubLleno(Exception):
+    """Se alcanzó el máximo de suscriptores del proceso."""
+
+
+class Suscripcion:
+    """Cola acotada de un suscriptor, atada a su event loop."""
+
+    def __init__(self, capacidad):
+        self.loop = asyncio.get_running_loop()
+        self.cola = asyncio.Queue(maxsize=capacidad)
+        self.desbordada = False
+
+    def _entregar(self, evento):
+        # Corre en el loop del suscriptor
+        if self.desbordada:
+            return
+        try:
+            self.cola.put_nowait(evento)
+        except asyncio.QueueFull:
+            self.desbordada = True
+            EVENTOS_CLIENTES_DESCARTADOS.incrementar(())
+
+    async def siguiente(self, espera):
+        """Próximo evento, o None si pasan `espera` segundos sin eventos."""
+        try:
+            return await asyncio.wait_for(self.cola.get(), espera)
+        except asyncio.TimeoutError:
+            return None
+
+
+class Hub:
+
+    def __init__(self, max_suscriptores):
+        self.max_suscriptores = max_suscriptores
+        self._suscripciones = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._suscripciones)
+
+    def suscribir(self, capacidad):
+        """Nueva suscripción en el loop actual; HubLleno si no hay cupo."""
+        suscripcion = Suscripcion(capacidad)
+        with self._lock:
+            if len(self._suscripciones) >= self.max_suscriptores:
+                raise HubLleno()
+            self._suscripciones.add(suscripcion)
+        return suscripcion
+
+    def cancelar(self, suscripcion):
+        with self._lock:
+            self._suscripciones.discard(suscripcion)
+
+    def publicar(self, evento):
+        """Repartir `evento` a todos los suscriptores, sin bloquear."""
+        with self._lock:
+            suscripciones = list(self._suscripciones)
+        for suscripcion in suscripciones:
+            try:
+                suscripcion.loop.call_soon_threadsafe(suscripcion._entregar, evento)
+            except RuntimeError:
+                # Loop cerrado: el stream ya terminó
+                self.cancelar(suscripcion)
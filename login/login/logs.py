@@ -0,0 +1,130 @@
+"""
+Logging sin bloqueo para las rutas calientes (settings.LOGGING).
+
+La vista solo crea el LogRecord y lo encola: el mensaje se interpola, se
+serializa a JSON y se escribe en un hilo aparte (QueueListener). Por eso
+los logs usan el estilo logger.info("... %s", valor) y no f-strings: el
+formateo no se paga en la petición, ni se paga nunca si el registro se
+descarta. Los campos estructurados van en extra={...}.
+
+Si la cola se llena el registro se descarta en vez de frenar la
+petición; los descartes se cuentan en log_records_dropped_total.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import random
+import sys
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+from .metrics import LOGS_DESCARTADOS
+
+# Atributos propios de LogRecord: todo lo demás llegó por extra={...}
+_ATRIBUTOS_RECORD = frozenset(vars(logging.makeLogRecord({}))) | {'message', 'asctime'}
+# Extras que Django agrega y no tienen sentido en JSON
+_EXTRAS_IGNORADOS = frozenset({'request', 'server_time'})
+
+
+class FormatoJSON(logging.Formatter):
+    """Una línea JSON por registro: campos fijos más los extra del registro."""
+
+    def format(self, record):
+        datos = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            'nivel': record.levelname,
+            'logger': record.name,
+            'mensaje': record.getMessage(),
+        }
+        for clave, valor in record.__dict__.items():
+            if clave not in _ATRIBUTOS_RECORD and clave not in _EXTRAS_IGNORADOS:
+                datos[clave] = valor
+        if record.exc_info:
+            datos['excepcion'] = self.formatException(record.exc_info)
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+
+class Muestreo(logging.Filter):
+    """
+    Deja pasar solo una fracción de los eventos de alto volumen:
+    tasas = {'login_exitoso': 0.1} conserva 1 de cada 10 registros con
+    extra={'evento': 'login_exitoso'}. Los conservados llevan la tasa en
+    'muestra' para reescalar al agregar.
+    """
+
+    def __init__(self, tasas=None):
+        super().__init__()
+        self.tasas = tasas or {}
+
+    def filter(self, record):
+        tasa = self.tasas.get(getattr(record, 'evento', None))
+        if tasa is None:
+            return True
+        if random.random() >= tasa:
+            return False
+        record.muestra = tasa
+        return True
+
+
+class _Listener(QueueListener):
+
+    def enqueue_sentinel(self):
+        # Con la cola llena al salir, esperar a que el hilo haga lugar
+        # (con un límite) en vez de fallar con queue.Full
+        try:
+            self.queue.put(self._sentinel, timeout=5)
+        except queue.Full:
+            pass
+
+
+class ManejadorEnCola(QueueHandler):
+    """
+    Encola los registros sin formatearlos; un QueueListener los escribe
+    como JSON en `stream`. El listener se arranca en el primer registro
+    de cada proceso, así un worker creado con fork (gunicorn --preload)
+    tiene su propio hilo y su propia cola.
+    """
+
+    def __init__(self, capacidad=10_000, stream=None):
+        super().__init__(queue.Queue(capacidad))
+        self.capacidad = capacidad
+        self.destino = logging.StreamHandler(stream or sys.stdout)
+        self.destino.setFormatter(FormatoJSON())
+        self.listener = None
+        self._pid = None
+        self._arranque_lock = threading.Lock()
+        atexit.register(self.detener)
+
+    def _arrancar(self):
+        with self._arranque_lock:
+            if self._pid == os.getpid():
+                return
+            if self._pid is not None:
+                # Hijo de un fork: la cola y el hilo heredados no sirven
+                self.queue = queue.Queue(self.capacidad)
+            self.listener = _Listener(self.queue, self.destino)
+            self.listener.start()
+            self._pid = os.getpid()
+
+    def prepare(self, record):
+        # La cola es del proceso: el registro viaja tal cual y el mensaje
+        # se interpola recién en el listener
+        return record
+
+    def enqueue(self, record):
+        if self._pid != os.getpid():
+            self._arrancar()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOGS_DESCARTADOS.incrementar((record.levelname,))
+
+    def detener(self):
+        """Vacía la cola y detiene el listener (al salir del proceso)."""
+        if self.listener is not None and self._pid == os.getpid():
+            self.listener.stop()
+            self.listener = None
+            self._pid = None
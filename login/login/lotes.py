@@ -0,0 +1,104 @@
+import atexit
+import logging
+import os
+import threading
+
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Todos los escritores del proceso, para detener_escritores(). Los que se
+# creen después de llamarla nacen detenidos.
+_escritores = []
+_detenidos = False
+
+
+class EscritorEnLotes:
+    """
+    Acumula instancias de un modelo en memoria y las escribe en lotes.
+    Quien registra solo agrega un objeto a una lista; el INSERT lo hace
+    un hilo en segundo plano con bulk_create al llenarse el lote o, como
+    máximo, cada `intervalo` segundos. Lo pendiente se escribe al salir.
+    """
+
+    def __init__(self, modelo, tamano_lote=200, intervalo=2.0, nombre=None):
+        self.modelo = modelo
+        self.tamano_lote = tamano_lote
+        self.intervalo = intervalo
+        self.nombre = nombre or f'escritor-{modelo._meta.model_name}'
+        self._pendientes = []
+        self._lock = threading.Lock()
+        self._despertar = threading.Event()
+        self._hilo = None
+        self._pid = None
+        self._detenido = _detenidos
+        _escritores.append(self)
+        atexit.register(self.vaciar)
+
+    def agregar(self, objeto):
+        with self._lock:
+            self._iniciar_hilo()
+            self._pendientes.append(objeto)
+            if len(self._pendientes) >= self.tamano_lote:
+                self._despertar.set()
+
+    def vaciar(self):
+        """Escribir todos los objetos pendientes en un único bulk_create."""
+        with self._lock:
+            lote, self._pendientes = self._pendientes, []
+        if not lote:
+            return 0
+        try:
+            self.modelo.objects.bulk_create(lote, batch_size=self.tamano_lote)
+        except Exception:
+            # Lo que se escribe en lotes es secundario: un fallo no debe afectar a las vistas
+            logger.exception(
+                "No se pudieron escribir %s filas de %s", len(lote), self.modelo._meta.label
+            )
+            return 0
+        return len(lote)
+
+    def detener(self, escribir=True):
+        """
+        Terminar el hilo y no arrancar otro. Lo pendiente se escribe o,
+        con escribir=False, se descarta; lo que se agregue después solo se
+        escribe con vaciar().
+        """
+        with self._lock:
+            self._detenido = True
+            hilo = self._hilo if self._pid == os.getpid() else None
+        self._despertar.set()
+        if hilo is not None:
+            hilo.join()
+        if escribir:
+            self.vaciar()
+        else:
+            with self._lock:
+                self._pendientes = []
+
+    def _iniciar_hilo(self):
+        # Tras un fork (workers de gunicorn) el hilo del padre no existe
+        if self._detenido or (self._hilo is not None and self._pid == os.getpid()):
+            return
+        if self._hilo is not None:
+            # Los pendientes heredados ya los escribe el proceso padre
+            self._pendientes = []
+        self._pid = os.getpid()
+        self._hilo = threading.Thread(target=self._bucle, name=self.nombre, daemon=True)
+        self._hilo.start()
+
+    def _bucle(self):
+        while not self._detenido:
+            self._despertar.wait(self.intervalo)
+            self._despertar.clear()
+            self.vaciar()
+            # Cada hilo tiene su propia conexión; no se deja abierta entre lotes
+            connection.close()
+
+
+def detener_escritores(escribir=True):
+    """Detener todos los escritores del proceso (ver EscritorEnLotes.detener)."""
+    global _detenidos
+    _detenidos = True
+    for escritor in _escritores:
+        escritor.detener(escribir)
@@ -0,0 +1,305 @@
+"""
+Métricas de rendimiento por vista, expuestas en formato de texto de
+Prometheus en /metrics/ (solo para settings.METRICAS_IPS).
+
+Por petición se registra la latencia, la cantidad de consultas y el
+tiempo en la base, el tiempo de serialización y el tamaño de la
+respuesta, etiquetados con el nombre de la URL ('usuarios:login',
+'admin-usuarios-list', ...). Los valores son del proceso: con varios
+workers, cada uno expone los suyos.
+"""
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+# Medición de la petición en curso. Dict mutable para que lo que registran
+# las consultas hechas en otro hilo (sync_to_async) llegue al middleware.
+_medicion = ContextVar('medicion', default=None)
+
+_lock = threading.Lock()
+
+SIN_RUTA = 'sin_ruta'
+
+
+class PresupuestoConsultasExcedido(Exception):
+    """Una vista hizo más consultas que su presupuesto en PRESUPUESTO_CONSULTAS."""
+
+
+class Histograma:
+    """Histograma acumulado al estilo Prometheus, por combinación de etiquetas."""
+
+    def __init__(self, nombre, ayuda, etiquetas, limites):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.limites = limites
+        self.series = {}
+
+    def observar(self, valores, valor):
+        with _lock:
+            serie = self.series.get(valores)
+            if serie is None:
+                # [conteo por balde..., +Inf], suma
+                serie = self.series[valores] = [[0] * (len(self.limites) + 1), 0.0]
+            serie[0][bisect_left(self.limites, valor)] += 1
+            serie[1] += valor
+
+    def exportar(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} histogram']
+        with _lock:
+            series = [(valores, list(baldes), suma) for valores, (baldes, suma) in self.series.items()]
+        for valores, baldes, suma in sorted(series):
+            etiquetas = ','.join(f'{e}="{v}"' for e, v in zip(self.etiquetas, valores))
+            acumulado = 0
+            for limite, cantidad in zip(self.limites + [float('inf')], baldes):
+                acumulado += cantidad
+                le = '+Inf' if limite == float('inf') else repr(limite)
+                lineas.append(f'{self.nombre}_bucket{{{etiquetas},le="{le}"}} {acumulado}')
+            lineas.append(f'{self.nombre}_sum{{{etiquetas}}} {suma}')
+            lineas.append(f'{self.nombre}_count{{{etiquetas}}} {acumulado}')
+        return lineas
+
+
+class Contador:
+
+    def __init__(self, nombre, ayuda, etiquetas):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.series = {}
+
+    def incrementar(self, valores, cantidad=1):
+        with _lock:
+            self.series[valores] = self.series.get(valores, 0) + cantidad
+
+    def exportar(self):
+        lineas = [f'# HELP {self.nombre} {self.ayuda}', f'# TYPE {self.nombre} counter']
+        with _lock:
+            series = sorted(self.series.items())
+        for valores, total in series:
+            etiquetas = ','.join(f'{e}="{v}"' for e, v in zip(self.etiquetas, valores))
+            lineas.append(f'{self.nombre}{{{etiquetas}}} {total}')
+        return lineas
+
+
+LIMITES_SEGUNDOS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+
+DURACION = Histograma(
+    'http_request_duration_seconds', 'Latencia de la petición por vista.',
+    ('view', 'method', 'status'), LIMITES_SEGUNDOS
+)
+CONSULTAS = Histograma(
+    'db_queries_per_request', 'Consultas SQL por petición.',
+    ('view',), [0, 1, 2, 3, 5, 10, 20, 50, 100]
+)
+TIEMPO_DB = Histograma(
+    'db_duration_seconds', 'Tiempo total en la base por petición.',
+    ('view',), LIMITES_SEGUNDOS
+)
+SERIALIZACION = Histograma(
+    'serializer_duration_seconds', 'Tiempo de serialización por petición.',
+    ('view',), LIMITES_SEGUNDOS
+)
+TAMANO = Histograma(
+    'http_response_size_bytes', 'Tamaño del cuerpo de la respuesta.',
+    ('view',), [100, 1_000, 10_000, 100_000, 1_000_000]
+)
+PRESUPUESTO_EXCEDIDO = Contador(
+    'db_query_budget_exceeded_total', 'Peticiones que superaron su presupuesto de consultas.',
+    ('view',)
+)
+LOGS_DESCARTADOS = Contador(
+    'log_records_dropped_total', 'Registros de log descartados por cola llena (login/logs.py).',
+    ('level',)
+)
+
+TOKENS_CACHE_CONSULTAS = Contador(
+    'jwt_cache_lookups_total', 'Access tokens buscados en la cache de verificados (usuarios/tokens_verificados.py).',
+    ('result',)
+)
+TOKENS_CACHE_AHORRO = Contador(
+    'jwt_cache_saved_seconds_total', 'Tiempo de verificación de JWT estimado que evitó la cache.',
+    ()
+)
+EVENTOS_CLIENTES_DESCARTADOS = Contador(
+    'sse_clients_dropped_total', 'Clientes SSE desconectados por llenar su cola (login/eventos.py).',
+    ()
+)
+
+METRICAS = [
+    DURACION, CONSULTAS, TIEMPO_DB, SERIALIZACION, TAMANO, PRESUPUESTO_EXCEDIDO,
+    LOGS_DESCARTADOS, TOKENS_CACHE_CONSULTAS, TOKENS_CACHE_AHORRO,
+    EVENTOS_CLIENTES_DESCARTADOS,
+]
+
+
+# Consultas
+
+def _medir_consulta(execute, sql, params, many, context):
+    medicion = _medicion.get()
+    if medicion is None:
+        return execute(sql, params, many, context)
+
+    medicion['consultas'] += 1
+    presupuesto = medicion['presupuesto']
+    if (
+        presupuesto is not None
+        and medicion['consultas'] > presupuesto
+        and settings.PRESUPUESTO_CONSULTAS_ACCION == 'error'
+    ):
+        # Se lanza antes de ejecutar: la traza apunta a la consulta de más
+        raise PresupuestoConsultasExcedido(
+            f"{medicion['vista']}: más de {presupuesto} consultas"
+        )
+
+    inicio = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        medicion['tiempo_db'] += time.perf_counter() - inicio
+
+
+def _instalar(conexion):
+    if _medir_consulta not in conexion.execute_wrappers:
+        conexion.execute_wrappers.append(_medir_consulta)
+
+
+def _instalar_en_conexion(sender, connection, **kwargs):
+    # Cada conexión (una por hilo y alias) lleva el wrapper desde que se
+    # abre, también las de los hilos de sync_to_async bajo ASGI
+    _instalar(connection)
+
+
+connection_created.connect(_instalar_en_conexion, dispatch_uid='metricas_consultas')
+
+
+# Serialización
+
+class SerializacionMedida:
+    """
+    Mixin para serializadores de salida: suma el tiempo de
+    to_representation a la petición en curso. Los serializadores anidados
+    no se cuentan dos veces.
+    """
+
+    def to_representation(self, instance):
+        medicion = _medicion.get()
+        if medicion is None or medicion['serializando']:
+            return super().to_representation(instance)
+
+        medicion['serializando'] = True
+        inicio = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            medicion['serializacion'] += time.perf_counter() - inicio
+            medicion['serializando'] = False
+
+
+# Middleware
+
+class MetricasMiddleware:
+    """
+    Mide cada petición. Va primero en MIDDLEWARE para incluir el costo del
+    resto de middlewares. Funciona bajo WSGI y ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        medicion, token, inicio = self._iniciar()
+        try:
+            response = self.get_response(request)
+        finally:
+            _medicion.reset(token)
+        self._registrar(request, response, medicion, inicio)
+        return response
+
+    async def __acall__(self, request):
+        medicion, token, inicio = self._iniciar()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _medicion.reset(token)
+        self._registrar(request, response, medicion, inicio)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        medicion = _medicion.get()
+        if medicion is not None:
+            vista = request.resolver_match.view_name
+            medicion['vista'] = vista
+            medicion['presupuesto'] = settings.PRESUPUESTO_CONSULTAS.get(vista)
+        return None
+
+    def _iniciar(self):
+        # Conexiones de este hilo abiertas antes de cargar el middleware
+        for conexion in connections.all(initialized_only=True):
+            _instalar(conexion)
+        medicion = {
+            'vista': SIN_RUTA,
+            'presupuesto': None,
+            'consultas': 0,
+            'tiempo_db': 0.0,
+            'serializacion': 0.0,
+            'serializando': False,
+        }
+        return medicion, _medicion.set(medicion), time.perf_counter()
+
+    def _registrar(self, request, response, medicion, inicio):
+        duracion = time.perf_counter() - inicio
+        vista = medicion['vista']
+        if vista == 'metricas':
+            return
+
+        DURACION.observar((vista, request.method, str(response.status_code)), duracion)
+        CONSULTAS.observar((vista,), medicion['consultas'])
+        TIEMPO_DB.observar((vista,), medicion['tiempo_db'])
+        SERIALIZACION.observar((vista,), medicion['serializacion'])
+        if not response.streaming:
+            TAMANO.observar((vista,), len(response.content))
+
+        presupuesto = medicion['presupuesto']
+        if presupuesto is not None and medicion['consultas'] > presupuesto:
+            PRESUPUESTO_EXCEDIDO.incrementar((vista,))
+            logger.warning(
+                "Presupuesto de consultas excedido en %s: %s de %s",
+                vista, medicion['consultas'], presupuesto,
+                extra={'evento': 'presupuesto_excedido', 'vista': vista}
+            )
+
+
+def exportar():
+    """Todas las métricas en formato de texto de Prometheus."""
+    lineas = []
+    for metrica in METRICAS:
+        lineas.extend(metrica.exportar())
+    return '\n'.join(lineas) + '\n'
+
+
+def metricas(request):
+    """
+    GET /metrics/
+    Endpoint interno para Prometheus: solo responde a settings.METRICAS_IPS.
+    """
+    if request.META.get('REMOTE_ADDR') not in settings.METRICAS_IPS:
+        raise PermissionDenied
+    return HttpResponse(exportar(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,381 @@
+"""
+Perfilado bajo demanda de un worker en ejecución (settings.PERFILADO_HABILITADO).
+
+Un admin pide perfilar las próximas N peticiones a una vista (por nombre
+de URL) con cProfile o con un perfilador por muestreo, y descarga el
+resultado como archivo pstats o como pilas colapsadas (flamegraph.pl,
+speedscope). También puede tomar capturas de tracemalloc y comparar dos.
+
+Sin la bandera, ni el middleware ni las URLs existen. Con ella pero sin
+sesiones abiertas, el middleware solo comprueba un dict vacío. Todo el
+estado es del proceso: con varios workers, cada uno perfila lo suyo.
+
+Bajo ASGI solo se muestrean vistas síncronas, en el hilo de
+sync_to_async que las ejecuta. Las vistas async corren en el hilo del
+event loop junto con todas las demás peticiones en curso y no se
+perfilan; cProfile no se ofrece.
+"""
+import cProfile
+import io
+import itertools
+import logging
+import marshal
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from usuarios.decorators import rol_obligatorio
+
+logger = logging.getLogger(__name__)
+
+MODO_CPROFILE = 'cprofile'
+MODO_MUESTREO = 'muestreo'
+MAXIMO_PETICIONES = 100
+MAXIMO_MARCOS = 100
+MAXIMO_RESULTADOS = 20
+INTERVALO_MUESTREO = 0.001  # segundos
+
+# Sesiones abiertas por nombre de vista. Vacío = perfilado inactivo.
+_sesiones = {}
+_sesiones_lock = threading.Lock()
+# Resultados de sesiones terminadas o en curso, por id, en orden de
+# creación. Se guardan los últimos MAXIMO_RESULTADOS terminados
+_resultados = {}
+_ids = itertools.count(1)
+
+# cProfile no admite dos perfiles activos a la vez (en 3.12+ usa
+# sys.monitoring, que es global): las peticiones se perfilan de a una
+_cprofile_lock = threading.Lock()
+
+# Capturas de tracemalloc por nombre
+_capturas = {}
+
+
+class Muestreador(threading.Thread):
+    """Toma la pila de un hilo cada `intervalo` segundos y la acumula colapsada."""
+
+    def __init__(self, hilo_id, sesion, intervalo=INTERVALO_MUESTREO):
+        super().__init__(name='muestreador', daemon=True)
+        self.hilo_id = hilo_id
+        self.sesion = sesion
+        self.intervalo = intervalo
+        self._fin = threading.Event()
+
+    def run(self):
+        # La primera muestra es inmediata: así también quedan registradas
+        # las peticiones más cortas que el intervalo
+        while True:
+            self.muestrear()
+            if self._fin.wait(self.intervalo):
+                return
+
+    def muestrear(self):
+        frame = sys._current_frames().get(self.hilo_id)
+        marcos = []
+        while frame is not None:
+            marcos.append(f"{frame.f_globals.get('__name__', '?')}:{frame.f_code.co_name}")
+            frame = frame.f_back
+        if marcos:
+            with self.sesion.lock:
+                self.sesion.pilas[';'.join(reversed(marcos))] += 1
+
+    def detener(self):
+        self._fin.set()
+        self.join()
+
+
+class SesionPerfilado:
+
+    def __init__(self, vista, peticiones, modo):
+        self.id = next(_ids)
+        self.vista = vista
+        self.modo = modo
+        self.solicitadas = peticiones
+        self.pendientes = peticiones
+        self.completadas = 0
+        self.estadisticas = None
+        self.pilas = Counter()
+        self.lock = threading.Lock()
+
+    def tomar(self):
+        """Reservar una de las peticiones pendientes."""
+        with _sesiones_lock:
+            if self.pendientes <= 0:
+                return False
+            self.pendientes -= 1
+            if self.pendientes == 0:
+                _sesiones.pop(self.vista, None)
+            return True
+
+    def ejecutar(self, get_response, request):
+        if self.modo == MODO_CPROFILE:
+            if not _cprofile_lock.acquire(blocking=False):
+                return get_response(request)
+            try:
+                if not self.tomar():
+                    return get_response(request)
+                perfil = cProfile.Profile()
+                try:
+                    return perfil.runcall(get_response, request)
+                finally:
+                    self._agregar_perfil(perfil)
+            finally:
+                _cprofile_lock.release()
+
+        return self.muestrear(get_response, request)
+
+    def muestrear(self, get_response, request):
+        """Muestrear el hilo actual mientras corre get_response(request)."""
+        if not self.tomar():
+            return get_response(request)
+        muestreador = Muestreador(threading.get_ident(), self)
+        muestreador.start()
+        try:
+            return get_response(request)
+        finally:
+            muestreador.detener()
+            self._completar()
+
+    def _agregar_perfil(self, perfil):
+        with self.lock:
+            if self.estadisticas is None:
+                self.estadisticas = pstats.Stats(perfil)
+            else:
+                self.estadisticas.add(perfil)
+        self._completar()
+
+    def _completar(self):
+        with self.lock:
+            self.completadas += 1
+            terminado = self.completadas == self.solicitadas
+        if terminado:
+            logger.info("Perfilado %s de %s terminado", self.id, self.vista)
+
+    def resumen(self):
+        return {
+            'id': self.id,
+            'vista': self.vista,
+            'modo': self.modo,
+            'peticiones': self.solicitadas,
+            'completadas': self.completadas,
+            'activa': self.pendientes > 0,
+        }
+
+    def descarga(self):
+        """(contenido, nombre de archivo) con el resultado acumulado."""
+        with self.lock:
+            if self.modo == MODO_CPROFILE:
+                # Mismo formato que Stats.dump_stats: lo leen pstats, snakeviz, etc.
+                datos = self.estadisticas.stats if self.estadisticas else {}
+                return marshal.dumps(datos), f'perfil-{self.id}.pstats'
+            lineas = [f'{pila} {cantidad}' for pila, cantidad in self.pilas.most_common()]
+        return ('\n'.join(lineas) + '\n').encode(), f'perfil-{self.id}.collapsed'
+
+
+class PerfiladoMiddleware:
+    """
+    Perfila las peticiones de las vistas con una sesión abierta.
+    Va al final de MIDDLEWARE, lo más cerca posible de la vista.
+
+    Bajo ASGI el perfilado se hace en process_view: Django lo ejecuta con
+    sync_to_async en el mismo hilo que las vistas síncronas, así que ahí
+    se llama a la vista y se muestrea solo ese hilo. Envolver
+    get_response muestrearía el hilo del event loop, que no ejecuta la
+    vista y sí las demás peticiones. cProfile no se usa bajo ASGI.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sesion = _sesion_para(request) if _sesiones else None
+        if sesion is None:
+            return self.get_response(request)
+        return sesion.ejecutar(self.get_response, request)
+
+    async def __acall__(self, request):
+        return await self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not iscoroutinefunction(self) or not _sesiones or iscoroutinefunction(view_func):
+            return None
+        sesion = _sesiones.get(request.resolver_match.view_name)
+        if sesion is None or sesion.modo != MODO_MUESTREO:
+            return None
+        return sesion.muestrear(lambda request: view_func(request, *view_args, **view_kwargs), request)
+
+
+def _sesion_para(request):
+    try:
+        vista = resolve(request.path_info).view_name
+    except Resolver404:
+        return None
+    return _sesiones.get(vista)
+
+
+def _descartar_resultados_viejos():
+    """Quitar los terminados más viejos por encima de MAXIMO_RESULTADOS (con _sesiones_lock)."""
+    terminados = [pk for pk, sesion in _resultados.items() if sesion.pendientes <= 0]
+    for pk in terminados[:max(0, len(terminados) - MAXIMO_RESULTADOS)]:
+        del _resultados[pk]
+
+
+# Vistas (solo Admin)
+
+class PerfiladoView(APIView):
+    """
+    GET  /api/admin/perfilado/  sesiones abiertas y terminadas
+    POST /api/admin/perfilado/  {"vista": "admin-usuarios-list", "peticiones": 20, "modo": "cprofile"}
+    """
+    permission_classes = [IsAuthenticated]
+
+    @rol_obligatorio(roles_permitidos=["Admin"])
+    def get(self, request):
+        return Response([sesion.resumen() for sesion in list(_resultados.values())])
+
+    @rol_obligatorio(roles_permitidos=["Admin"])
+    def post(self, request):
+        vista = request.data.get('vista')
+        modo = request.data.get('modo', MODO_CPROFILE)
+        try:
+            peticiones = int(request.data.get('peticiones', 10))
+        except (TypeError, ValueError):
+            peticiones = 0
+
+        if not vista:
+            return Response({"error": "La vista es requerida"}, status=status.HTTP_400_BAD_REQUEST)
+        if modo not in (MODO_CPROFILE, MODO_MUESTREO):
+            return Response({"error": "Modo no válido"}, status=status.HTTP_400_BAD_REQUEST)
+        if modo == MODO_CPROFILE and isinstance(request._request, ASGIRequest):
+            # La sesión quedaría abierta sin perfilar nada (ver PerfiladoMiddleware)
+            return Response(
+                {"error": "cProfile no está disponible bajo ASGI: usar modo muestreo"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 1 <= peticiones <= MAXIMO_PETICIONES:
+            return Response(
+                {"error": f"Las peticiones deben estar entre 1 y {MAXIMO_PETICIONES}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        sesion = SesionPerfilado(vista, peticiones, modo)
+        with _sesiones_lock:
+            if vista in _sesiones:
+                return Response(
+                    {"error": "Ya hay un perfilado abierto para esa vista"},
+                    status=status.HTTP_409_CONFLICT
+                )
+            _sesiones[vista] = sesion
+            _resultados[sesion.id] = sesion
+            _descartar_resultados_viejos()
+
+        logger.info(
+            "Admin %s inició perfilado %s de %s (%s)", request.user.username, sesion.id, vista, modo
+        )
+        return Response(sesion.resumen(), status=status.HTTP_201_CREATED)
+
+
+class PerfiladoDetalleView(APIView):
+    """
+    GET    /api/admin/perfilado/<id>/  descargar el resultado (pstats o pilas colapsadas)
+    DELETE /api/admin/perfilado/<id>/  cancelar y descartar
+    """
+    permission_classes = [IsAuthenticated]
+
+    @rol_obligatorio(roles_permitidos=["Admin"])
+    def get(self, request, pk):
+        sesion = _resultados.get(pk)
+        if sesion is None:
+            return Response({"error": "Perfilado no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        contenido, nombre = sesion.descarga()
+        response = HttpResponse(contenido, content_type='application/octet-stream')
+        response['Content-Disposition'] = f'attachment; filename="{nombre}"'
+        return response
+
+    @rol_obligatorio(roles_permitidos=["Admin"])
+    def delete(self, request, pk):
+        sesion = _resultados.pop(pk, None)
+        if sesion is None:
+            return Response({"error": "Perfilado no encontrado"}, status=status.HTTP_404_NOT_FOUND)
+        with _sesiones_lock:
+            if _sesiones.get(sesion.vista) is sesion:
+                del _sesiones[sesion.vista]
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MemoriaView(APIView):
+    """
+    POST /api/admin/perfilado/memoria/ {"accion": "iniciar" | "capturar" | "detener", "nombre": "antes"}
+    GET  /api/admin/perfilado/memoria/?desde=antes&hasta=despues&limite=25
+         diferencia entre dos capturas, agrupada por línea
+    """
+    permission_classes = [IsAuthenticated]
+
+    @rol_obligatorio(roles_permitidos=["Admin"])
+    def post(self, request):
+        accion = request.data.get('accion')
+        if accion == 'iniciar':
+            try:
+                marcos = int(request.data.get('marcos', 10))
+            except (TypeError, ValueError):
+                marcos = 0
+            if not 1 <= marcos <= MAXIMO_MARCOS:
+                return Response(
+                    {"error": f"Los marcos deben estar entre 1 y {MAXIMO_MARCOS}"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(marcos)
+            return Response({"message": "tracemalloc iniciado"})
+        if accion == 'detener':
+            tracemalloc.stop()
+            _capturas.clear()
+            return Response({"message": "tracemalloc detenido"})
+        if accion == 'capturar':
+            if not tracemalloc.is_tracing():
+                return Response(
+                    {"error": "tracemalloc no está iniciado"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            nombre = request.data.get('nombre') or time.strftime('%H%M%S')
+            _capturas[nombre] = tracemalloc.take_snapshot()
+            actual, pico = tracemalloc.get_traced_memory()
+            return Response({"nombre": nombre, "memoria_actual": actual, "memoria_pico": pico})
+        return Response({"error": "Acción no válida"}, status=status.HTTP_400_BAD_REQUEST)
+
+    @rol_obligatorio(roles_permitidos=["Admin"])
+    def get(self, request):
+        desde = _capturas.get(request.query_params.get('desde'))
+        hasta = _capturas.get(request.query_params.get('hasta'))
+        if desde is None or hasta is None:
+            return Response(
+                {"error": "Capturas no encontradas", "capturas": list(_capturas)},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        try:
+            limite = int(request.query_params.get('limite', 25))
+        except ValueError:
+            limite = 25
+
+        salida = io.StringIO()
+        for diferencia in hasta.compare_to(desde, 'lineno')[:limite]:
+            salida.write(f'{diferencia}\n')
+        return HttpResponse(salida.getvalue(), content_type='text/plain; charset=utf-8')
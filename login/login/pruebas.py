@@ -0,0 +1,33 @@
+"""Ejecutor de los tests (settings.TEST_RUNNER)."""
+import logging
+
+from django.test.runner import DiscoverRunner
+
+from .lotes import detener_escritores
+
+
+class EjecutorPruebas(DiscoverRunner):
+    """
+    DiscoverRunner sin los hilos de los escritores en lotes (auditoría,
+    actividad) ni logs por debajo de ERROR.
+
+    Con la base de pruebas en memoria, los INSERT de los escritores desde
+    otro hilo chocan con la transacción de cada test ("database table is
+    locked"), y lo que quedara para atexit se escribiría después de
+    destruir la base. Lo que registran los tests se descarta; un test que
+    necesite las filas llama a escritor.vaciar(). Los logs, en JSON por
+    stdout, se mezclarían con la salida de los tests.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        detener_escritores()
+        logging.disable(logging.WARNING)
+
+    def teardown_test_environment(self, **kwargs):
+        logging.disable(logging.NOTSET)
+        super().teardown_test_environment(**kwargs)
+
+    def teardown_databases(self, old_config, **kwargs):
+        detener_escritores(escribir=False)
+        super().teardown_databases(old_config, **kwargs)
@@ -0,0 +1,158 @@
+"""
+Sondas del balanceador: /healthz (vivo) y /readyz (listo para tráfico).
+
+Se atienden en wsgi.py/asgi.py antes que Django: no pasan por los
+middlewares, las URLs ni la autenticación, y nunca tocan sesiones ni
+usuarios. /readyz comprueba que cada base responda (SELECT 1) y que no
+queden migraciones sin aplicar; el resultado se guarda
+settings.SONDAS['CACHE_SEGUNDOS'] y solo un hilo a la vez lo renueva.
+Una vez que las migraciones están al día no se vuelven a revisar.
+"""
+import json
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+
+logger = logging.getLogger(__name__)
+
+VIVO = '/healthz'
+LISTO = '/readyz'
+
+_CABECERAS = [
+    ('Content-Type', 'application/json'),
+    ('Cache-Control', 'no-store'),
+]
+
+
+class EstadoListo:
+    """Resultado de la última revisión, renovado como mucho cada `vigencia` segundos."""
+
+    def __init__(self, vigencia):
+        self.vigencia = vigencia
+        self._resultado = None
+        self._revisado = None
+        self._migraciones_al_dia = False
+        self._lock = threading.Lock()
+
+    def _aliases(self):
+        # Las réplicas comparten esquema con la principal: solo se les pide conexión
+        replicas = set(getattr(settings, 'REPLICAS', ()))
+        return [alias for alias in connections if alias not in replicas], list(replicas)
+
+    def _revisar(self):
+        problemas = {}
+        principales, replicas = self._aliases()
+        for alias in principales + replicas:
+            try:
+                with connections[alias].cursor() as cursor:
+                    cursor.execute('SELECT 1')
+            except Exception as e:
+                # Conexión rota: la próxima revisión abre una nueva
+                connections[alias].close()
+                problemas[alias] = f'sin conexión: {e.__class__.__name__}'
+
+        if not self._migraciones_al_dia and not problemas:
+            for alias in principales:
+                try:
+                    executor = MigrationExecutor(connections[alias])
+                    pendientes = executor.migration_plan(executor.loader.graph.leaf_nodes())
+                except Exception as e:
+                    problemas[alias] = f'error al revisar migraciones: {e.__class__.__name__}'
+                    continue
+                if pendientes:
+                    problemas[alias] = f'{len(pendientes)} migraciones pendientes'
+            self._migraciones_al_dia = not problemas
+
+        if problemas:
+            logger.warning("No listo: %s", problemas, extra={'evento': 'readyz_fallo'})
+        return not problemas, problemas
+
+    def vigente(self):
+        """El último resultado si no venció, o None."""
+        if self._revisado is not None and time.monotonic() - self._revisado < self.vigencia:
+            return self._resultado
+        return None
+
+    def obtener(self):
+        """(listo, problemas), revisando solo si el resultado venció."""
+        resultado = self.vigente()
+        if resultado is not None:
+            return resultado
+        # Si otro hilo ya está revisando, se responde con el resultado anterior
+        if not self._lock.acquire(blocking=self._resultado is None):
+            return self._resultado
+        try:
+            if self._revisado is None or time.monotonic() - self._revisado >= self.vigencia:
+                self._resultado = self._revisar()
+                self._revisado = time.monotonic()
+            return self._resultado
+        finally:
+            self._lock.release()
+
+
+estado_listo = EstadoListo(settings.SONDAS['CACHE_SEGUNDOS'])
+
+
+def _responder(ruta, resultado=None):
+    """(status, cuerpo) de la sonda `ruta`."""
+    if ruta == VIVO:
+        return 200, b'{"estado":"ok"}'
+    listo, problemas = resultado or estado_listo.obtener()
+    if listo:
+        return 200, b'{"estado":"ok"}'
+    return 503, json.dumps({'estado': 'no listo', 'problemas': problemas}).encode()
+
+
+def _ruta_sonda(ruta):
+    ruta = ruta.rstrip('/') or '/'
+    return ruta if ruta in (VIVO, LISTO) else None
+
+
+class SondasWSGI:
+    """Envuelve la aplicación WSGI de Django."""
+
+    def __init__(self, aplicacion):
+        self.aplicacion = aplicacion
+
+    def __call__(self, environ, start_response):
+        ruta = _ruta_sonda(environ.get('PATH_INFO', ''))
+        if ruta is None or environ.get('REQUEST_METHOD') not in ('GET', 'HEAD'):
+            return self.aplicacion(environ, start_response)
+        codigo, cuerpo = _responder(ruta)
+        start_response(
+            '200 OK' if codigo == 200 else '503 Service Unavailable',
+            _CABECERAS + [('Content-Length', str(len(cuerpo)))]
+        )
+        return [cuerpo if environ['REQUEST_METHOD'] == 'GET' else b'']
+
+
+class SondasASGI:
+    """Envuelve la aplicación ASGI de Django."""
+
+    def __init__(self, aplicacion):
+        self.aplicacion = aplicacion
+
+    async def __call__(self, scope, receive, send):
+        ruta = _ruta_sonda(scope['path']) if scope['type'] == 'http' else None
+        if ruta is None or scope['method'] not in ('GET', 'HEAD'):
+            return await self.aplicacion(scope, receive, send)
+        resultado = estado_listo.vigente() if ruta == LISTO else None
+        if ruta == VIVO or resultado is not None:
+            codigo, cuerpo = _responder(ruta, resultado)
+        else:
+            # Renovar la revisión usa el ORM síncrono
+            codigo, cuerpo = await sync_to_async(_responder)(ruta)
+        await send({
+            'type': 'http.response.start',
+            'status': codigo,
+            'headers': [
+                (nombre.lower().encode(), valor.encode())
+                for nombre, valor in _CABECERAS + [('Content-Length', str(len(cuerpo)))]
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': cuerpo if scope['method'] == 'GET' else b''})
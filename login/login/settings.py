@@ -10,8 +10,9 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/6.0/ref/settings/
 """
 
+import os
 from pathlib import Path
-from datetime import timedelta
+from datetime import datetime, timedelta
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -28,6 +29,9 @@ DEBUG = True
 
 ALLOWED_HOSTS = ['localhost','127.0.0.1','0.0.0.0']
 
+# Perfil de base de datos: 'dev' (por defecto) o 'produccion' (ver DATABASES)
+DB_PROFILE = os.environ.get('DJANGO_DB_PROFILE', 'dev')
+
 # Modelo de usuario personalizado
 AUTH_USER_MODEL = 'usuarios.Usuario'
 
@@ -49,10 +53,11 @@ INSTALLED_APPS = [
     'usuarios',
     'estudiantes',
     'empresas',
-   
+    'admin.apps.AdminConfig',
 ]
 
 MIDDLEWARE = [
+    'login.metrics.MetricasMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -63,13 +68,71 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+if DB_PROFILE == 'produccion':
+    # Justo después de las métricas: todo lo que se lea en una petición
+    # GET, incluida la autenticación, puede ir a una réplica
+    MIDDLEWARE.insert(1, 'login.db_routers.ReplicasMiddleware')
+
+# Perfilado bajo demanda para admins (login/profiling.py). Desactivado, no
+# agrega middleware ni URLs.
+PERFILADO_HABILITADO = os.environ.get('DJANGO_PERFILADO', '') == '1'
+if PERFILADO_HABILITADO:
+    MIDDLEWARE.append('login.profiling.PerfiladoMiddleware')
+
+# Logs en JSON escritos desde un hilo aparte (login/logs.py). Los eventos
+# de éxito más frecuentes se muestrean: 0.1 = se conserva 1 de cada 10.
+LOGS_MUESTREO = {
+    'login_exitoso': 0.1,
+    'logout_exitoso': 0.1,
+    'dashboard': 0.01,
+    'listado_usuarios': 0.1,
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'muestreo': {
+            '()': 'login.logs.Muestreo',
+            'tasas': LOGS_MUESTREO,
+        },
+    },
+    'handlers': {
+        'cola': {
+            '()': 'login.logs.ManejadorEnCola',
+            'capacidad': int(os.environ.get('DJANGO_LOGS_CAPACIDAD', 10_000)),
+            'filters': ['muestreo'],
+        },
+    },
+    'root': {
+        'handlers': ['cola'],
+        'level': os.environ.get('DJANGO_LOG_LEVEL', 'INFO'),
+    },
+    'loggers': {
+        # Reemplaza los handlers por defecto de Django (console en DEBUG):
+        # sin esto cada registro sale dos veces, en texto y en JSON
+        'django': {
+            'handlers': ['cola'],
+            'level': os.environ.get('DJANGO_LOG_LEVEL', 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Calentamiento de cada worker antes de aceptar tráfico (login/arranque.py)
+CALENTAR_AL_ARRANCAR = os.environ.get('DJANGO_CALENTAR', '1') == '1'
+
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
     'REFRESH_TOKEN_LIFETIME': timedelta(days=7),
+    # Cada refresh rota dentro de su familia (usuarios.tokens): la lista
+    # negra solo se usa para tokens emitidos antes de las familias
     'ROTATE_REFRESH_TOKENS': True,
-    'BLACKLIST_AFTER_ROTATION': True,  # Para logout
+    'BLACKLIST_AFTER_ROTATION': True,
     'UPDATE_LAST_LOGIN': True,
     
+    # Los tokens se firman con JWT_CLAVES; HS256 con SECRET_KEY solo se
+    # usa para aceptar los emitidos antes (JWT_CLAVES['HS256_HASTA'])
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'VERIFYING_KEY': None,
@@ -81,7 +144,7 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
     
-    'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    'AUTH_TOKEN_CLASSES': ('usuarios.tokens.AccessTokenUsuario',),
     'TOKEN_TYPE_CLAIM': 'token_type',
     
     'JTI_CLAIM': 'jti',
@@ -91,6 +154,34 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+# Claves asimétricas de los JWT (usuarios/claves_jwt.py). Otros servicios
+# validan los access tokens con el JWKS público (/.well-known/jwks.json) y
+# usuarios/verificador_jwt.py, sin llamar a esta API.
+JWT_CLAVES = {
+    # Un archivo <kid>.pem por clave; con varios servidores, el mismo
+    # directorio en todos. `manage.py rotar_clave_jwt` crea una nueva
+    'DIRECTORIO': Path(os.environ.get('DJANGO_JWT_CLAVES_DIR', BASE_DIR / 'claves_jwt')),
+    # Una clave nueva se publica este tiempo antes de firmar con ella, así
+    # que debe ser mayor que JWKS_MAX_AGE
+    'PUBLICACION_PREVIA': timedelta(days=2),
+    'JWKS_MAX_AGE': 24 * 60 * 60,
+    # Momento del cambio a claves asimétricas (ISO 8601 en UTC, p. ej.
+    # 2026-10-19T12:00:00+00:00): los tokens HS256 emitidos antes se aceptan
+    # hasta REFRESH_TOKEN_LIFETIME después. Sin definir, HS256 se rechaza
+    'HS256_HASTA': (
+        datetime.fromisoformat(os.environ['DJANGO_JWT_HS256_HASTA'])
+        if os.environ.get('DJANGO_JWT_HS256_HASTA') else None
+    ),
+    # Crear una clave si el directorio está vacío (desarrollo y tests)
+    'CREAR_SI_FALTA': DEBUG,
+}
+
+# Access tokens ya verificados que se guardan en memoria por proceso
+# (usuarios/tokens_verificados.py); 0 desactiva la cache
+TOKENS_VERIFICADOS = {
+    'TAMANO': 10_000,
+}
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",  # Puerto de Vite
     "http://127.0.0.1:5173",
@@ -103,7 +194,7 @@ ROOT_URLCONF = 'login.urls'
 # Configuración REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'usuarios.backends.JWTAutenticacionCacheada',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -130,6 +221,17 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'login.wsgi.application'
 
+# Tests sin los hilos de los escritores en lotes (login/pruebas.py)
+TEST_RUNNER = 'login.pruebas.EjecutorPruebas'
+
+# Vistas async para autenticación y dashboards (login/me/logout y
+# dashboards de estudiante y empresa). Activar al servir con ASGI
+# (uvicorn login.asgi:application); bajo WSGI conviene dejarlas síncronas.
+API_ASYNC = os.environ.get('DJANGO_API_ASYNC', '') == '1'
+
+# Hilos para verificar contraseñas en las vistas async (None: default de Python)
+HASH_THREADS = None
+
 
 # Database
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
@@ -141,6 +243,106 @@ DATABASES = {
     }
 }
 
+# Perfil de producción para SQLite (DJANGO_DB_PROFILE=produccion):
+# - WAL: los lectores no se bloquean mientras hay un escritor.
+# - synchronous=NORMAL: seguro con WAL, evita un fsync por commit.
+# - mmap/cache: lecturas desde memoria en vez de read() por página.
+# - busy_timeout + BEGIN IMMEDIATE: los escritores esperan su turno en vez
+#   de fallar con "database is locked".
+# - Conexiones persistentes, y las peticiones GET leen de réplicas de solo
+#   lectura (ver login/db_routers.py).
+DATABASE_ROUTERS = []
+
+SQLITE_PRAGMAS = (
+    'PRAGMA journal_mode=WAL;'
+    'PRAGMA synchronous=NORMAL;'
+    'PRAGMA mmap_size=268435456;'  # 256 MB
+    'PRAGMA cache_size=-65536;'  # 64 MB
+    'PRAGMA busy_timeout=5000;'
+    'PRAGMA temp_store=MEMORY;'
+)
+
+if DB_PROFILE == 'produccion':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': int(os.environ.get('DJANGO_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'init_command': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 5,
+        },
+    })
+
+    # Réplicas de lectura. Con DJANGO_DB_REPLICAS=N se usan N archivos en
+    # REPLICAS_DIR, mantenidos al día por `manage.py sincronizar_replicas`.
+    # Con 0, la única "réplica" es una conexión de solo lectura al mismo
+    # archivo del primario (siempre al día gracias a WAL).
+    REPLICAS_DIR = BASE_DIR / 'replicas'
+    _replicas = int(os.environ.get('DJANGO_DB_REPLICAS', 0))
+    if _replicas:
+        _archivos_replica = {
+            f'replica_{i}': REPLICAS_DIR / f'db_replica_{i}.sqlite3'
+            for i in range(1, _replicas + 1)
+        }
+    else:
+        _archivos_replica = {'readonly': DATABASES['default']['NAME']}
+
+    for _alias, _archivo in _archivos_replica.items():
+        DATABASES[_alias] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            # mode=ro: SQLite rechaza cualquier escritura por esta conexión
+            'NAME': f"file:{_archivo}?mode=ro",
+            'CONN_MAX_AGE': DATABASES['default']['CONN_MAX_AGE'],
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': SQLITE_PRAGMAS.replace('PRAGMA journal_mode=WAL;', '')
+                + 'PRAGMA query_only=ON;',
+            },
+            'TEST': {'MIRROR': 'default'},
+        }
+    REPLICAS = list(_archivos_replica)
+    REPLICAS_ARCHIVOS = {
+        alias: archivo for alias, archivo in _archivos_replica.items() if alias != 'readonly'
+    }
+    # Segundos entre copias de sincronizar_replicas
+    REPLICAS_INTERVALO_SINCRONIZACION = 2
+    # Tras escribir, un usuario lee del primario durante esta ventana para
+    # ver sus propios cambios aunque las réplicas vayan atrasadas. Debe ser
+    # mayor que el intervalo de sincronización. La marca vive en CACHES.
+    REPLICAS_VENTANA_LECTURA_PROPIA = 5
+    DATABASE_ROUTERS.append('login.db_routers.ReplicasRouter')
+
+# Cache compartida por todos los workers (gunicorn.conf.py arranca varios):
+# ventana de gracia del refresh, tickets del stream de eventos y lectura
+# propia con réplicas. Una caché por proceso no verían los demás. Es una
+# tabla de la base principal: python manage.py createcachetable
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'cache_compartida',
+    }
+}
+
+# Refresh concurrentes del mismo token (un dashboard que recibe varios 401 a
+# la vez): durante esta ventana, en segundos, reciben el mismo par nuevo en
+# vez de rotar otra vez (usuarios/refresco.py). 0 la desactiva.
+REFRESH_VENTANA_GRACIA = 10
+
+# Sharding de usuarios (DJANGO_USUARIOS_SHARDS=N, 0 = desactivado).
+# Usuario y sus tokens se reparten en N archivos SQLite según su id
+# (usuarios/shards.py); 'default' guarda el directorio username/email -> id
+# y las demás tablas. Cada shard se migra aparte:
+#   python manage.py migrate --database usuarios_<i>
+USUARIOS_SHARDS = int(os.environ.get('DJANGO_USUARIOS_SHARDS', 0))
+USUARIOS_SHARDS_ALIAS = [f'usuarios_{i}' for i in range(USUARIOS_SHARDS)]
+for _alias in USUARIOS_SHARDS_ALIAS:
+    DATABASES[_alias] = {**DATABASES['default'], 'NAME': BASE_DIR / f'db_{_alias}.sqlite3'}
+if USUARIOS_SHARDS:
+    DATABASE_ROUTERS.insert(0, 'login.db_routers.ShardsRouter')
+
+# Login con username o email en una sola búsqueda (compatible con sharding)
+AUTHENTICATION_BACKENDS = ['usuarios.backends.UsernameEmailBackend']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -173,6 +375,87 @@ USE_I18N = True
 USE_TZ = True
 
 
+# Actividad de estudiantes
+# Los eventos se escriben en lotes desde un hilo en segundo plano.
+ACTIVIDAD_BUFFER = {
+    'TAMANO_LOTE': 200,
+    'INTERVALO': 2.0,  # segundos máximos que un evento espera en memoria
+}
+
+# Días que se conservan los eventos antes de que compactar_actividad
+# los agrupe en resúmenes diarios
+ACTIVIDAD_RETENCION_DIAS = 90
+
+# Auditoría de cambios de admins (admin/auditoria.py), escrita en lotes
+AUDITORIA_BUFFER = {
+    'TAMANO_LOTE': 200,
+    'INTERVALO': 2.0,
+}
+
+
+# Bajas de usuarios (usuarios/depuracion.py). Con LOGICA, DELETE en la
+# administración solo marca al usuario como eliminado; un hilo borra
+# después sus datos en lotes de LOTE filas, con PAUSA segundos entre lotes.
+BAJAS_USUARIOS = {
+    'LOGICA': True,
+    'LOTE': 500,
+    'PAUSA': 0.05,
+}
+
+
+# /api/batch/ (login/batch.py): máximo de subpeticiones y de hilos para
+# las que se piden en paralelo
+BATCH = {
+    'MAX_PETICIONES': 20,
+    'HILOS': 4,
+}
+
+
+# Stream SSE de cambios de usuarios (/api/admin/eventos/, usuarios/eventos.py).
+# Requiere ASGI. BROKER: 'local' publica desde las señales del proceso;
+# 'feed' lee el feed de cambios cada INTERVALO_FEED segundos (varios
+# workers). Cada cliente guarda hasta CAPACIDAD_CLIENTE eventos sin leer;
+# si la llena se lo desconecta con un evento 'reset'.
+EVENTOS_USUARIOS = {
+    'BROKER': os.environ.get('DJANGO_EVENTOS_BROKER', 'local'),
+    'INTERVALO_FEED': 1.0,
+    'CAPACIDAD_CLIENTE': 256,
+    'MAX_CLIENTES': 500,
+    'KEEPALIVE': 15,  # segundos entre comentarios para mantener la conexión
+    'BACKLOG': 500,   # cambios que se reenvían al retomar con un cursor
+    'TICKET_SEGUNDOS': 30,  # validez del ticket de un solo uso para abrir el stream
+}
+
+
+# Sondas /healthz y /readyz (login/salud.py), atendidas antes que Django.
+# /readyz guarda su resultado CACHE_SEGUNDOS.
+SONDAS = {
+    'CACHE_SEGUNDOS': 2.0,
+}
+
+
+# Perfil de sesión del login y /api/auth/me/ (usuarios/perfiles.py): id,
+# username, nombre y rol, más estos campos de UsuarioSerializer por rol.
+# ?perfil=completo responde el usuario entero.
+PERFILES_SESION = {
+    'Admin': ['email'],
+    'Estudiante': [],
+    'Empresa': [],
+}
+
+
+# Métricas de rendimiento (login/metrics.py). /metrics/ solo responde a
+# estas IPs.
+METRICAS_IPS = ['127.0.0.1', '::1']
+
+# Presupuesto de consultas SQL por vista, por nombre de URL, p. ej.
+# {'usuarios:current_user': 2}. Al superarlo se registra una advertencia
+# ('log') o se lanza PresupuestoConsultasExcedido ('error', para desarrollo
+# y tests).
+PRESUPUESTO_CONSULTAS = {}
+PRESUPUESTO_CONSULTAS_ACCION = 'log'
+
+
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/6.0/howto/static-files/
 
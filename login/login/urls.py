@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
+from usuarios.views import JWKSView
+from .batch import BatchView
+from .metrics import metricas
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -9,4 +13,20 @@ urlpatterns = [
     path('api/estudiantes/', include('estudiantes.urls')),
     path('api/empresas/', include('empresas.urls')),
     path('api/admin/', include('admin.urls')),
-]
\ No newline at end of file
+    path('api/batch/', BatchView.as_view(), name='batch'),
+
+    # Claves públicas de los JWT
+    path('.well-known/jwks.json', JWKSView.as_view(), name='jwks'),
+
+    # Métricas internas (Prometheus)
+    path('metrics/', metricas, name='metricas'),
+]
+
+if settings.PERFILADO_HABILITADO:
+    from .profiling import MemoriaView, PerfiladoDetalleView, PerfiladoView
+
+    urlpatterns += [
+        path('api/admin/perfilado/', PerfiladoView.as_view(), name='perfilado'),
+        path('api/admin/perfilado/memoria/', MemoriaView.as_view(), name='perfilado_memoria'),
+        path('api/admin/perfilado/<int:pk>/', PerfiladoDetalleView.as_view(), name='perfilado_detalle'),
+    ]
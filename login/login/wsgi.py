@@ -14,3 +14,13 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'login.settings')
 
 application = get_wsgi_application()
+
+# /healthz y /readyz se responden sin pasar por Django
+from .salud import SondasWSGI
+
+application = SondasWSGI(application)
+
+# Con gunicorn --preload esto corre una sola vez en el master
+from .arranque import calentar
+
+calentar()
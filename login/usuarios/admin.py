@@ -1,3 +1,85 @@
+from django.conf import settings
 from django.contrib import admin
+from django.contrib.admin.views.main import IGNORED_PARAMS, PAGE_VAR, SEARCH_VAR
+from django.contrib.auth.admin import UserAdmin
+from django.db import transaction
+from django.db.models import Q
 
-# Register your models here.
+from .depuracion import depurador
+from .models import Rol, Usuario
+from .paginacion import PaginadorEstimado
+
+
+def _sin_filtros(request):
+    """El changelist pide la tabla entera: sin búsqueda ni filtros."""
+    return not request.GET.get(SEARCH_VAR) and all(
+        parametro in IGNORED_PARAMS or parametro == PAGE_VAR for parametro in request.GET
+    )
+
+
+@admin.register(Usuario)
+class UsuarioAdmin(UserAdmin):
+    """
+    Changelist pensado para millones de usuarios: el rol viene en la misma
+    consulta, no hay COUNT(*) de la tabla (PaginadorEstimado) y la búsqueda
+    solo usa índices.
+    """
+    list_display = ['username', 'email', 'first_name', 'last_name', 'rol_usuario', 'is_active', 'date_joined']
+    list_select_related = ['rol_usuario']
+    list_filter = ['is_active', 'is_staff', 'rol_usuario']
+    # Mismo orden que el índice usuarios_date_joined_idx
+    ordering = ['-date_joined', '-id']
+    list_per_page = 50
+    show_full_result_count = False
+    paginator = PaginadorEstimado
+    raw_id_fields = ['rol_usuario']
+    # La búsqueda real está en get_search_results
+    search_fields = ['username']
+    search_help_text = "Id exacto o comienzo del username (distingue mayúsculas)."
+
+    fieldsets = UserAdmin.fieldsets + (
+        ("Datos adicionales", {'fields': ('rol_usuario', 'telefono', 'fecha_nacimiento', 'fecha_contrato')}),
+    )
+    add_fieldsets = UserAdmin.add_fieldsets + (
+        ("Datos adicionales", {'fields': ('rol_usuario', 'email')}),
+    )
+
+    def get_paginator(self, request, queryset, per_page, orphans=0, allow_empty_first_page=True):
+        return self.paginator(
+            queryset, per_page, orphans, allow_empty_first_page, estimar=_sin_filtros(request)
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Id exacto o prefijo de username como rango sobre su índice único
+        (username >= t AND username < t + U+10FFFF). Un icontains haría
+        LIKE '%t%' y recorrería la tabla entera.
+        """
+        termino = search_term.strip()
+        if not termino:
+            return queryset, False
+        prefijo = Q(username__gte=termino, username__lt=termino + '\U0010ffff')
+        if termino.isdigit():
+            prefijo |= Q(pk=int(termino))
+        return queryset.filter(prefijo), False
+
+    def delete_model(self, request, obj):
+        # Igual que la API: baja lógica y borrado de los datos en segundo plano
+        if not settings.BAJAS_USUARIOS['LOGICA']:
+            return super().delete_model(request, obj)
+        Usuario.objects.dar_de_baja(obj)
+        transaction.on_commit(depurador.despertar)
+
+    def delete_queryset(self, request, queryset):
+        if not settings.BAJAS_USUARIOS['LOGICA']:
+            return super().delete_queryset(request, queryset)
+        for usuario in queryset:
+            Usuario.objects.dar_de_baja(usuario)
+        transaction.on_commit(depurador.despertar)
+
+
+@admin.register(Rol)
+class RolAdmin(admin.ModelAdmin):
+    list_display = ['name', 'descripcion']
+    search_fields = ['name']
+    ordering = ['name']
@@ -1,5 +1,18 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class UsuariosConfig(AppConfig):
     name = 'usuarios'
+
+    def ready(self):
+        from .cambios import conectar_senales as conectar_senales_cambios
+        from .eventos import conectar_senales as conectar_senales_eventos
+        from .tokens_verificados import conectar_senales as conectar_senales_tokens
+        conectar_senales_cambios()
+        conectar_senales_eventos()
+        conectar_senales_tokens()
+
+        if settings.USUARIOS_SHARDS:
+            from .shards import conectar_senales
+            conectar_senales()
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import alogin
+from django.contrib.auth.hashers import check_password, make_password
+from django.contrib.auth.models import AnonymousUser
+from django.http import JsonResponse
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+
+from .backends import JWTAutenticacionCacheada
+from .models import Usuario
+from .perfiles import datos_usuario
+from .shards import buscar_por_identificador
+from .tokens import RefreshTokenUsuario
+
+logger = logging.getLogger(__name__)
+
+# El hash de contraseñas (PBKDF2) es CPU puro y libera el GIL:
+# se ejecuta en un pool propio para no bloquear el event loop
+_pool_hash = ThreadPoolExecutor(
+    max_workers=getattr(settings, 'HASH_THREADS', None),
+    thread_name_prefix='hash'
+)
+_jwt = JWTAutenticacionCacheada()
+
+
+async def autenticar_jwt(request):
+    """
+    Equivalente async de JWTAutenticacionCacheada.authenticate.
+    La validación del token es CPU; el usuario se carga con el ORM async
+    junto a su rol, para que rol_obligatorio no consulte la base.
+    """
+    header = _jwt.get_header(request)
+    if header is None:
+        return AnonymousUser()
+    raw_token = _jwt.get_raw_token(header)
+    if raw_token is None:
+        return AnonymousUser()
+
+    validated_token = _jwt.get_validated_token(raw_token)
+    try:
+        user_id = validated_token[api_settings.USER_ID_CLAIM]
+    except KeyError:
+        raise AuthenticationFailed("El token no contiene identificación de usuario")
+
+    try:
+        user = await Usuario.objects.select_related('rol_usuario').aget(
+            **{api_settings.USER_ID_FIELD: user_id}
+        )
+    except Usuario.DoesNotExist:
+        raise AuthenticationFailed("Usuario no encontrado")
+
+    if not user.is_active:
+        raise AuthenticationFailed("Usuario inactivo")
+    return user
+
+
+class AsyncAPIView(View):
+    """
+    Base para vistas async de la API.
+    Autentica con JWT igual que las vistas DRF y responde con JsonResponse.
+    """
+    requiere_autenticacion = True
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Igual que APIView: la API usa JWT, no cookies de sesión
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def autenticar(self, request):
+        return await autenticar_jwt(request)
+
+    async def dispatch(self, request, *args, **kwargs):
+        if self.requiere_autenticacion:
+            try:
+                request.user = await self.autenticar(request)
+            except AuthenticationFailed as exc:
+                # Mismo cuerpo que genera el manejador de excepciones de DRF
+                cuerpo = exc.detail if isinstance(exc.detail, dict) else {"detail": exc.detail}
+                return JsonResponse(cuerpo, status=exc.status_code)
+            if not request.user.is_authenticated:
+                return JsonResponse(
+                    {"detail": "Las credenciales de autenticación no se proveyeron."},
+                    status=status.HTTP_401_UNAUTHORIZED
+                )
+        return await super().dispatch(request, *args, **kwargs)
+
+
+async def _autenticar_credenciales(username_email, password):
+    """
+    Igual que UsernameEmailBackend: probar el usuario de ese username y,
+    si no sirve, el de ese email, verificando la contraseña en el pool de
+    hash. Si no hay usuario se calcula un hash igualmente, para no revelar
+    por tiempo de respuesta si existe.
+    """
+    candidatos = buscar_por_identificador(username_email)
+    siguiente = sync_to_async(next)
+    loop = asyncio.get_running_loop()
+    encontrado = False
+    while True:
+        user = await siguiente(candidatos, None)
+        if user is None:
+            break
+        encontrado = True
+        valida = await loop.run_in_executor(_pool_hash, check_password, password, user.password)
+        if valida and user.is_active:
+            return user
+
+    if not encontrado:
+        await loop.run_in_executor(_pool_hash, make_password, password)
+    return None
+
+
+class LoginAsyncView(AsyncAPIView):
+    """
+    Versión async de LoginView.
+    Misma entrada y salida: username/email + password -> tokens + usuario.
+    """
+    requiere_autenticacion = False
+
+    async def post(self, request):
+        try:
+            datos = json.loads(request.body or b'{}')
+        except ValueError:
+            return JsonResponse({"error": "JSON inválido"}, status=status.HTTP_400_BAD_REQUEST)
+
+        username_email = datos.get('username_email')
+        password = datos.get('password')
+        if not username_email or not password:
+            return JsonResponse(
+                {"non_field_errors": ["Debe proporcionar username/email y contraseña."]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = await _autenticar_credenciales(username_email, password)
+        if user is None:
+            return JsonResponse(
+                {"non_field_errors": [
+                    "Credenciales inválidas. Verifica tu usuario/email y contraseña."
+                ]},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Emitir el refresh registra el token pendiente (escritura síncrona)
+        refresh = await sync_to_async(RefreshTokenUsuario.for_user)(user)
+        response_data = {
+            'refresh': str(refresh),
+            'access': str(refresh.access_token),
+            'user': datos_usuario(request, user)
+        }
+
+        await alogin(request, user)
+
+        logger.info(
+            "Login exitoso: %s (%s)", user.username, user.rol_usuario.name,
+            extra={'evento': 'login_exitoso', 'usuario': user.username}
+        )
+        return JsonResponse(response_data, status=status.HTTP_200_OK)
+
+
+def _revocar(refresh_token):
+    RefreshTokenUsuario(refresh_token).revocar()
+
+
+class LogoutAsyncView(AsyncAPIView):
+    """
+    Versión async de LogoutView.
+    """
+
+    async def post(self, request):
+        try:
+            datos = json.loads(request.body or b'{}')
+            refresh_token = datos.get("refresh")
+            if not refresh_token:
+                return JsonResponse(
+                    {"error": "Se requiere refresh token"},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            # La revocación es un UPDATE con el ORM síncrono
+            await sync_to_async(_revocar)(refresh_token)
+        except Exception as e:
+            logger.error("Error en logout: %s", e, extra={'evento': 'logout_error'})
+            return JsonResponse(
+                {"error": "Error al cerrar sesión"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        logger.info(
+            "Logout exitoso: %s", request.user.username,
+            extra={'evento': 'logout_exitoso', 'usuario': request.user.username}
+        )
+        return JsonResponse(
+            {"message": "Sesión cerrada correctamente"},
+            status=status.HTTP_200_OK
+        )
+
+
+class CurrentUserAsyncView(AsyncAPIView):
+    """
+    Versión async de CurrentUserView.
+    El usuario ya viene cargado con su rol desde autenticar_jwt.
+    """
+
+    async def get(self, request):
+        return JsonResponse(datos_usuario(request, request.user), status=status.HTTP_200_OK)
@@ -0,0 +1,43 @@
+from django.contrib.auth.backends import ModelBackend
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .models import Usuario
+from .shards import buscar_por_identificador
+from .tokens_verificados import cache_tokens
+
+
+class UsernameEmailBackend(ModelBackend):
+    """
+    Autentica con username o, si no existe o la contraseña no coincide,
+    con email; cada búsqueda usa un índice (con sharding, el del
+    directorio global).
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(Usuario.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        encontrado = False
+        # Username y, si no sirve, email: la búsqueda del email solo se
+        # hace si hace falta
+        for user in buscar_por_identificador(username):
+            encontrado = True
+            if user.check_password(password) and self.user_can_authenticate(user):
+                return user
+        if not encontrado:
+            # Igual que ModelBackend: calcular un hash para no revelar por
+            # tiempo de respuesta si el usuario existe
+            Usuario().set_password(password)
+        return None
+
+
+class JWTAutenticacionCacheada(JWTAuthentication):
+    """
+    JWTAuthentication que no vuelve a verificar un access token ya visto
+    (usuarios/tokens_verificados.py). get_user no cambia.
+    """
+
+    def get_validated_token(self, raw_token):
+        return cache_tokens.obtener(raw_token, super().get_validated_token)
@@ -0,0 +1,86 @@
+"""
+Feed de cambios de usuarios (GET /api/admin/usuarios/cambios/?since=).
+
+Cada alta o modificación de un Usuario toma el siguiente valor de
+SecuenciaCambios en su seq_cambio, y cada baja (lógica o definitiva) deja
+una lápida (UsuarioEliminado) con el suyo. Un cliente que guarda el último cursor
+recibe solo lo que cambió desde entonces, en orden y por páginas: el costo
+depende de la cantidad de cambios y no del tamaño de la tabla.
+
+El cursor es la última secuencia entregada; con sharding, una por shard
+separadas por puntos (cada shard tiene su propia secuencia).
+"""
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.db.models.signals import post_delete
+
+from .models import SecuenciaCambios, Usuario, UsuarioEliminado
+from .paginacion import CursorInvalido
+
+
+def _bases():
+    return settings.USUARIOS_SHARDS_ALIAS or [None]
+
+
+def decodificar_cursor_cambios(cursor):
+    """Posición por base; sin cursor, desde el principio."""
+    bases = _bases()
+    if not cursor:
+        return [0] * len(bases)
+    try:
+        posiciones = [int(parte) for parte in cursor.split('.')]
+    except ValueError:
+        raise CursorInvalido(cursor)
+    if len(posiciones) != len(bases) or min(posiciones) < 0:
+        raise CursorInvalido(cursor)
+    return posiciones
+
+
+def codificar_cursor_cambios(posiciones):
+    return '.'.join(str(posicion) for posicion in posiciones)
+
+
+def _desde(modelo, alias, posicion, limite):
+    queryset = modelo.objects.using(alias) if alias else modelo.objects.all()
+    return queryset.filter(seq_cambio__gt=posicion).order_by('seq_cambio')[:limite + 1]
+
+
+def cambios_desde(cursor, limite):
+    """
+    Usuarios modificados y lápidas posteriores al cursor, hasta `limite`
+    por base. Retorna (usuarios, eliminados, cursor_nuevo, hay_mas).
+    Lanza CursorInvalido si el cursor no corresponde a estas bases.
+    """
+    posiciones = decodificar_cursor_cambios(cursor)
+    usuarios, eliminados, nuevas = [], [], []
+    hay_mas = False
+    for alias, posicion in zip(_bases(), posiciones):
+        modificados = list(_desde(Usuario, alias, posicion, limite).select_related('rol_usuario'))
+        lapidas = list(_desde(UsuarioEliminado, alias, posicion, limite))
+        hay_mas = hay_mas or len(modificados) + len(lapidas) > limite
+
+        mezcla = list(islice(
+            heapq.merge(modificados, lapidas, key=lambda fila: fila.seq_cambio), limite
+        ))
+        for fila in mezcla:
+            (eliminados if isinstance(fila, UsuarioEliminado) else usuarios).append(fila)
+        nuevas.append(mezcla[-1].seq_cambio if mezcla else posicion)
+    return usuarios, eliminados, codificar_cursor_cambios(nuevas), hay_mas
+
+
+def _usuario_eliminado(sender, instance, using, **kwargs):
+    # Con baja lógica la lápida ya se creó en dar_de_baja
+    if instance.eliminado_en is not None:
+        return
+    # Dentro de la transacción del borrado: la lápida sale con él
+    UsuarioEliminado.objects.using(using).create(
+        usuario_id=instance.pk,
+        username=instance.username,
+        seq_cambio=SecuenciaCambios.objects.db_manager(using).reservar(SecuenciaCambios.USUARIOS),
+    )
+
+
+def conectar_senales():
+    post_delete.connect(_usuario_eliminado, sender=Usuario, dispatch_uid='cambios_usuario_eliminado')
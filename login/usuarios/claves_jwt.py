@@ -0,0 +1,257 @@
+"""
+Claves asimétricas para firmar los JWT (settings.JWT_CLAVES).
+
+Cada clave es un archivo <kid>.pem con la clave privada (Ed25519 o RSA)
+en JWT_CLAVES['DIRECTORIO']; el kid es su fecha de creación en UTC. Todas
+se publican en /.well-known/jwks.json y se firma con la más nueva que
+lleve publicada al menos PUBLICACION_PREVIA, para que quien tenga el JWKS
+en cache ya la conozca cuando aparezcan tokens firmados con ella. Las
+claves nuevas se crean con `manage.py rotar_clave_jwt`.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+
+import jwt
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ed25519, rsa
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.translation import gettext_lazy as _
+from jwt.algorithms import OKPAlgorithm, RSAAlgorithm
+from rest_framework_simplejwt.backends import TokenBackend
+from rest_framework_simplejwt.exceptions import TokenBackendError, TokenBackendExpiredToken
+from rest_framework_simplejwt.settings import api_settings
+
+logger = logging.getLogger(__name__)
+
+FORMATO_KID = '%Y%m%dT%H%M%SZ'
+ALGORITMOS = ['EdDSA', 'RS256']
+
+
+def generar_clave(directorio, algoritmo='EdDSA'):
+    """Crear una clave privada nueva en `directorio` y devolver su kid."""
+    if algoritmo == 'EdDSA':
+        privada = ed25519.Ed25519PrivateKey.generate()
+    elif algoritmo == 'RS256':
+        privada = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    else:
+        raise ValueError(f"Algoritmo no soportado: {algoritmo}")
+
+    kid = datetime.now(timezone.utc).strftime(FORMATO_KID)
+    pem = privada.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    os.makedirs(directorio, exist_ok=True)
+    # Solo legible por el dueño; O_EXCL evita pisar una clave existente
+    fd = os.open(os.path.join(directorio, f'{kid}.pem'), os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'wb') as archivo:
+        archivo.write(pem)
+    return kid
+
+
+class Clave:
+    """Clave de firma cargada: privada, pública y su JWK público."""
+
+    def __init__(self, kid, privada):
+        self.kid = kid
+        self.creada = datetime.strptime(kid, FORMATO_KID).replace(tzinfo=timezone.utc)
+        self.privada = privada
+        self.publica = privada.public_key()
+        if isinstance(privada, ed25519.Ed25519PrivateKey):
+            self.algoritmo = 'EdDSA'
+            jwk = OKPAlgorithm.to_jwk(self.publica, as_dict=True)
+        else:
+            self.algoritmo = 'RS256'
+            jwk = RSAAlgorithm.to_jwk(self.publica, as_dict=True)
+        self.jwk = {**jwk, 'kid': kid, 'alg': self.algoritmo, 'use': 'sig'}
+
+
+def _cargar(directorio):
+    claves = {}
+    for nombre in sorted(os.listdir(directorio)):
+        kid, extension = os.path.splitext(nombre)
+        if extension != '.pem':
+            continue
+        with open(os.path.join(directorio, nombre), 'rb') as archivo:
+            privada = serialization.load_pem_private_key(archivo.read(), password=None)
+        try:
+            claves[kid] = Clave(kid, privada)
+        except ValueError:
+            logger.warning("Clave JWT ignorada, nombre no válido: %s", nombre)
+    return claves
+
+
+class AlmacenClaves:
+    """
+    Claves del directorio en memoria. El directorio se vuelve a leer si
+    cambió, como mucho cada REVISION segundos, o antes si llega un token
+    con un kid desconocido (una clave creada por otro proceso).
+    """
+    REVISION = 60
+    REVISION_KID_DESCONOCIDO = 1
+
+    def __init__(self, directorio, publicacion_previa, crear_si_falta=False):
+        self.directorio = str(directorio)
+        self.publicacion_previa = publicacion_previa
+        self.crear_si_falta = crear_si_falta
+        self._claves = {}
+        self._lock = threading.Lock()
+        self._lock_creacion = threading.Lock()
+        self._marca = None
+        self._revisado = None
+
+    def _revisar(self, intervalo):
+        ahora = time.monotonic()
+        if self._revisado is not None and ahora - self._revisado < intervalo:
+            return
+        with self._lock:
+            if self._revisado is not None and ahora - self._revisado < intervalo:
+                return
+            try:
+                marca = os.stat(self.directorio).st_mtime_ns
+            except FileNotFoundError:
+                marca = None
+            if marca != self._marca:
+                self._claves = _cargar(self.directorio) if marca is not None else {}
+                self._marca = marca
+            self._revisado = ahora
+
+    def claves(self):
+        self._revisar(self.REVISION)
+        if not self._claves:
+            if not self.crear_si_falta:
+                raise ImproperlyConfigured(
+                    f"No hay claves JWT en {self.directorio}: ejecutar manage.py rotar_clave_jwt"
+                )
+            with self._lock_creacion:
+                # Otro hilo pudo crearla mientras se esperaba el lock
+                self._revisar(0)
+                if not self._claves:
+                    try:
+                        kid = generar_clave(self.directorio)
+                        logger.warning("Clave JWT de desarrollo creada: %s", kid)
+                    except FileExistsError:
+                        # Otro proceso la creó en el mismo segundo
+                        pass
+                    self._revisar(0)
+        return list(self._claves.values())
+
+    def clave(self, kid):
+        """Clave con ese kid, o None."""
+        self._revisar(self.REVISION)
+        if kid not in self._claves:
+            self._revisar(self.REVISION_KID_DESCONOCIDO)
+        return self._claves.get(kid)
+
+    def firmante(self, ahora=None):
+        """
+        La clave más nueva publicada hace al menos PUBLICACION_PREVIA, o la
+        más vieja si ninguna lo está (primera clave del despliegue).
+        """
+        claves = self.claves()
+        ahora = ahora or datetime.now(timezone.utc)
+        publicadas = [c for c in claves if c.creada + self.publicacion_previa <= ahora]
+        return publicadas[-1] if publicadas else claves[0]
+
+    def jwks(self):
+        return {'keys': [clave.jwk for clave in self.claves()]}
+
+
+class BackendClavesJWT(TokenBackend):
+    """
+    TokenBackend de simplejwt que firma con la clave vigente del almacén
+    (cabecera 'kid') y verifica con la clave pública que indique el token.
+    Con JWT_CLAVES['HS256_HASTA'] (el momento del cambio a claves
+    asimétricas) también acepta los tokens sin kid firmados con SIGNING_KEY,
+    solo si se emitieron antes del cambio y solo hasta que venza el último
+    refresh de entonces (REFRESH_TOKEN_LIFETIME después). SIGNING_KEY puede
+    ser conocida, así que pasado ese plazo se rechazan siempre.
+    """
+
+    def __init__(self, almacen, hs256_hasta=None):
+        super().__init__(
+            'EdDSA',
+            audience=api_settings.AUDIENCE,
+            issuer=api_settings.ISSUER,
+            leeway=api_settings.LEEWAY,
+            json_encoder=api_settings.JSON_ENCODER,
+        )
+        self.almacen = almacen
+        if hs256_hasta is not None and hs256_hasta.tzinfo is None:
+            hs256_hasta = hs256_hasta.replace(tzinfo=timezone.utc)
+        self.hs256_hasta = hs256_hasta
+
+    def acepta_hs256(self, ahora=None):
+        if self.hs256_hasta is None:
+            return False
+        ahora = ahora or datetime.now(timezone.utc)
+        return ahora < self.hs256_hasta + api_settings.REFRESH_TOKEN_LIFETIME
+
+    def encode(self, payload):
+        clave = self.almacen.firmante()
+        jwt_payload = payload.copy()
+        if self.audience is not None:
+            jwt_payload['aud'] = self.audience
+        if self.issuer is not None:
+            jwt_payload['iss'] = self.issuer
+        return jwt.encode(
+            jwt_payload,
+            clave.privada,
+            algorithm=clave.algoritmo,
+            headers={'kid': clave.kid},
+            json_encoder=self.json_encoder,
+        )
+
+    def _clave_verificacion(self, token):
+        cabecera = jwt.get_unverified_header(token)
+        kid = cabecera.get('kid')
+        if kid is None:
+            if cabecera.get('alg') == 'HS256' and self.acepta_hs256():
+                return api_settings.SIGNING_KEY, 'HS256'
+            raise jwt.InvalidTokenError("Token sin kid")
+        clave = self.almacen.clave(kid)
+        if clave is None:
+            raise jwt.InvalidTokenError("kid desconocido")
+        return clave.publica, clave.algoritmo
+
+    def _emitido_antes_del_cambio(self, payload):
+        iat = payload.get('iat')
+        if not isinstance(iat, (int, float)):
+            return False
+        return datetime.fromtimestamp(iat, timezone.utc) < self.hs256_hasta
+
+    def decode(self, token, verify=True):
+        try:
+            clave, algoritmo = self._clave_verificacion(token) if verify else (None, None)
+            payload = jwt.decode(
+                token,
+                clave,
+                algorithms=[algoritmo] if algoritmo else None,
+                audience=self.audience,
+                issuer=self.issuer,
+                leeway=self.get_leeway(),
+                options={
+                    'verify_aud': self.audience is not None,
+                    'verify_signature': verify,
+                },
+            )
+            if algoritmo == 'HS256' and not self._emitido_antes_del_cambio(payload):
+                raise jwt.InvalidTokenError("Token HS256 emitido después del cambio de claves")
+            return payload
+        except jwt.ExpiredSignatureError as e:
+            raise TokenBackendExpiredToken(_("Token is expired")) from e
+        except jwt.InvalidTokenError as e:
+            raise TokenBackendError(_("Token is invalid")) from e
+
+
+almacen = AlmacenClaves(
+    settings.JWT_CLAVES['DIRECTORIO'],
+    settings.JWT_CLAVES['PUBLICACION_PREVIA'],
+    crear_si_falta=settings.JWT_CLAVES['CREAR_SI_FALTA'],
+)
+backend = BackendClavesJWT(almacen, hs256_hasta=settings.JWT_CLAVES['HS256_HASTA'])
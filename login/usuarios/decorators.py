@@ -1,7 +1,8 @@
 from functools import wraps
 from rest_framework.response import Response
 from rest_framework import status
-from django.contrib import messages
+from django.http import JsonResponse
+import inspect
 import logging
 
 logger = logging.getLogger(__name__)
@@ -16,6 +17,8 @@ def rol_obligatorio(roles_permitidos=None):
         @rol_obligatorio(roles_permitidos=["Admin", "Estudiante"])
         def get(self, request):
             ...
+
+    También acepta métodos `async def`; en ese caso el wrapper es async.
     
     Args:
         roles_permitidos: Lista de nombres de roles que pueden acceder.
@@ -28,40 +31,24 @@ def rol_obligatorio(roles_permitidos=None):
         roles_permitidos = []
 
     def decorator(view_func):
+        # Las vistas async (ver async_views.py) responden con JsonResponse,
+        # ya que no pasan por los renderers de DRF
+        if inspect.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(self, request, *args, **kwargs):
+                rechazo = _verificar_rol(request, roles_permitidos)
+                if rechazo is not None:
+                    return JsonResponse(rechazo[0], status=rechazo[1])
+                return await view_func(self, request, *args, **kwargs)
+
+            return async_wrapper
+
         @wraps(view_func)
         def wrapper(self, request, *args, **kwargs):
-            # Verificar si el usuario está autenticado
-            if not request.user or not request.user.is_authenticated:
-                logger.warning(f"Acceso denegado: usuario no autenticado")
-                return Response(
-                    {"error": "Debe iniciar sesión para acceder a este recurso"},
-                    status=status.HTTP_401_UNAUTHORIZED
-                )
-            
-            # Verificar si el usuario tiene rol
-            if not hasattr(request.user, 'rol_usuario') or not request.user.rol_usuario:
-                logger.warning(f"Usuario {request.user.username} no tiene rol asignado")
-                return Response(
-                    {"error": "Usuario sin rol asignado. Contacte al administrador."},
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
-            # Verificar si el rol está en los permitidos
-            rol_usuario = request.user.rol_usuario.name
-            if rol_usuario not in roles_permitidos:
-                logger.warning(
-                    f"Usuario {request.user.username} con rol {rol_usuario} "
-                    f"intentó acceder a recurso que requiere {roles_permitidos}"
-                )
-                return Response(
-                    {
-                        "error": "No tiene permisos suficientes para acceder a este recurso",
-                        "required_roles": roles_permitidos,
-                        "user_role": rol_usuario
-                    },
-                    status=status.HTTP_403_FORBIDDEN
-                )
-            
+            rechazo = _verificar_rol(request, roles_permitidos)
+            if rechazo is not None:
+                return Response(rechazo[0], status=rechazo[1])
+
             # Todo OK, ejecutar la vista
             return view_func(self, request, *args, **kwargs)
         
@@ -69,6 +56,51 @@ def rol_obligatorio(roles_permitidos=None):
     return decorator
 
 
+def _verificar_rol(request, roles_permitidos):
+    """
+    Retorna (cuerpo, status) si el acceso se rechaza, o None si se permite.
+    No consulta la base: en vistas async el rol debe venir precargado
+    con select_related.
+    """
+    # Verificar si el usuario está autenticado
+    if not request.user or not request.user.is_authenticated:
+        logger.warning("Acceso denegado: usuario no autenticado", extra={'evento': 'acceso_denegado'})
+        return (
+            {"error": "Debe iniciar sesión para acceder a este recurso"},
+            status.HTTP_401_UNAUTHORIZED
+        )
+
+    # Verificar si el usuario tiene rol
+    if not hasattr(request.user, 'rol_usuario') or not request.user.rol_usuario:
+        logger.warning(
+            "Usuario %s no tiene rol asignado", request.user.username,
+            extra={'evento': 'acceso_denegado', 'usuario': request.user.username}
+        )
+        return (
+            {"error": "Usuario sin rol asignado. Contacte al administrador."},
+            status.HTTP_403_FORBIDDEN
+        )
+
+    # Verificar si el rol está en los permitidos
+    rol_usuario = request.user.rol_usuario.name
+    if rol_usuario not in roles_permitidos:
+        logger.warning(
+            "Usuario %s con rol %s intentó acceder a recurso que requiere %s",
+            request.user.username, rol_usuario, roles_permitidos,
+            extra={'evento': 'acceso_denegado', 'usuario': request.user.username}
+        )
+        return (
+            {
+                "error": "No tiene permisos suficientes para acceder a este recurso",
+                "required_roles": roles_permitidos,
+                "user_role": rol_usuario
+            },
+            status.HTTP_403_FORBIDDEN
+        )
+
+    return None
+
+
 # Versión simplificada para usar en vistas basadas en función
 def rol_obligatorio_func(roles_permitidos=None):
     """
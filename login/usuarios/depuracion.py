@@ -0,0 +1,134 @@
+"""
+Borrado definitivo de los usuarios dados de baja (settings.BAJAS_USUARIOS).
+
+La baja lógica (Usuario.objects.dar_de_baja) es un UPDATE de costo fijo.
+Sus tokens, familias, actividad, ofertas, grupos y permisos se borran
+después, aquí: por tabla, en lotes de LOTE filas, cada lote en su propia
+transacción corta y con una PAUSA entre lotes para soltar el lock de
+escritura de SQLite. Al final el usuario se borra sin nada que arrastrar.
+
+Un hilo por proceso se despierta con cada baja y trabaja hasta que no
+queda ninguna pendiente; `manage.py depurar_bajas` hace lo mismo a mano
+(p. ej. para bajas que quedaron pendientes al reiniciar).
+"""
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import CASCADE
+
+from .models import Usuario
+
+logger = logging.getLogger(__name__)
+
+
+def _relaciones():
+    """(modelo, campo) de las filas que un usuario borra en cascada."""
+    for relacion in Usuario._meta.related_objects:
+        if relacion.on_delete is CASCADE:
+            yield relacion.related_model, relacion.field.name
+    # Tablas intermedias de groups y user_permissions
+    for campo in Usuario._meta.many_to_many:
+        yield campo.remote_field.through, campo.m2m_field_name()
+
+
+def _borrar(modelo, alias, ids):
+    # Los modelos con contadores denormalizados (empresas.models) los
+    # descuentan al borrar con el borrar_en_lote de su manager
+    manager = modelo._default_manager.db_manager(alias)
+    if hasattr(manager, 'borrar_en_lote'):
+        return manager.borrar_en_lote(ids)
+    return modelo._base_manager.using(alias).filter(pk__in=ids).delete()[0]
+
+
+def depurar_usuario(usuario, lote, pausa=0):
+    """Borrar en lotes lo que depende de `usuario` y luego el usuario. Retorna las filas borradas."""
+    total = 0
+    for modelo, campo in _relaciones():
+        alias = router.db_for_write(modelo, instance=usuario)
+        filas = modelo._base_manager.using(alias)
+        while True:
+            ids = list(filas.filter(**{campo: usuario.pk}).values_list('pk', flat=True)[:lote])
+            if not ids:
+                break
+            total += _borrar(modelo, alias, ids)
+            if pausa:
+                time.sleep(pausa)
+    return total + usuario.delete()[0]
+
+
+def pendientes(limite=100):
+    """Usuarios dados de baja aún sin borrar, de todas las bases."""
+    for alias in settings.USUARIOS_SHARDS_ALIAS or ['default']:
+        yield from Usuario._base_manager.using(alias).filter(
+            eliminado_en__isnull=False
+        ).order_by('eliminado_en')[:limite]
+
+
+def depurar_bajas(lote, pausa=0):
+    """
+    Depurar todas las bajas pendientes. Retorna (usuarios, filas).
+    Un usuario que falla se registra y se saltea: queda pendiente para
+    la próxima vez, sin frenar a los que vienen después.
+    """
+    usuarios = filas = 0
+    fallidos = set()
+    while True:
+        tanda = [usuario for usuario in pendientes(limite=100 + len(fallidos))
+                 if (usuario._state.db, usuario.pk) not in fallidos]
+        if not tanda:
+            return usuarios, filas
+        for usuario in tanda:
+            try:
+                filas += depurar_usuario(usuario, lote, pausa)
+            except Exception:
+                fallidos.add((usuario._state.db, usuario.pk))
+                logger.exception(
+                    "Error depurando la baja de %s", usuario.pk,
+                    extra={'evento': 'bajas_error', 'usuario': usuario.username}
+                )
+                continue
+            usuarios += 1
+
+
+class Depurador:
+    """Hilo en segundo plano que corre depurar_bajas() cuando se lo despierta."""
+
+    def __init__(self, lote, pausa):
+        self.lote = lote
+        self.pausa = pausa
+        self._despertar = threading.Event()
+        self._lock = threading.Lock()
+        self._hilo = None
+        self._pid = None
+
+    def despertar(self):
+        with self._lock:
+            # Tras un fork (workers de gunicorn) el hilo del padre no existe
+            if self._hilo is None or self._pid != os.getpid():
+                self._pid = os.getpid()
+                self._hilo = threading.Thread(target=self._bucle, name='depurador-bajas', daemon=True)
+                self._hilo.start()
+        self._despertar.set()
+
+    def _bucle(self):
+        while True:
+            self._despertar.wait()
+            self._despertar.clear()
+            try:
+                usuarios, filas = depurar_bajas(self.lote, self.pausa)
+                if usuarios:
+                    logger.info(
+                        "Bajas depuradas: %s usuarios, %s filas", usuarios, filas,
+                        extra={'evento': 'bajas_depuradas'}
+                    )
+            except Exception:
+                logger.exception("Error depurando bajas de usuarios", extra={'evento': 'bajas_error'})
+            # Cada hilo tiene sus propias conexiones; no se dejan abiertas
+            connections.close_all()
+
+
+depurador = Depurador(settings.BAJAS_USUARIOS['LOTE'], settings.BAJAS_USUARIOS['PAUSA'])
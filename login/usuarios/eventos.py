@@ -0,0 +1,150 @@
+"""
+Eventos de cambios de usuarios para el stream SSE de administración
+(GET /api/admin/eventos/, admin/async_views.py).
+
+Cada evento es compacto (acción, id, username, is_active, rol) y lleva la
+secuencia del feed de cambios (cambios.py), así que un cliente puede
+retomar con el cursor donde quedó o, si se atrasa, ponerse al día con
+/api/admin/usuarios/cambios/.
+
+settings.EVENTOS_USUARIOS['BROKER'] elige de dónde salen los eventos:
+
+- 'local': de las señales de Usuario y de sus lápidas al confirmar la
+  transacción. Solo ve los cambios hechos en el mismo proceso (un solo
+  worker).
+- 'feed': un hilo por proceso, solo mientras haya clientes conectados,
+  lee el feed de cambios cada INTERVALO_FEED segundos y publica lo nuevo.
+  Ve los cambios de cualquier worker o comando; es el reemplazo local de
+  un broker compartido (Redis, etc.) sin sumar dependencias.
+"""
+import logging
+import threading
+import time
+from functools import partial
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save
+
+from login.eventos import Hub
+from .cambios import _bases, cambios_desde, codificar_cursor_cambios
+from .models import SecuenciaCambios, Usuario, UsuarioEliminado
+
+logger = logging.getLogger(__name__)
+
+GUARDADO = 'guardado'
+ELIMINADO = 'eliminado'
+
+hub = Hub(settings.EVENTOS_USUARIOS['MAX_CLIENTES'])
+
+
+def _indice_base(alias):
+    bases = _bases()
+    return bases.index(alias) if alias in bases else 0
+
+
+def evento_usuario(fila, alias=None):
+    """Evento de un Usuario guardado o de una lápida (UsuarioEliminado)."""
+    indice = _indice_base(alias or fila._state.db)
+    if isinstance(fila, UsuarioEliminado):
+        return {
+            'base': indice, 'seq': fila.seq_cambio, 'accion': ELIMINADO,
+            'id': fila.usuario_id, 'username': fila.username,
+        }
+    return {
+        'base': indice, 'seq': fila.seq_cambio, 'accion': GUARDADO,
+        'id': fila.pk, 'username': fila.username,
+        'is_active': fila.is_active, 'rol': fila.rol_usuario_id,
+    }
+
+
+def posiciones_actuales():
+    """Última secuencia emitida en cada base."""
+    posiciones = []
+    for alias in _bases():
+        manager = SecuenciaCambios.objects.db_manager(alias) if alias else SecuenciaCambios.objects
+        valor = manager.filter(pk=SecuenciaCambios.USUARIOS).values_list('valor', flat=True).first()
+        posiciones.append(valor or 0)
+    return posiciones
+
+
+# Broker 'local'
+
+def _usuario_guardado(sender, instance, using, update_fields, **kwargs):
+    if not len(hub):
+        return
+    # Mismo criterio que Usuario.save: estos guardados no toman secuencia
+    if update_fields is not None and set(update_fields) <= Usuario.CAMPOS_SIN_CAMBIO:
+        return
+    transaction.on_commit(partial(hub.publicar, evento_usuario(instance, using)), using=using)
+
+
+def _lapida_creada(sender, instance, created, using, **kwargs):
+    # Toda baja, lógica o definitiva, deja una lápida
+    if not len(hub) or not created:
+        return
+    transaction.on_commit(partial(hub.publicar, evento_usuario(instance, using)), using=using)
+
+
+# Broker 'feed'
+
+class PublicadorFeed:
+    """Hilo que publica en el hub lo nuevo del feed mientras haya suscriptores."""
+
+    LIMITE = 500
+
+    def __init__(self, hub, intervalo):
+        self.hub = hub
+        self.intervalo = intervalo
+        self._hilo = None
+        self._lock = threading.Lock()
+
+    def asegurar(self):
+        """
+        Arrancar el hilo si no está corriendo. Llamar después de suscribir
+        y antes de leer las posiciones del cliente: el hilo parte de las
+        posiciones actuales, así no queda un hueco entre ambos.
+        """
+        with self._lock:
+            if self._hilo is not None:
+                return
+            cursor = codificar_cursor_cambios(posiciones_actuales())
+            self._hilo = threading.Thread(
+                target=self._correr, args=(cursor,), name='eventos-feed', daemon=True
+            )
+            self._hilo.start()
+
+    def _seguir(self):
+        with self._lock:
+            if not len(self.hub):
+                self._hilo = None
+                return False
+            return True
+
+    def _correr(self, cursor):
+        while self._seguir():
+            time.sleep(self.intervalo)
+            close_old_connections()
+            try:
+                cursor = self._publicar_desde(cursor)
+            except Exception:
+                logger.exception("Error leyendo el feed de cambios", extra={'evento': 'eventos_error'})
+        close_old_connections()
+
+    def _publicar_desde(self, cursor):
+        hay_mas = True
+        while hay_mas:
+            usuarios, eliminados, cursor, hay_mas = cambios_desde(cursor, self.LIMITE)
+            for fila in sorted(usuarios + eliminados, key=lambda fila: fila.seq_cambio):
+                self.hub.publicar(evento_usuario(fila))
+        return cursor
+
+
+publicador_feed = PublicadorFeed(hub, settings.EVENTOS_USUARIOS['INTERVALO_FEED'])
+
+
+def conectar_senales():
+    if settings.EVENTOS_USUARIOS['BROKER'] != 'local':
+        return
+    post_save.connect(_usuario_guardado, sender=Usuario, dispatch_uid='eventos_usuario_guardado')
+    post_save.connect(_lapida_creada, sender=UsuarioEliminado, dispatch_uid='eventos_lapida_creada')
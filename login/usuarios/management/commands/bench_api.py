@@ -0,0 +1,365 @@
+import json
+import logging
+import platform
+import random
+import statistics
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from itertools import count
+from pathlib import Path
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from login.lotes import detener_escritores
+from usuarios.models import Rol, Usuario
+
+ESCALAS = {'1k': 1_000, '100k': 100_000, '1m': 1_000_000}
+LOTE = 10_000
+PASSWORD = 'Bench12345!'
+# Por encima de este tamaño el listado sin filtros (sin paginación)
+# tardaría minutos por petición: solo se mide con búsqueda
+MAXIMO_LISTADO_COMPLETO = 10_000
+
+
+def percentil(tiempos, p):
+    return tiempos[min(len(tiempos) - 1, int(len(tiempos) * p))] if tiempos else 0
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de todos los endpoints de la API con clientes concurrentes "
+        "en proceso sobre una base temporal sembrada a la escala pedida. "
+        "Reporta req/s, p50/p95/p99, consultas y bytes por endpoint; guarda una "
+        "línea base en JSON y la compara con una anterior."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--escala', choices=list(ESCALAS), default='1k')
+        parser.add_argument('--usuarios', type=int, help="Cantidad exacta de usuarios (ignora --escala)")
+        parser.add_argument('--concurrencia', type=int, default=8, help="Clientes en paralelo")
+        parser.add_argument('--peticiones', type=int, default=200, help="Peticiones por endpoint")
+        parser.add_argument('--endpoint', action='append', help="Medir solo estos endpoints (repetible)")
+        parser.add_argument('--salida', help="Guardar los resultados en este JSON")
+        parser.add_argument('--comparar', help="JSON de línea base contra el que comparar")
+        parser.add_argument('--umbral', type=float, default=0.2,
+                            help="Empeoramiento relativo tolerado (0.2 = 20%%)")
+        parser.add_argument('--semilla', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if settings.USUARIOS_SHARDS:
+            raise CommandError("El benchmark usa solo 'default': ejecutarlo sin DJANGO_USUARIOS_SHARDS")
+        random.seed(options['semilla'])
+        total = options['usuarios'] or ESCALAS[options['escala']]
+
+        # Nunca se toca la base configurada. La base temporal es un archivo
+        # (y no memoria compartida) para que los hilos escriban sin
+        # "database table is locked".
+        with tempfile.TemporaryDirectory() as directorio:
+            connection.settings_dict['TEST']['NAME'] = str(Path(directorio) / 'bench_api.sqlite3')
+            nombre_original = connection.settings_dict['NAME']
+            connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            setup_test_environment()
+            # Un log JSON por petición taparía el reporte (igual que en los tests)
+            logging.disable(logging.WARNING)
+            try:
+                self.sembrar(total)
+                resultados = self.medir(total, options)
+            finally:
+                logging.disable(logging.NOTSET)
+                teardown_test_environment()
+                # Lo que quede en los escritores en lotes iría a la base ya borrada
+                detener_escritores(escribir=False)
+                connection.creation.destroy_test_db(nombre_original, verbosity=0)
+
+        self.reportar(resultados)
+        documento = {
+            'meta': {
+                'usuarios': total,
+                'concurrencia': options['concurrencia'],
+                'peticiones': options['peticiones'],
+                'fecha': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+            },
+            'endpoints': resultados,
+        }
+        if options['salida']:
+            Path(options['salida']).write_text(json.dumps(documento, indent=2))
+            self.stdout.write(f"Resultados guardados en {options['salida']}")
+        if options['comparar']:
+            self.comparar(documento, options['comparar'], options['umbral'])
+
+    # Carga de datos
+
+    def sembrar(self, total):
+        inicio = time.perf_counter()
+        roles = {
+            nombre: Rol.objects.create(name=nombre)
+            for nombre in ("Admin", "Estudiante", "Empresa")
+        }
+        # Un solo hash para todos: hashear un millón de contraseñas
+        # dominaría el tiempo de carga
+        password = make_password(PASSWORD)
+        ahora = timezone.now()
+
+        Usuario.objects.create(
+            username='bench_admin', email='bench_admin@bench.local', password=password,
+            rol_usuario=roles['Admin'], is_staff=True
+        )
+        for desde in range(0, total, LOTE):
+            Usuario.objects.bulk_create([
+                Usuario(
+                    username=f'usuario{i}',
+                    email=f'usuario{i}@bench.local',
+                    first_name=f'Nombre{i}',
+                    last_name=f'Apellido{i}',
+                    password=password,
+                    # 70% estudiantes, 30% empresas
+                    rol_usuario=roles['Empresa' if i % 10 >= 7 else 'Estudiante'],
+                    date_joined=ahora - timedelta(seconds=i),
+                )
+                for i in range(desde, min(desde + LOTE, total))
+            ])
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+
+        self.roles = roles
+        self.total = total
+        self.stdout.write(f"Carga: {total} usuarios en {time.perf_counter() - inicio:.1f}s")
+
+    # Escenarios
+
+    def escenarios(self, total):
+        """(nombre, actor, función(estado, i) -> (método, ruta, datos))"""
+        def usuario_al_azar():
+            return f'usuario{random.randrange(total)}'
+
+        def estudiante_al_azar():
+            # i % 10 < 7 -> Estudiante
+            return f'usuario{random.randrange(total // 10 or 1) * 10}'
+
+        def id_al_azar():
+            return self.primer_id + random.randrange(total)
+
+        creados = []
+        secuencia = count()
+
+        def crear(estado, i):
+            return 'post', '/api/admin/usuarios/', {
+                'username': f'bench_nuevo{next(secuencia)}',
+                'email': 'nuevo@bench.local',
+                'first_name': 'Nuevo',
+                'last_name': 'Usuario',
+                'rol_id': self.roles['Estudiante'].id,
+                'password': PASSWORD,
+            }
+
+        def creado(i):
+            return creados[i % len(creados)]
+
+        escenarios = [
+            ('auth/login', None, lambda estado, i: ('post', '/api/auth/login/', {
+                'username_email': usuario_al_azar(), 'password': PASSWORD,
+            })),
+            ('auth/login (email)', None, lambda estado, i: ('post', '/api/auth/login/', {
+                'username_email': f'{usuario_al_azar()}@bench.local', 'password': PASSWORD,
+            })),
+            # Contra 'auth/login': lo que ahorra el perfil de sesión por login
+            ('auth/login (completo)', None, lambda estado, i: ('post', '/api/auth/login/?perfil=completo', {
+                'username_email': usuario_al_azar(), 'password': PASSWORD,
+            })),
+            # El refresh rota el token: cada cliente usa el último que recibió
+            ('auth/refresh', 'estudiante', lambda estado, i: ('post', '/api/auth/refresh/', {
+                'refresh': estado['refresh'],
+            })),
+            ('auth/me', 'estudiante', lambda estado, i: ('get', '/api/auth/me/', None)),
+            ('auth/me (completo)', 'estudiante',
+             lambda estado, i: ('get', '/api/auth/me/?perfil=completo', None)),
+            ('estudiantes/dashboard', 'estudiante',
+             lambda estado, i: ('get', '/api/estudiantes/dashboard/', None)),
+            ('empresas/dashboard', 'empresa',
+             lambda estado, i: ('get', '/api/empresas/dashboard/', None)),
+            ('admin/list (búsqueda)', 'admin', lambda estado, i: (
+                'get', f'/api/admin/usuarios/?search=usuario{random.randrange(total)}', None
+            )),
+            ('admin/retrieve', 'admin',
+             lambda estado, i: ('get', f'/api/admin/usuarios/{id_al_azar()}/', None)),
+            ('admin/roles', 'admin', lambda estado, i: ('get', '/api/admin/usuarios/roles/', None)),
+            ('admin/create', 'admin', crear),
+            ('admin/update', 'admin', lambda estado, i: ('put', f'/api/admin/usuarios/{creado(i)}/', {
+                'username': f'bench_editado{creado(i)}', 'email': 'editado@bench.local',
+                'first_name': 'Editado', 'last_name': 'Usuario',
+                'rol_id': self.roles['Estudiante'].id,
+            })),
+            ('admin/partial_update', 'admin', lambda estado, i: (
+                'patch', f'/api/admin/usuarios/{creado(i)}/', {'first_name': f'Parcial{i}'}
+            )),
+            ('admin/toggle-activo', 'admin', lambda estado, i: (
+                'post', f'/api/admin/usuarios/{creado(i)}/toggle-activo/', None
+            )),
+            ('admin/destroy', 'admin',
+             lambda estado, i: ('delete', f'/api/admin/usuarios/{creado(i)}/', None)),
+        ]
+        if total <= MAXIMO_LISTADO_COMPLETO:
+            escenarios.insert(8, ('admin/list', 'admin',
+                                  lambda estado, i: ('get', '/api/admin/usuarios/', None)))
+
+        self.estudiante_al_azar = estudiante_al_azar
+        self.creados = creados
+        return escenarios
+
+    def credenciales(self, actor):
+        if actor == 'admin':
+            return 'bench_admin'
+        if actor == 'empresa':
+            return f'usuario{7 + 10 * random.randrange(max(self.total // 10, 1))}'
+        return self.estudiante_al_azar()
+
+    # Mediciones
+
+    def medir(self, total, options):
+        self.primer_id = Usuario.objects.filter(username='usuario0').values_list('id', flat=True).get()
+        escenarios = self.escenarios(total)
+        if options['endpoint']:
+            escenarios = [e for e in escenarios if e[0] in options['endpoint']]
+
+        resultados = {}
+        for nombre, actor, peticion in escenarios:
+            resultados[nombre] = self.ejecutar(nombre, actor, peticion, options)
+            if nombre == 'admin/create':
+                self.creados.extend(
+                    Usuario.objects.filter(username__startswith='bench_nuevo')
+                    .values_list('id', flat=True)
+                )
+        return resultados
+
+    def ejecutar(self, nombre, actor, peticion, options):
+        concurrencia = options['concurrencia']
+        peticiones = options['peticiones']
+        latencias = []
+        consultas = []
+        tamanos = []
+        errores = [0]
+        lock = threading.Lock()
+        # Los logins previos de cada cliente no cuentan en el tiempo medido
+        barrera = threading.Barrier(concurrencia + 1)
+
+        def trabajador(indices):
+            cliente = APIClient()
+            estado = {}
+            if actor is not None:
+                respuesta = cliente.post('/api/auth/login/', {
+                    'username_email': self.credenciales(actor), 'password': PASSWORD,
+                }, format='json')
+                cliente.credentials(HTTP_AUTHORIZATION=f"Bearer {respuesta.data['access']}")
+                estado['refresh'] = respuesta.data['refresh']
+            barrera.wait()
+
+            contador = [0]
+
+            def contar(execute, sql, params, many, context):
+                contador[0] += 1
+                return execute(sql, params, many, context)
+
+            propias_latencias, propias_consultas, propios_tamanos, propios_errores = [], [], [], 0
+            with connection.execute_wrapper(contar):
+                for i in indices:
+                    metodo, ruta, datos = peticion(estado, i)
+                    contador[0] = 0
+                    inicio = time.perf_counter()
+                    respuesta = getattr(cliente, metodo)(ruta, datos, format='json')
+                    propias_latencias.append((time.perf_counter() - inicio) * 1000)
+                    propias_consultas.append(contador[0])
+                    propios_tamanos.append(len(respuesta.content))
+                    if respuesta.status_code >= 400:
+                        propios_errores += 1
+                    elif nombre == 'auth/refresh':
+                        estado['refresh'] = respuesta.data['refresh']
+            connection.close()
+
+            with lock:
+                latencias.extend(propias_latencias)
+                consultas.extend(propias_consultas)
+                tamanos.extend(propios_tamanos)
+                errores[0] += propios_errores
+
+        hilos = [
+            threading.Thread(target=trabajador, args=(range(n, peticiones, concurrencia),))
+            for n in range(concurrencia)
+        ]
+        for hilo in hilos:
+            hilo.start()
+        barrera.wait()
+        inicio = time.perf_counter()
+        for hilo in hilos:
+            hilo.join()
+        transcurrido = time.perf_counter() - inicio
+
+        latencias.sort()
+        return {
+            'rps': round(len(latencias) / transcurrido, 1),
+            'p50': round(statistics.median(latencias), 3) if latencias else 0,
+            'p95': round(percentil(latencias, 0.95), 3),
+            'p99': round(percentil(latencias, 0.99), 3),
+            'consultas': round(statistics.mean(consultas), 2) if consultas else 0,
+            'bytes': round(statistics.mean(tamanos)) if tamanos else 0,
+            'errores': errores[0],
+        }
+
+    # Salida
+
+    def reportar(self, resultados):
+        self.stdout.write(
+            f"\n{'endpoint':28} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} "
+            f"{'p99 ms':>9} {'consultas':>10} {'bytes':>8} {'errores':>8}"
+        )
+        for nombre, r in resultados.items():
+            self.stdout.write(
+                f"{nombre:28} {r['rps']:9.1f} {r['p50']:9.2f} {r['p95']:9.2f} "
+                f"{r['p99']:9.2f} {r['consultas']:10.2f} {r['bytes']:8} {r['errores']:8}"
+            )
+
+    def comparar(self, actual, ruta_base, umbral):
+        """
+        Marca como regresión un endpoint cuyo p95 sube o cuyo req/s baja
+        más que el umbral, o que hace más consultas que en la línea base.
+        """
+        try:
+            base = json.loads(Path(ruta_base).read_text())
+        except (OSError, ValueError) as e:
+            raise CommandError(f"No se pudo leer la línea base {ruta_base}: {e}")
+
+        if base['meta']['usuarios'] != actual['meta']['usuarios']:
+            self.stdout.write(self.style.WARNING(
+                f"La línea base se midió con {base['meta']['usuarios']} usuarios "
+                f"y esta ejecución con {actual['meta']['usuarios']}"
+            ))
+
+        regresiones = []
+        for nombre, r in actual['endpoints'].items():
+            anterior = base['endpoints'].get(nombre)
+            if anterior is None:
+                continue
+            if anterior['p95'] and r['p95'] > anterior['p95'] * (1 + umbral):
+                regresiones.append(f"{nombre}: p95 {anterior['p95']:.2f} -> {r['p95']:.2f} ms")
+            if anterior['rps'] and r['rps'] < anterior['rps'] * (1 - umbral):
+                regresiones.append(f"{nombre}: req/s {anterior['rps']:.1f} -> {r['rps']:.1f}")
+            if r['consultas'] > anterior['consultas']:
+                regresiones.append(
+                    f"{nombre}: consultas {anterior['consultas']:.2f} -> {r['consultas']:.2f}"
+                )
+
+        if regresiones:
+            for linea in regresiones:
+                self.stdout.write(self.style.ERROR(f"  REGRESIÓN {linea}"))
+            raise CommandError(f"{len(regresiones)} regresiones respecto de {ruta_base}")
+        self.stdout.write(self.style.SUCCESS(f"Sin regresiones respecto de {ruta_base}"))
@@ -0,0 +1,169 @@
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SERVIDORES = {
+    # Bajo ASGI se sirven las vistas async; bajo WSGI, las síncronas
+    'uvicorn': (
+        ['-m', 'uvicorn', 'login.asgi:application', '--host', '127.0.0.1',
+         '--log-level', 'warning', '--no-access-log'],
+        {'DJANGO_API_ASYNC': '1'},
+    ),
+    'gunicorn': (
+        ['-m', 'gunicorn', 'login.wsgi:application', '--log-level', 'warning'],
+        {'DJANGO_API_ASYNC': '0'},
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara requests/s y latencias de la API servida por uvicorn (vistas "
+        "async) y por gunicorn (WSGI) con muchas conexiones concurrentes. "
+        "Requiere uvicorn y gunicorn instalados y usuarios de prueba "
+        "(crear_usuarios_prueba.py)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servidor', choices=['uvicorn', 'gunicorn', 'ambos'], default='ambos')
+        parser.add_argument('--conexiones', type=int, default=500)
+        parser.add_argument('--duracion', type=float, default=15.0, help="Segundos de carga")
+        parser.add_argument('--ruta', default='/api/auth/me/')
+        parser.add_argument('--usuario', default='admin')
+        parser.add_argument('--password', default='admin123')
+        parser.add_argument('--puerto', type=int, default=8765)
+        parser.add_argument('--workers', type=int, default=1, help="Procesos por servidor")
+        parser.add_argument('--threads', type=int, default=32, help="Hilos por worker de gunicorn")
+
+    def handle(self, *args, **options):
+        nombres = ['uvicorn', 'gunicorn'] if options['servidor'] == 'ambos' else [options['servidor']]
+        resultados = {}
+        for nombre in nombres:
+            with self.servidor(nombre, options):
+                token = self.obtener_token(options)
+                resultados[nombre] = asyncio.run(self.cargar(token, options))
+
+        self.stdout.write(
+            f"\n{options['ruta']} con {options['conexiones']} conexiones, "
+            f"{options['duracion']:.0f}s"
+        )
+        for nombre, r in resultados.items():
+            self.stdout.write(
+                f"{nombre:10} {r['rps']:9.1f} req/s  p50={r['p50']:7.1f}ms  "
+                f"p99={r['p99']:7.1f}ms  errores={r['errores']}"
+            )
+
+    # Servidores
+
+    def servidor(self, nombre, options):
+        comando = self
+
+        class _Servidor:
+            def __enter__(self):
+                argumentos, entorno = SERVIDORES[nombre]
+                argumentos = list(argumentos)
+                if nombre == 'uvicorn':
+                    argumentos += ['--port', str(options['puerto']),
+                                   '--workers', str(options['workers'])]
+                else:
+                    argumentos += ['--bind', f"127.0.0.1:{options['puerto']}",
+                                   '--workers', str(options['workers']),
+                                   '--threads', str(options['threads'])]
+                self.proceso = subprocess.Popen(
+                    [sys.executable] + argumentos,
+                    cwd=settings.BASE_DIR,
+                    env={**os.environ, **entorno},
+                )
+                comando.esperar_puerto(options['puerto'], self.proceso, nombre)
+                return self
+
+            def __exit__(self, *exc):
+                self.proceso.terminate()
+                self.proceso.wait(timeout=30)
+
+        return _Servidor()
+
+    def esperar_puerto(self, puerto, proceso, nombre):
+        limite = time.monotonic() + 30
+        while time.monotonic() < limite:
+            if proceso.poll() is not None:
+                raise CommandError(f"{nombre} terminó al iniciar (¿está instalado?)")
+            try:
+                socket.create_connection(('127.0.0.1', puerto), timeout=0.5).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError(f"{nombre} no respondió en el puerto {puerto}")
+
+    def obtener_token(self, options):
+        peticion = urllib.request.Request(
+            f"http://127.0.0.1:{options['puerto']}/api/auth/login/",
+            data=json.dumps({
+                'username_email': options['usuario'],
+                'password': options['password'],
+            }).encode(),
+            headers={'Content-Type': 'application/json'},
+        )
+        with urllib.request.urlopen(peticion) as respuesta:
+            return json.load(respuesta)['access']
+
+    # Generador de carga: HTTP/1.1 keep-alive sin dependencias externas
+
+    async def cargar(self, token, options):
+        peticion = (
+            f"GET {options['ruta']} HTTP/1.1\r\n"
+            f"Host: 127.0.0.1:{options['puerto']}\r\n"
+            f"Authorization: Bearer {token}\r\n"
+            f"Connection: keep-alive\r\n\r\n"
+        ).encode()
+        latencias = []
+        errores = [0]
+        fin = time.monotonic() + options['duracion']
+
+        async def cliente():
+            try:
+                lector, escritor = await asyncio.open_connection('127.0.0.1', options['puerto'])
+            except OSError:
+                errores[0] += 1
+                return
+            try:
+                while time.monotonic() < fin:
+                    inicio = time.perf_counter()
+                    escritor.write(peticion)
+                    await escritor.drain()
+                    cabeceras = await lector.readuntil(b'\r\n\r\n')
+                    largo = 0
+                    for linea in cabeceras.split(b'\r\n'):
+                        if linea.lower().startswith(b'content-length:'):
+                            largo = int(linea.split(b':', 1)[1])
+                    await lector.readexactly(largo)
+                    latencias.append((time.perf_counter() - inicio) * 1000)
+                    if not cabeceras.startswith(b'HTTP/1.1 200'):
+                        errores[0] += 1
+            except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+                errores[0] += 1
+            finally:
+                escritor.close()
+
+        inicio = time.monotonic()
+        await asyncio.gather(*(cliente() for _ in range(options['conexiones'])))
+        transcurrido = time.monotonic() - inicio
+
+        if not latencias:
+            raise CommandError("No se completó ninguna petición")
+        latencias.sort()
+        return {
+            'rps': len(latencias) / transcurrido,
+            'p50': statistics.median(latencias),
+            'p99': latencias[min(len(latencias) - 1, int(len(latencias) * 0.99))],
+            'errores': errores[0],
+        }
@@ -0,0 +1,133 @@
+import os
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+PERFILES = {
+    # Configuración por defecto: journal DELETE y una conexión nueva por
+    # operación (CONN_MAX_AGE=0)
+    'dev': {'pragmas': '', 'persistente': False},
+    # Perfil de producción de settings.py: WAL + pragmas, conexiones persistentes
+    'produccion': {'pragmas': None, 'persistente': True},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Mide la contención lectura/escritura de SQLite con el perfil 'dev' "
+        "y con el perfil 'produccion': varios hilos leen usuarios por id "
+        "mientras un hilo escribe (como last_login en cada login)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--filas', type=int, default=100_000)
+        parser.add_argument('--lectores', type=int, default=8)
+        parser.add_argument('--duracion', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        for nombre, perfil in PERFILES.items():
+            with tempfile.TemporaryDirectory() as directorio:
+                ruta = os.path.join(directorio, 'bench.sqlite3')
+                pragmas = perfil['pragmas']
+                if pragmas is None:
+                    pragmas = settings.SQLITE_PRAGMAS
+                self.preparar(ruta, pragmas, options['filas'])
+                resultado = self.medir(ruta, pragmas, perfil['persistente'], options)
+                self.reportar(nombre, resultado, options['duracion'])
+
+    def conectar(self, ruta, pragmas):
+        # timeout igual al de Django por defecto (5 s) para ambos perfiles
+        conexion = sqlite3.connect(ruta, timeout=5, isolation_level=None, check_same_thread=False)
+        for pragma in pragmas.split(';'):
+            if pragma.strip():
+                conexion.execute(pragma)
+        return conexion
+
+    def preparar(self, ruta, pragmas, filas):
+        conexion = self.conectar(ruta, pragmas)
+        conexion.execute(
+            "CREATE TABLE usuarios (id INTEGER PRIMARY KEY, username TEXT, last_login TEXT)"
+        )
+        conexion.execute("BEGIN")
+        conexion.executemany(
+            "INSERT INTO usuarios (id, username) VALUES (?, ?)",
+            ((i, f"usuario{i}") for i in range(1, filas + 1))
+        )
+        conexion.execute("COMMIT")
+        conexion.close()
+
+    def medir(self, ruta, pragmas, persistente, options):
+        fin = time.monotonic() + options['duracion']
+        lecturas = []
+        escrituras = []
+        errores = [0]
+        lock = threading.Lock()
+
+        def operar(sql, parametros, conexion, escritura):
+            propia = conexion is None
+            if propia:
+                conexion = self.conectar(ruta, pragmas)
+            try:
+                if escritura:
+                    conexion.execute("BEGIN IMMEDIATE")
+                    conexion.execute(sql, parametros)
+                    conexion.execute("COMMIT")
+                else:
+                    conexion.execute(sql, parametros).fetchone()
+            finally:
+                if propia:
+                    conexion.close()
+
+        def trabajador(escritura, indice):
+            conexion = self.conectar(ruta, pragmas) if persistente else None
+            tiempos = []
+            fila = indice
+            while time.monotonic() < fin:
+                fila = fila * 7919 % options['filas'] + 1
+                inicio = time.perf_counter()
+                try:
+                    if escritura:
+                        operar(
+                            "UPDATE usuarios SET last_login = datetime('now') WHERE id = ?",
+                            (fila,), conexion, True
+                        )
+                    else:
+                        operar("SELECT * FROM usuarios WHERE id = ?", (fila,), conexion, False)
+                    tiempos.append((time.perf_counter() - inicio) * 1000)
+                except sqlite3.OperationalError:
+                    with lock:
+                        errores[0] += 1
+                    if conexion is not None and conexion.in_transaction:
+                        conexion.execute("ROLLBACK")
+            with lock:
+                (escrituras if escritura else lecturas).extend(tiempos)
+
+        hilos = [threading.Thread(target=trabajador, args=(True, 1))]
+        hilos += [
+            threading.Thread(target=trabajador, args=(False, i + 2))
+            for i in range(options['lectores'])
+        ]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+        return lecturas, escrituras, errores[0]
+
+    def reportar(self, nombre, resultado, duracion):
+        lecturas, escrituras, errores = resultado
+
+        def p99(tiempos):
+            tiempos = sorted(tiempos)
+            return tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.99))] if tiempos else 0
+
+        self.stdout.write(
+            f"{nombre:11} lecturas={len(lecturas) / duracion:9.0f}/s "
+            f"(p50={statistics.median(lecturas) if lecturas else 0:6.3f}ms p99={p99(lecturas):7.3f}ms)  "
+            f"escrituras={len(escrituras) / duracion:7.0f}/s "
+            f"(p99={p99(escrituras):7.3f}ms)  bloqueos={errores}"
+        )
@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from usuarios.depuracion import depurar_bajas
+
+
+class Command(BaseCommand):
+    help = (
+        "Borra definitivamente, en lotes, los usuarios dados de baja y sus "
+        "datos. Normalmente lo hace un hilo tras cada baja; sirve para las "
+        "que quedaron pendientes (p. ej. al reiniciar el servidor)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=settings.BAJAS_USUARIOS['LOTE'],
+            help="Cantidad máxima de filas borradas por transacción"
+        )
+        parser.add_argument(
+            '--pausa', type=float, default=settings.BAJAS_USUARIOS['PAUSA'],
+            help="Segundos de espera entre lotes"
+        )
+
+    def handle(self, *args, **options):
+        usuarios, filas = depurar_bajas(options['lote'], options['pausa'])
+        self.stdout.write(self.style.SUCCESS(f"{usuarios} usuarios depurados ({filas} filas)."))
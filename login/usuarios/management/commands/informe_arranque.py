@@ -0,0 +1,97 @@
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from login import arranque
+
+LINEA_IMPORTTIME = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+# Lo mismo que importa un worker antes de su primera petición
+SCRIPT_ARRANQUE = (
+    "import django, importlib; django.setup(); "
+    "from django.conf import settings; importlib.import_module(settings.ROOT_URLCONF)"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Informe de arranque: tiempo de importación por paquete y por app del "
+        "proyecto (python -X importtime en un proceso nuevo) y duración de "
+        "cada paso del calentamiento de login/arranque.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=15, help="Paquetes a listar")
+
+    def handle(self, *args, **options):
+        modulos = self.medir_importaciones()
+        total = sum(propio for propio, _, _ in modulos.values())
+        self.stdout.write(f"Importación: {total / 1000:.1f} ms en {len(modulos)} módulos\n")
+
+        por_paquete = defaultdict(int)
+        for nombre, (propio, _, _) in modulos.items():
+            por_paquete[nombre.split('.')[0]] += propio
+        self.stdout.write(f"{'paquete':<30}{'ms':>9}")
+        for paquete, propio in sorted(por_paquete.items(), key=lambda p: -p[1])[:options['top']]:
+            self.stdout.write(f"{paquete:<30}{propio / 1000:>9.1f}")
+
+        # Acumulado de los módulos del proyecto importados desde fuera de
+        # la app: incluye las dependencias que cargan por primera vez
+        self.stdout.write(f"\n{'app':<30}{'ms':>9}  módulos")
+        for app in self.apps_del_proyecto():
+            propios = [
+                (nombre, acumulado) for nombre, (_, acumulado, padre) in modulos.items()
+                if nombre.split('.')[0] == app and (padre or '').split('.')[0] != app
+            ]
+            acumulado = sum(ms for _, ms in propios)
+            detalle = ', '.join(f'{n} {ms / 1000:.1f}' for n, ms in sorted(propios, key=lambda p: -p[1])[:3])
+            self.stdout.write(f"{app:<30}{acumulado / 1000:>9.1f}  {detalle}")
+
+        self.stdout.write("\nCalentamiento (en este proceso):")
+        for nombre, paso in arranque.PASOS:
+            self.stdout.write(f"  {nombre:<28}{self.cronometrar(paso) * 1000:>9.1f} ms")
+
+    def medir_importaciones(self):
+        """{módulo: (µs propios, µs acumulados, módulo que lo importó)}"""
+        resultado = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', SCRIPT_ARRANQUE],
+            cwd=settings.BASE_DIR, env=os.environ.copy(), capture_output=True, text=True
+        )
+        if resultado.returncode != 0:
+            raise CommandError(f"No se pudo arrancar Django:\n{resultado.stderr[-2000:]}")
+
+        # importtime escribe cada módulo después de sus dependencias, con
+        # más sangría cuanto más profundo: el padre es el siguiente de menor nivel
+        modulos = {}
+        pendientes = []
+        for linea in resultado.stderr.splitlines():
+            coincidencia = LINEA_IMPORTTIME.match(linea)
+            if not coincidencia:
+                continue
+            propio, acumulado, sangria, nombre = coincidencia.groups()
+            nivel = len(sangria)
+            while pendientes and pendientes[-1][0] > nivel:
+                _, hijo = pendientes.pop()
+                modulos[hijo] = modulos[hijo][:2] + (nombre,)
+            modulos[nombre] = (int(propio), int(acumulado), None)
+            pendientes.append((nivel, nombre))
+        return modulos
+
+    def apps_del_proyecto(self):
+        base = str(settings.BASE_DIR)
+        proyecto = settings.ROOT_URLCONF.split('.')[0]
+        return [proyecto] + [
+            config.name for config in apps.get_app_configs() if config.path.startswith(base)
+        ]
+
+    def cronometrar(self, paso):
+        inicio = time.perf_counter()
+        paso()
+        return time.perf_counter() - inicio
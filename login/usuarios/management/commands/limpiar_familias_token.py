@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from usuarios.models import FamiliaToken
+
+
+class Command(BaseCommand):
+    help = (
+        "Elimina las familias de refresh tokens vencidas (revocadas o no): "
+        "su último refresh ya expiró y no pueden volver a rotarse. Para las "
+        "filas de la lista negra anterior usar flushexpiredtokens."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--lote', type=int, default=5_000,
+            help="Cantidad máxima de familias eliminadas por sentencia"
+        )
+
+    def handle(self, *args, **options):
+        ahora = timezone.now()
+        total = 0
+        for alias in settings.USUARIOS_SHARDS_ALIAS or ['default']:
+            familias = FamiliaToken.objects.using(alias)
+            while True:
+                # DELETE por lotes de ids para no bloquear la tabla entera
+                ids = list(
+                    familias.filter(expira__lt=ahora).values_list('pk', flat=True)[:options['lote']]
+                )
+                if not ids:
+                    break
+                familias.filter(pk__in=ids).delete()
+                total += len(ids)
+
+        self.stdout.write(self.style.SUCCESS(f"{total} familias vencidas eliminadas."))
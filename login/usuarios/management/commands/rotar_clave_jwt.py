@@ -0,0 +1,56 @@
+import os
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.settings import api_settings
+
+from usuarios.claves_jwt import ALGORITMOS, AlmacenClaves, generar_clave
+
+
+class Command(BaseCommand):
+    help = (
+        "Crea una clave de firma JWT nueva. Se publica en el JWKS en el acto "
+        "y se empieza a firmar con ella pasado JWT_CLAVES['PUBLICACION_PREVIA']. "
+        "Con --podar elimina las claves reemplazadas cuyos tokens ya vencieron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--algoritmo', choices=ALGORITMOS, default='EdDSA')
+        parser.add_argument(
+            '--podar', action='store_true',
+            help="Solo eliminar claves viejas, sin crear una nueva"
+        )
+
+    def handle(self, *args, **options):
+        config = settings.JWT_CLAVES
+        directorio = str(config['DIRECTORIO'])
+        previa = config['PUBLICACION_PREVIA']
+
+        if options['podar']:
+            self._podar(directorio, previa)
+            return
+
+        try:
+            kid = generar_clave(directorio, options['algoritmo'])
+        except FileExistsError:
+            raise CommandError("Ya existe una clave creada en este segundo; reintentar")
+
+        primera = len(AlmacenClaves(directorio, previa).claves()) == 1
+        desde = "ya" if primera else f"desde {datetime.now(timezone.utc) + previa:%Y-%m-%d %H:%M} UTC"
+        self.stdout.write(self.style.SUCCESS(
+            f"Clave {kid} ({options['algoritmo']}) creada en {directorio}; firma {desde}."
+        ))
+
+    def _podar(self, directorio, previa):
+        # Una clave deja de firmar cuando se activa la siguiente; sus tokens
+        # viven a lo sumo REFRESH_TOKEN_LIFETIME más
+        ahora = datetime.now(timezone.utc)
+        claves = AlmacenClaves(directorio, previa).claves()
+        eliminadas = 0
+        for clave, siguiente in zip(claves, claves[1:]):
+            retirada = siguiente.creada + previa
+            if retirada + api_settings.REFRESH_TOKEN_LIFETIME < ahora:
+                os.remove(os.path.join(directorio, f'{clave.kid}.pem'))
+                eliminadas += 1
+        self.stdout.write(self.style.SUCCESS(f"{eliminadas} claves retiradas eliminadas."))
@@ -0,0 +1,210 @@
+import random
+import time
+import unicodedata
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from usuarios.models import DirectorioUsuario, FamiliaToken, Rol, SecuenciaCambios, Usuario
+from usuarios.shards import db_de_usuario
+
+# Mismos roles y contraseñas que crear_usuarios_prueba.py
+ROLES = {
+    'Admin': ('Administrador del sistema', 'admin123'),
+    'Estudiante': ('Estudiante', 'estudiante123'),
+    'Empresa': ('Empresa', 'empresa123'),
+}
+
+NOMBRES = [
+    'Sofía', 'Mateo', 'Valentina', 'Santiago', 'Isabella', 'Sebastián', 'Camila',
+    'Matías', 'Valeria', 'Nicolás', 'Martina', 'Benjamín', 'Lucía', 'Diego',
+    'Daniela', 'Tomás', 'Fernanda', 'Joaquín', 'Antonia', 'Alejandro', 'Catalina',
+    'Gabriel', 'Florencia', 'Lucas', 'Josefa', 'Agustín', 'Emilia', 'Vicente',
+]
+APELLIDOS = [
+    'González', 'Muñoz', 'Rojas', 'Díaz', 'Pérez', 'Soto', 'Contreras', 'Silva',
+    'Martínez', 'Sepúlveda', 'Morales', 'Rodríguez', 'López', 'Fuentes',
+    'Hernández', 'Torres', 'Araya', 'Flores', 'Espinoza', 'Valenzuela', 'Castillo',
+    'Tapia', 'Reyes', 'Gutiérrez', 'Castro', 'Pizarro', 'Álvarez', 'Vásquez',
+]
+RUBROS = [
+    'Tecnologías', 'Consultores', 'Ingeniería', 'Logística', 'Servicios',
+    'Comercial', 'Minera', 'Alimentos', 'Constructora', 'Salud',
+]
+DOMINIOS = ['gmail.com', 'hotmail.com', 'outlook.com', 'yahoo.com', 'live.cl']
+
+
+def _ascii(texto):
+    return unicodedata.normalize('NFKD', texto).encode('ascii', 'ignore').decode().lower()
+
+
+def _hashear(passwords):
+    """Un hash por contraseña distinta, en paralelo (PBKDF2 es CPU puro)."""
+    if len(passwords) == 1:
+        return [make_password(passwords[0])]
+    with ProcessPoolExecutor(initializer=django.setup) as pool:
+        return list(pool.map(make_password, passwords))
+
+
+class Command(BaseCommand):
+    help = (
+        "Genera usuarios sintéticos en volumen (millones en minutos) para "
+        "pruebas de carga: un hash por contraseña distinta y bulk_create en "
+        "transacciones grandes. Para las cuentas de demostración usar "
+        "crear_usuarios_prueba.py."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--estudiantes', type=int, default=0)
+        parser.add_argument('--empresas', type=int, default=0)
+        parser.add_argument('--admins', type=int, default=0)
+        parser.add_argument('--prefijo', default='sem', help="Prefijo de los username generados")
+        parser.add_argument('--passwords', type=int, default=1,
+                            help="Contraseñas distintas por rol (<rol>123, <rol>123-1, ...)")
+        parser.add_argument('--tokens', type=int, default=0,
+                            help="Sesiones abiertas (familias de refresh tokens) por usuario")
+        parser.add_argument('--lote', type=int, default=5_000, help="Filas por bulk_create")
+        parser.add_argument('--transaccion', type=int, default=200_000,
+                            help="Filas por transacción")
+        parser.add_argument('--semilla', type=int, default=42)
+
+    def handle(self, *args, **options):
+        cantidades = {
+            'Estudiante': options['estudiantes'],
+            'Empresa': options['empresas'],
+            'Admin': options['admins'],
+        }
+        if not any(cantidades.values()):
+            raise CommandError("Indicar al menos --estudiantes, --empresas o --admins")
+        prefijo = options['prefijo']
+        modelo_nombres = DirectorioUsuario if settings.USUARIOS_SHARDS else Usuario
+        if modelo_nombres.objects.filter(username__startswith=prefijo).exists():
+            raise CommandError(f"Ya hay usuarios con el prefijo '{prefijo}': usar otro --prefijo")
+
+        self.random = random.Random(options['semilla'])
+        self.ahora = timezone.now()
+        inicio = time.perf_counter()
+
+        roles = {}
+        for nombre, (descripcion, _) in ROLES.items():
+            roles[nombre], _ = Rol.objects.get_or_create(name=nombre, defaults={'descripcion': descripcion})
+
+        hashes = self.preparar_hashes(cantidades, options['passwords'])
+        self.stdout.write(f"Hashes: {sum(map(len, hashes.values()))} en {time.perf_counter() - inicio:.1f}s")
+
+        total = 0
+        for nombre, cantidad in cantidades.items():
+            for desde in range(0, cantidad, options['transaccion']):
+                hasta = min(desde + options['transaccion'], cantidad)
+                usuarios = [
+                    self.generar(nombre, roles[nombre], hashes[nombre], prefijo, i)
+                    for i in range(desde, hasta)
+                ]
+                self.insertar(usuarios, options)
+                total += len(usuarios)
+                self.stdout.write(
+                    f"  {total} usuarios ({time.perf_counter() - inicio:.1f}s)"
+                )
+
+        duracion = time.perf_counter() - inicio
+        self.stdout.write(self.style.SUCCESS(
+            f"{total} usuarios en {duracion:.1f}s ({total / duracion:.0f}/s)"
+        ))
+
+    def preparar_hashes(self, cantidades, distintas):
+        passwords = {
+            nombre: [ROLES[nombre][1]] + [f'{ROLES[nombre][1]}-{n}' for n in range(1, distintas)]
+            for nombre, cantidad in cantidades.items() if cantidad
+        }
+        planos = [password for lista in passwords.values() for password in lista]
+        por_password = dict(zip(planos, _hashear(planos)))
+        return {nombre: [por_password[p] for p in lista] for nombre, lista in passwords.items()}
+
+    # Datos sintéticos
+
+    def generar(self, rol_nombre, rol, hashes, prefijo, i):
+        r = self.random
+        nombre = r.choice(NOMBRES)
+        apellido = r.choice(APELLIDOS)
+        username = f'{prefijo}_{rol_nombre.lower()}{i}'
+        # Altas repartidas en los últimos 3 años; la mayoría entró hace poco
+        date_joined = self.ahora - timedelta(seconds=int(r.triangular(0, 3 * 365, 0) * 86_400))
+        usuario = Usuario(
+            username=username,
+            password=hashes[i % len(hashes)],
+            first_name=nombre,
+            last_name=apellido,
+            email=_ascii(f'{nombre}.{apellido}{i}@{r.choice(DOMINIOS)}'),
+            telefono=f'+569{r.randrange(10_000_000, 100_000_000)}' if r.random() < 0.7 else None,
+            rol_usuario=rol,
+            is_active=r.random() < 0.95,
+            date_joined=date_joined,
+        )
+        # 80% entró en los últimos 90 días (nunca antes de su alta)
+        if r.random() < 0.8:
+            dias = min(r.expovariate(1 / 10), 90, (self.ahora - date_joined).days)
+            usuario.last_login = self.ahora - timedelta(days=dias)
+
+        if rol_nombre == 'Estudiante':
+            usuario.fecha_nacimiento = date.today() - timedelta(days=int(r.gauss(22, 3) * 365))
+        elif rol_nombre == 'Empresa':
+            usuario.first_name = f'{apellido} {r.choice(RUBROS)}'
+            usuario.last_name = r.choice(['SpA', 'Ltda.', 'S.A.'])
+            usuario.email = _ascii(f'contacto{i}@{apellido}{r.choice(RUBROS)}.cl')
+            if r.random() < 0.6:
+                usuario.fecha_contrato = (self.ahora - timedelta(days=r.randrange(0, 730))).date()
+        else:
+            usuario.is_staff = True
+        return usuario
+
+    # Inserción
+
+    def insertar(self, usuarios, options):
+        if settings.USUARIOS_SHARDS:
+            # El directorio asigna los ids y cada usuario va al shard de su id
+            entradas = DirectorioUsuario.objects.bulk_create(
+                [DirectorioUsuario(username=u.username, email=u.email) for u in usuarios],
+                batch_size=options['lote']
+            )
+            por_base = defaultdict(list)
+            for usuario, entrada in zip(usuarios, entradas):
+                usuario.pk = entrada.pk
+                por_base[db_de_usuario(entrada.pk)].append(usuario)
+        else:
+            por_base = {'default': usuarios}
+
+        for alias, lote in por_base.items():
+            with transaction.atomic(using=alias):
+                # Un bloque de la secuencia del feed de cambios para todo el lote
+                inicio = SecuenciaCambios.objects.db_manager(alias).reservar(
+                    SecuenciaCambios.USUARIOS, len(lote)
+                )
+                for i, usuario in enumerate(lote):
+                    usuario.seq_cambio = inicio + i
+                creados = Usuario.objects.using(alias).bulk_create(lote, batch_size=options['lote'])
+                if options['tokens']:
+                    FamiliaToken.objects.using(alias).bulk_create(
+                        self.generar_familias(creados, options['tokens']),
+                        batch_size=options['lote']
+                    )
+
+    def generar_familias(self, usuarios, por_usuario):
+        """Sesiones abiertas en la última vida de un refresh, ya rotadas algunas veces."""
+        vida = api_settings.REFRESH_TOKEN_LIFETIME
+        for usuario in usuarios:
+            for _ in range(por_usuario):
+                creada = self.ahora - vida * self.random.random()
+                yield FamiliaToken(
+                    usuario_id=usuario.pk,
+                    generacion=self.random.randrange(0, 50),
+                    creada=creada,
+                    expira=creada + vida,
+                )
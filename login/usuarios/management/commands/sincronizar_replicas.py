@@ -0,0 +1,54 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Copia el primario SQLite a cada réplica de lectura con la API de "
+        "backup en línea (sin detener las escrituras). Con --continuo se "
+        "repite cada REPLICAS_INTERVALO_SINCRONIZACION segundos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--continuo', action='store_true')
+        parser.add_argument(
+            '--paginas', type=int, default=-1,
+            help="Páginas copiadas por paso; -1 copia todo en un paso (réplica consistente)"
+        )
+
+    def handle(self, *args, **options):
+        replicas = getattr(settings, 'REPLICAS_ARCHIVOS', None)
+        if not replicas:
+            raise CommandError(
+                "No hay réplicas configuradas: usar DJANGO_DB_PROFILE=produccion "
+                "y DJANGO_DB_REPLICAS=N"
+            )
+        settings.REPLICAS_DIR.mkdir(parents=True, exist_ok=True)
+
+        while True:
+            inicio = time.perf_counter()
+            for alias, archivo in replicas.items():
+                self.copiar(settings.DATABASES['default']['NAME'], archivo, options['paginas'])
+            self.stdout.write(
+                f"{len(replicas)} réplica(s) sincronizadas en "
+                f"{(time.perf_counter() - inicio) * 1000:.0f}ms"
+            )
+            if not options['continuo']:
+                return
+            time.sleep(settings.REPLICAS_INTERVALO_SINCRONIZACION)
+
+    def copiar(self, origen, destino, paginas):
+        # La copia lee una instantánea consistente del primario (WAL permite
+        # seguir escribiendo) y reemplaza el contenido de la réplica en el
+        # lugar, así las conexiones persistentes de los lectores ven los datos
+        # nuevos sin reabrir el archivo.
+        fuente = sqlite3.connect(f"file:{origen}?mode=ro", uri=True)
+        replica = sqlite3.connect(destino, timeout=30)
+        try:
+            fuente.backup(replica, pages=paginas)
+        finally:
+            replica.close()
+            fuente.close()
@@ -0,0 +1,38 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:05
+
+import usuarios.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('usuarios', '0002_alter_usuario_rol_usuario'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DirectorioUsuario',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('username', models.CharField(max_length=150, unique=True)),
+                ('email', models.EmailField(blank=True, db_index=True, max_length=254)),
+            ],
+            options={
+                'verbose_name': 'Entrada del directorio de usuarios',
+                'verbose_name_plural': 'Directorio de usuarios',
+                'db_table': 'directorio_usuarios',
+            },
+        ),
+        migrations.AlterModelManagers(
+            name='usuario',
+            managers=[
+                ('objects', usuarios.models.UsuarioManager()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='usuario',
+            index=models.Index(fields=['date_joined', 'id'], name='usuarios_date_joined_idx'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:50
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0003_directoriousuario_alter_usuario_managers_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FamiliaToken',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('generacion', models.PositiveIntegerField(default=0, verbose_name='Generación')),
+                ('creada', models.DateTimeField(default=django.utils.timezone.now)),
+                ('expira', models.DateTimeField(db_index=True)),
+                ('revocada_en', models.DateTimeField(blank=True, null=True)),
+                ('motivo', models.CharField(blank=True, max_length=20)),
+                ('usuario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='familias_token', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Familia de Tokens',
+                'verbose_name_plural': 'Familias de Tokens',
+                'db_table': 'familias_token',
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0004_familiatoken'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='familiatoken',
+            name='rotada_en',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
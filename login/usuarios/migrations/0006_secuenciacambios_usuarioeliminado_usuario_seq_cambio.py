@@ -0,0 +1,58 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:27
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import F, Max
+
+
+def asignar_secuencia(apps, schema_editor):
+    # Los usuarios existentes entran al feed en orden de id, y la secuencia
+    # sigue desde el mayor
+    alias = schema_editor.connection.alias
+    Usuario = apps.get_model('usuarios', 'Usuario')
+    SecuenciaCambios = apps.get_model('usuarios', 'SecuenciaCambios')
+    Usuario.objects.using(alias).update(seq_cambio=F('id'))
+    maximo = Usuario.objects.using(alias).aggregate(maximo=Max('id'))['maximo'] or 0
+    SecuenciaCambios.objects.using(alias).create(nombre='usuarios', valor=maximo)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0005_familiatoken_rotada_en'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SecuenciaCambios',
+            fields=[
+                ('nombre', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('valor', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Secuencia de Cambios',
+                'verbose_name_plural': 'Secuencias de Cambios',
+                'db_table': 'secuencias_cambios',
+            },
+        ),
+        migrations.CreateModel(
+            name='UsuarioEliminado',
+            fields=[
+                ('usuario_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('username', models.CharField(max_length=150)),
+                ('seq_cambio', models.BigIntegerField(db_index=True)),
+                ('eliminado_en', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Usuario Eliminado',
+                'verbose_name_plural': 'Usuarios Eliminados',
+                'db_table': 'usuarios_eliminados',
+            },
+        ),
+        migrations.AddField(
+            model_name='usuario',
+            name='seq_cambio',
+            field=models.BigIntegerField(db_index=True, default=0, editable=False),
+        ),
+        migrations.RunPython(asignar_secuencia, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-19 18:40
+
+import django.db.models.manager
+import usuarios.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuarios', '0006_secuenciacambios_usuarioeliminado_usuario_seq_cambio'),
+    ]
+
+    operations = [
+        migrations.AlterModelManagers(
+            name='usuario',
+            managers=[
+                ('objects', django.db.models.manager.Manager()),
+                ('con_eliminados', usuarios.models.UsuarioManager()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='usuario',
+            name='eliminado_en',
+            field=models.DateTimeField(blank=True, db_index=True, editable=False, null=True),
+        ),
+    ]
@@ -1,5 +1,11 @@
-from django.contrib.auth.models import AbstractUser
-from django.db import models
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import AbstractUser, UserManager
+from django.db import models, router, transaction
+from django.db.models import F
+from django.utils import timezone
 
 # Create your models here.
 
@@ -30,6 +36,131 @@ class Rol(models.Model):
         verbose_name_plural = "Roles"
 
 
+class UsuarioQuerySet(models.QuerySet):
+    """
+    Con sharding, las consultas por id, username o email se dirigen solas
+    al shard del usuario (ver usuarios/shards.py). Así siguen funcionando
+    sin cambios JWTAuthentication, ModelBackend, UniqueValidator, etc.
+    """
+
+    def filter(self, *args, **kwargs):
+        queryset = super().filter(*args, **kwargs)
+        if settings.USUARIOS_SHARDS and queryset._db is None:
+            from .shards import shard_para_filtro
+            alias = shard_para_filtro(kwargs)
+            if alias is not None:
+                queryset = queryset.using(alias)
+        return queryset
+
+
+class UsuarioManager(UserManager.from_queryset(UsuarioQuerySet)):
+    pass
+
+
+class UsuarioVigenteManager(UsuarioManager):
+    """
+    Manager por defecto: oculta los usuarios dados de baja (eliminado_en),
+    que siguen en la tabla hasta que usuarios/depuracion.py los borra.
+    Usuario.con_eliminados los incluye.
+    """
+    # Las migraciones usan UsuarioManager, sin el filtro
+    use_in_migrations = False
+
+    def get_queryset(self):
+        return super().get_queryset().filter(eliminado_en__isnull=True)
+
+    def dar_de_baja(self, usuario):
+        """
+        Baja lógica: marca al usuario eliminado e inactivo en un único
+        UPDATE y deja su lápida para el feed de cambios. El borrado de sus
+        datos queda para usuarios/depuracion.py. Retorna False si ya estaba
+        dado de baja.
+        """
+        alias = router.db_for_write(self.model, instance=usuario)
+        ahora = timezone.now()
+        with transaction.atomic(using=alias):
+            marcado = self.model._base_manager.using(alias).filter(
+                pk=usuario.pk, eliminado_en__isnull=True
+            ).update(eliminado_en=ahora, is_active=False)
+            if not marcado:
+                return False
+            UsuarioEliminado.objects.using(alias).create(
+                usuario_id=usuario.pk,
+                username=usuario.username,
+                seq_cambio=SecuenciaCambios.objects.db_manager(alias).reservar(SecuenciaCambios.USUARIOS),
+                eliminado_en=ahora,
+            )
+        usuario.eliminado_en, usuario.is_active = ahora, False
+        return True
+
+
+class SecuenciaCambiosManager(models.Manager):
+
+    def reservar(self, nombre, cantidad=1):
+        """
+        Reservar `cantidad` valores consecutivos de la secuencia y retornar
+        el primero. Llamar dentro de la transacción del cambio: la fila del
+        contador queda bloqueada hasta el commit, así que los cambios se
+        hacen visibles en el orden de su secuencia.
+        """
+        with transaction.atomic(using=self.db, savepoint=False):
+            if not self.filter(pk=nombre).update(valor=F('valor') + cantidad):
+                self.create(nombre=nombre, valor=cantidad)
+            return self.filter(pk=nombre).values_list('valor', flat=True).get() - cantidad + 1
+
+
+class SecuenciaCambios(models.Model):
+    """
+    Contador monótono por base para el feed de cambios (seq_cambio). Con
+    sharding cada shard tiene el suyo.
+    """
+    USUARIOS = 'usuarios'
+
+    nombre = models.CharField(max_length=50, primary_key=True)
+    valor = models.BigIntegerField(default=0)
+
+    objects = SecuenciaCambiosManager()
+
+    class Meta:
+        db_table = 'secuencias_cambios'
+        verbose_name = "Secuencia de Cambios"
+        verbose_name_plural = "Secuencias de Cambios"
+
+    def __str__(self):
+        return f"{self.nombre}: {self.valor}"
+
+
+class DirectorioManager(models.Manager):
+
+    def registrar(self, usuario, update_fields=None):
+        """Reservar el id de un usuario nuevo o reflejar cambios de username/email."""
+        if usuario.pk is None:
+            usuario.pk = self.create(username=usuario.username, email=usuario.email).pk
+        elif update_fields is None or {'username', 'email'} & set(update_fields):
+            self.filter(pk=usuario.pk).update(username=usuario.username, email=usuario.email)
+
+
+class DirectorioUsuario(models.Model):
+    """
+    Directorio global de usuarios, solo se usa con sharding y vive en
+    'default'. Reserva el id de cada usuario (único entre shards) y resuelve
+    username o email a ese id en una sola consulta por índice; el shard
+    sale del id (ver usuarios/shards.py).
+    """
+    username = models.CharField(max_length=150, unique=True)
+    email = models.EmailField(blank=True, db_index=True)
+
+    objects = DirectorioManager()
+
+    class Meta:
+        db_table = 'directorio_usuarios'
+        verbose_name = "Entrada del directorio de usuarios"
+        verbose_name_plural = "Directorio de usuarios"
+
+    def __str__(self):
+        return self.username
+
+
 class Usuario(AbstractUser):
     """
     Modelo personalizado de usuario.
@@ -64,10 +195,153 @@ class Usuario(AbstractUser):
         verbose_name="Rol"
     )
 
+    # Posición del último cambio en el feed de cambios (AdminUsuarioViewSet.cambios)
+    seq_cambio = models.BigIntegerField(default=0, db_index=True, editable=False)
+
+    # Baja lógica: el usuario deja de existir para la aplicación y sus
+    # datos se borran después, en segundo plano
+    eliminado_en = models.DateTimeField(null=True, blank=True, db_index=True, editable=False)
+
+    objects = UsuarioVigenteManager()
+    con_eliminados = UsuarioManager()
+
+    # Guardar solo estos campos no cuenta como cambio para el feed
+    CAMPOS_SIN_CAMBIO = frozenset({'last_login'})
+
     class Meta:
         db_table = 'usuarios'
         verbose_name = "Usuario"
         verbose_name_plural = "Usuarios"
+        indexes = [
+            # Orden del listado de administración y cursor entre shards
+            models.Index(fields=['date_joined', 'id'], name='usuarios_date_joined_idx'),
+            # Login por email (usuarios/shards.py: buscar_por_identificador)
+            models.Index(fields=['email'], name='usuarios_email_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.username} - {self.rol_usuario.name if self.rol_usuario else 'Sin rol'}"
+
+    def save(self, *args, **kwargs):
+        if not settings.USUARIOS_SHARDS:
+            return self._guardar_con_secuencia(*args, **kwargs)
+
+        # El directorio asigna el id, y el id decide el shard
+        nuevo = self.pk is None
+        DirectorioUsuario.objects.registrar(self, kwargs.get('update_fields'))
+        if nuevo:
+            kwargs['force_insert'] = True
+        try:
+            self._guardar_con_secuencia(*args, **kwargs)
+        except Exception:
+            if nuevo:
+                DirectorioUsuario.objects.filter(pk=self.pk).delete()
+                self.pk = None
+            raise
+
+    def _guardar_con_secuencia(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and set(update_fields) <= self.CAMPOS_SIN_CAMBIO:
+            return super().save(*args, **kwargs)
+
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'seq_cambio'}
+        alias = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=alias):
+            self.seq_cambio = SecuenciaCambios.objects.db_manager(alias).reservar(SecuenciaCambios.USUARIOS)
+            super().save(*args, **kwargs)
+
+
+class UsuarioEliminado(models.Model):
+    """
+    Lápida de un usuario eliminado, para que el feed de cambios avise a
+    los clientes que tenían la fila. Se crea en la señal post_delete.
+    """
+    usuario_id = models.BigIntegerField(primary_key=True)
+    username = models.CharField(max_length=150)
+    seq_cambio = models.BigIntegerField(db_index=True)
+    eliminado_en = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        db_table = 'usuarios_eliminados'
+        verbose_name = "Usuario Eliminado"
+        verbose_name_plural = "Usuarios Eliminados"
+
+    def __str__(self):
+        return f"{self.usuario_id} {self.username}"
+
+
+class FamiliaTokenManager(models.Manager):
+
+    def rotar(self, familia_id, generacion, expira):
+        """
+        Avanzar la generación si el token presentado es el vigente: un único
+        UPDATE condicional. Retorna False si ya se había rotado (token
+        reutilizado) o si la familia está revocada o no existe.
+        """
+        return bool(
+            self.filter(pk=familia_id, generacion=generacion, revocada_en__isnull=True)
+            .update(generacion=F('generacion') + 1, expira=expira, rotada_en=timezone.now())
+        )
+
+    def revocar(self, familia_id, motivo):
+        """Revocar la familia entera (todas sus generaciones) en una escritura."""
+        return self.filter(pk=familia_id, revocada_en__isnull=True).update(
+            revocada_en=timezone.now(), motivo=motivo
+        )
+
+    def vigente(self, familia_id):
+        """La familia no está revocada y su usuario sigue activo y sin dar de baja."""
+        return self.filter(
+            pk=familia_id, revocada_en__isnull=True,
+            usuario__is_active=True, usuario__eliminado_en__isnull=True
+        ).exists()
+
+    def revocar_por_reutilizacion(self, familia_id, generacion, gracia):
+        """
+        Revocar la familia ante un token ya rotado, salvo que sea el
+        inmediatamente anterior y la rotación tenga menos de `gracia`
+        segundos: eso es un refresh concurrente, no un robo.
+        """
+        limite = timezone.now() - timedelta(seconds=gracia)
+        return (
+            self.filter(pk=familia_id, revocada_en__isnull=True)
+            .exclude(generacion=generacion + 1, rotada_en__gte=limite)
+            .update(revocada_en=timezone.now(), motivo=FamiliaToken.MOTIVO_REUTILIZACION)
+        )
+
+
+class FamiliaToken(models.Model):
+    """
+    Sesión iniciada con un login: la cadena de refresh tokens rotados.
+    Reemplaza las filas de OutstandingToken/BlacklistedToken por token:
+    cada refresh lleva la familia y su generación, y solo la generación
+    vigente puede rotarse. Vive en la base del usuario.
+    """
+    MOTIVO_LOGOUT = 'logout'
+    MOTIVO_REUTILIZACION = 'reutilizacion'
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    usuario = models.ForeignKey(
+        Usuario,
+        on_delete=models.CASCADE,
+        related_name='familias_token',
+        verbose_name="Usuario"
+    )
+    generacion = models.PositiveIntegerField(default=0, verbose_name="Generación")
+    creada = models.DateTimeField(default=timezone.now)
+    # Vencimiento del último refresh emitido; después la fila sobra
+    expira = models.DateTimeField(db_index=True)
+    rotada_en = models.DateTimeField(null=True, blank=True)
+    revocada_en = models.DateTimeField(null=True, blank=True)
+    motivo = models.CharField(max_length=20, blank=True)
+
+    objects = FamiliaTokenManager()
+
+    class Meta:
+        db_table = 'familias_token'
+        verbose_name = "Familia de Tokens"
+        verbose_name_plural = "Familias de Tokens"
 
     def __str__(self):
-        return f"{self.username} - {self.rol_usuario.name if self.rol_usuario else 'Sin rol'}"
\ No newline at end of file
+        return f"{self.usuario_id} {self.id} gen {self.generacion}"
@@ -0,0 +1,143 @@
+import base64
+import binascii
+import heapq
+import json
+from itertools import islice
+
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Max, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+LIMITE_POR_DEFECTO = 20
+LIMITE_MAXIMO = 100
+
+
+class CursorInvalido(ValueError):
+    """El cursor recibido no se pudo decodificar."""
+
+
+def codificar_cursor(fecha, pk):
+    """Cursor opaco con la posición (fecha, id) del último elemento entregado."""
+    crudo = json.dumps([fecha.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(crudo).decode()
+
+
+def decodificar_cursor(cursor):
+    try:
+        fecha, pk = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        fecha = parse_datetime(fecha)
+    except (binascii.Error, ValueError, TypeError):
+        raise CursorInvalido(cursor)
+    if fecha is None or not isinstance(pk, int):
+        raise CursorInvalido(cursor)
+    return fecha, pk
+
+
+def leer_limite(valor, por_defecto=LIMITE_POR_DEFECTO, maximo=LIMITE_MAXIMO):
+    """Interpretar el parámetro ?limit= acotándolo a [1, maximo]."""
+    try:
+        limite = int(valor)
+    except (TypeError, ValueError):
+        return por_defecto
+    return max(1, min(limite, maximo))
+
+
+def paginar_por_cursor(queryset, cursor=None, limite=LIMITE_POR_DEFECTO, campo='created'):
+    """
+    Paginación por cursor (keyset) en orden descendente de (campo, id).
+    A diferencia de OFFSET, el costo de cada página no depende de su
+    profundidad: el cursor se traduce a un rango sobre el índice.
+
+    Retorna (elementos, siguiente_cursor). siguiente_cursor es None
+    cuando no quedan más elementos.
+    """
+    if cursor:
+        fecha, pk = decodificar_cursor(cursor)
+        queryset = queryset.filter(
+            Q(**{f'{campo}__lt': fecha}) | Q(**{campo: fecha, 'id__lt': pk})
+        )
+
+    # Se pide un elemento extra para saber si existe una página siguiente
+    elementos = list(queryset.order_by(f'-{campo}', '-id')[:limite + 1])
+    siguiente = None
+    if len(elementos) > limite:
+        elementos = elementos[:limite]
+        ultimo = elementos[-1]
+        siguiente = codificar_cursor(getattr(ultimo, campo), ultimo.pk)
+    return elementos, siguiente
+
+
+def paginar_por_cursor_varios(querysets, cursor=None, limite=LIMITE_POR_DEFECTO, campo='created'):
+    """
+    paginar_por_cursor sobre varias bases a la vez (scatter-gather).
+    Cada queryset entrega su página ya ordenada y se mezclan con
+    heapq.merge. Requiere ids únicos entre querysets para que el mismo
+    cursor valga en todos.
+    """
+    paginas = [paginar_por_cursor(queryset, cursor, limite, campo) for queryset in querysets]
+    mezcla = heapq.merge(
+        *(elementos for elementos, _ in paginas),
+        key=lambda elemento: (getattr(elemento, campo), elemento.pk),
+        reverse=True
+    )
+    elementos = list(islice(mezcla, limite))
+
+    hay_mas = (
+        sum(len(elementos_pagina) for elementos_pagina, _ in paginas) > limite
+        or any(siguiente for _, siguiente in paginas)
+    )
+    siguiente = None
+    if hay_mas and elementos:
+        ultimo = elementos[-1]
+        siguiente = codificar_cursor(getattr(ultimo, campo), ultimo.pk)
+    return elementos, siguiente
+
+
+def estimar_filas(modelo, alias):
+    """
+    Cantidad aproximada de filas de la tabla de `modelo`, sin recorrerla:
+    la estadística del planificador (reltuples en PostgreSQL, sqlite_stat1
+    en SQLite tras ANALYZE) o, si no la hay, el mayor id.
+    """
+    conexion = connections[alias]
+    tabla = modelo._meta.db_table
+    with conexion.cursor() as cursor:
+        if conexion.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [tabla])
+            fila = cursor.fetchone()
+            if fila and fila[0] > 0:
+                return fila[0]
+        elif conexion.vendor == 'sqlite':
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'")
+            if cursor.fetchone():
+                cursor.execute("SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [tabla])
+                fila = cursor.fetchone()
+                if fila:
+                    return int(fila[0].split()[0])
+    return modelo._base_manager.using(alias).aggregate(maximo=Max('pk'))['maximo'] or 0
+
+
+class PaginadorEstimado(Paginator):
+    """
+    Paginator para listados grandes del admin que evita COUNT(*) sobre la
+    tabla entera. Sin filtros (`estimar`) usa estimar_filas(); con filtros
+    cuenta, pero solo hasta LIMITE_CONTEO filas.
+    """
+    # Por debajo de esto contar de verdad es barato
+    UMBRAL_ESTIMACION = 10_000
+    LIMITE_CONTEO = 10_000
+
+    def __init__(self, *args, estimar=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.estimar = estimar
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if self.estimar:
+            estimado = estimar_filas(queryset.model, queryset.db)
+            if estimado > self.UMBRAL_ESTIMACION:
+                return estimado
+        return queryset[:self.LIMITE_CONTEO].count()
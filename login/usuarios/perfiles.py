@@ -0,0 +1,53 @@
+"""
+Datos del usuario en las respuestas de sesión (login y /auth/me/).
+
+Por defecto se responde el perfil de sesión: lo que el frontend usa para
+rutear y saludar (id, username, nombre y rol, con la misma forma que en
+UsuarioSerializer) más los campos que settings.PERFILES_SESION agrega
+para cada rol. Se arma con los campos ya cargados del usuario y, si el
+token trae el claim del rol, sin leer la tabla de roles.
+
+?perfil=completo devuelve el UsuarioSerializer entero, como antes.
+"""
+from django.conf import settings
+
+from .serializers import UsuarioSerializer
+from .tokens import CLAIM_ROL
+
+PERFIL_COMPLETO = 'completo'
+CAMPOS_SESION = ('id', 'username', 'first_name', 'last_name')
+
+
+def pide_perfil_completo(request):
+    return request.GET.get('perfil') == PERFIL_COMPLETO
+
+
+def _rol(usuario, claims):
+    """Rol {id, name} desde el claim del token si coincide con el del usuario."""
+    if usuario.rol_usuario_id is None:
+        return None
+    rol = claims.get(CLAIM_ROL) if claims is not None else None
+    # Si el rol cambió después de emitir el token, el claim no sirve
+    if rol and rol[0] == usuario.rol_usuario_id:
+        return {'id': rol[0], 'name': rol[1]}
+    return {'id': usuario.rol_usuario_id, 'name': usuario.rol_usuario.name}
+
+
+def perfil_sesion(usuario, claims=None):
+    """Perfil de sesión de `usuario`. `claims`: el token validado de la petición, si hay."""
+    rol = _rol(usuario, claims)
+    campos = CAMPOS_SESION + tuple(settings.PERFILES_SESION.get(rol and rol['name'], ()))
+    datos = {}
+    for campo in campos:
+        valor = getattr(usuario, campo)
+        # Fechas como texto ISO, igual que el serializador
+        datos[campo] = valor.isoformat() if hasattr(valor, 'isoformat') else valor
+    datos['rol_usuario'] = rol
+    return datos
+
+
+def datos_usuario(request, usuario, claims=None):
+    """Perfil de sesión o, con ?perfil=completo, el usuario serializado."""
+    if pide_perfil_completo(request):
+        return UsuarioSerializer(usuario).data
+    return perfil_sesion(usuario, claims)
@@ -0,0 +1,102 @@
+"""
+Refresh con ventana de gracia (settings.REFRESH_VENTANA_GRACIA).
+
+Cuando varias peticiones del frontend reciben 401 a la vez, todas piden
+un refresh con el mismo token. Solo la primera rota (un UPDATE); las
+demás esperan y reciben el mismo par nuevo, guardado en la cache durante
+la ventana (una entrada por familia, que revocar() borra). Antes de
+reenviarlo se comprueba que la familia siga vigente y el usuario activo.
+El candado es por token: un hilo por proceso lo espera con un Lock y los
+demás procesos con cache.add (con una cache compartida).
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+
+from .tokens import CLAIM_GENERACION
+
+# Tope para esperar a que otro proceso termine de rotar el mismo token
+ESPERA_MAXIMA = 3.0
+INTERVALO_ESPERA = 0.05
+
+# clave -> [Lock, hilos que lo usan]
+_candados = {}
+_candados_lock = threading.Lock()
+
+
+@contextmanager
+def _candado_local(clave):
+    with _candados_lock:
+        entrada = _candados.setdefault(clave, [threading.Lock(), 0])
+        entrada[1] += 1
+    try:
+        with entrada[0]:
+            yield
+    finally:
+        with _candados_lock:
+            entrada[1] -= 1
+            if entrada[1] == 0:
+                del _candados[clave]
+
+
+def _par_guardado(refresh, clave, generacion):
+    """
+    Par guardado para esta generación del token, o None. Se reenvía sin
+    rotar, así que antes se comprueba que la sesión siga abierta: un
+    logout, una reutilización o la baja del usuario dentro de la ventana
+    no pueden devolver tokens válidos.
+    """
+    guardado = cache.get(clave)
+    if guardado is None or guardado[0] != generacion:
+        return None
+    if not refresh.sigue_vigente():
+        raise TokenError("El token ya fue usado o la sesión fue cerrada")
+    return guardado[1]
+
+
+def _esperar_otro_proceso(refresh, clave, generacion, clave_candado):
+    limite = time.monotonic() + ESPERA_MAXIMA
+    while time.monotonic() < limite:
+        resultado = _par_guardado(refresh, clave, generacion)
+        if resultado is not None or cache.get(clave_candado) is None:
+            return resultado
+        time.sleep(INTERVALO_ESPERA)
+    return None
+
+
+def refrescar(refresh, generar):
+    """
+    Par nuevo para `refresh`, generado por `generar()` una sola vez por
+    ventana de gracia aunque lleguen varias peticiones a la vez.
+    """
+    ventana = settings.REFRESH_VENTANA_GRACIA
+    if not ventana:
+        return generar()
+
+    # generar() rota el token: la clave y la generación se toman antes
+    clave = refresh.clave_gracia
+    generacion = refresh.payload.get(CLAIM_GENERACION)
+    resultado = _par_guardado(refresh, clave, generacion)
+    if resultado is not None:
+        return resultado
+
+    clave_candado = f'{clave}:{generacion}:candado'
+    with _candado_local(clave_candado):
+        resultado = _par_guardado(refresh, clave, generacion)
+        if resultado is not None:
+            return resultado
+
+        if not cache.add(clave_candado, 1, timeout=ESPERA_MAXIMA):
+            resultado = _esperar_otro_proceso(refresh, clave, generacion, clave_candado)
+            if resultado is not None:
+                return resultado
+        try:
+            resultado = generar()
+            cache.set(clave, (generacion, resultado), timeout=ventana)
+        finally:
+            cache.delete(clave_candado)
+    return resultado
@@ -1,8 +1,16 @@
 from rest_framework import serializers
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.validators import UniqueValidator
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.contrib.auth import authenticate
+from django.contrib.auth.validators import UnicodeUsernameValidator
+from login.metrics import SerializacionMedida
 from .models import Usuario, Rol
+from .refresco import refrescar
+from .tokens import RefreshTokenUsuario
 
-class RolSerializer(serializers.ModelSerializer):
+class RolSerializer(SerializacionMedida, serializers.ModelSerializer):
     """
     Serializador básico para el modelo Rol
     """
@@ -11,7 +19,7 @@ class RolSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'descripcion']
 
 
-class UsuarioSerializer(serializers.ModelSerializer):
+class UsuarioSerializer(SerializacionMedida, serializers.ModelSerializer):
     """
     Serializador para el modelo Usuario
     Incluye información del rol anidada y campo para escritura
@@ -33,6 +41,32 @@ class UsuarioSerializer(serializers.ModelSerializer):
             'last_login'
         ]
         read_only_fields = ['id', 'date_joined', 'last_login']
+        extra_kwargs = {
+            # Un usuario dado de baja conserva su username hasta que se depura
+            'username': {'validators': [
+                UnicodeUsernameValidator(),
+                UniqueValidator(
+                    queryset=Usuario.con_eliminados.all(),
+                    message=Usuario._meta.get_field('username').error_messages['unique']
+                ),
+            ]},
+        }
+
+    def update(self, instance, validated_data):
+        """
+        Guardar solo los campos que cambiaron, en un único UPDATE; si no
+        cambió nada no se escribe. Los campos guardados quedan en
+        self.campos_cambiados.
+        """
+        self.campos_cambiados = [
+            campo for campo, valor in validated_data.items()
+            if getattr(instance, campo) != valor
+        ]
+        for campo in self.campos_cambiados:
+            setattr(instance, campo, validated_data[campo])
+        if self.campos_cambiados:
+            instance.save(update_fields=self.campos_cambiados)
+        return instance
 
 
 class LoginSerializer(serializers.Serializer):
@@ -48,24 +82,12 @@ class LoginSerializer(serializers.Serializer):
         password = data.get('password')
 
         if username_email and password:
-            # Intentar autenticar como username
+            # UsernameEmailBackend resuelve username o email en una búsqueda
             user = authenticate(
                 request=self.context.get('request'),
                 username=username_email,
                 password=password
             )
-            
-            # Si falla, probar como email
-            if not user:
-                try:
-                    user_obj = Usuario.objects.get(email=username_email)
-                    user = authenticate(
-                        request=self.context.get('request'),
-                        username=user_obj.username,
-                        password=password
-                    )
-                except Usuario.DoesNotExist:
-                    pass
 
             if not user:
                 raise serializers.ValidationError(
@@ -90,4 +112,32 @@ class TokenResponseSerializer(serializers.Serializer):
     """
     access = serializers.CharField()
     refresh = serializers.CharField()
-    user = UsuarioSerializer()
\ No newline at end of file
+    user = UsuarioSerializer()
+
+
+class RefreshTokenSerializer(TokenRefreshSerializer):
+    """
+    Serializador del refresh con RefreshTokenUsuario: la rotación es un
+    UPDATE condicional sobre la familia del token, sin filas de lista negra
+    """
+    token_class = RefreshTokenUsuario
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        # Refresh concurrentes del mismo token reciben el mismo par nuevo
+        return refrescar(refresh, lambda: self.rotar(refresh))
+
+    def rotar(self, refresh):
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = Usuario.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.rotar()
+            data['refresh'] = str(refresh)
+        return data
@@ -0,0 +1,133 @@
+"""
+Sharding de usuarios (settings.USUARIOS_SHARDS).
+
+Cada usuario vive en el shard usuarios_<id % N>, junto a sus tokens.
+El id es global: lo reserva DirectorioUsuario en 'default', que además
+resuelve username o email -> id por índice. Los roles se copian a
+todos los shards para que Usuario.rol_usuario se resuelva sin salir del
+shard.
+"""
+from django.conf import settings
+from django.db.models import CASCADE
+from django.db.models.signals import post_delete, post_save
+
+from .models import DirectorioUsuario, Rol, Usuario
+
+# Modelos cuyas filas viven en el shard del usuario
+MODELOS_SHARD = frozenset({
+    'usuarios.usuario',
+    'usuarios.usuario_groups',
+    'usuarios.usuario_user_permissions',
+    'usuarios.familiatoken',
+    'usuarios.usuarioeliminado',
+    'usuarios.secuenciacambios',
+    'token_blacklist.outstandingtoken',
+    'token_blacklist.blacklistedtoken',
+})
+
+# Modelos presentes en todos los shards, referenciados por los anteriores
+MODELOS_REPLICADOS = frozenset({
+    'usuarios.rol',
+    'auth.group',
+    'auth.permission',
+    'contenttypes.contenttype',
+})
+
+CAMPOS_ID = ('pk', 'id', 'pk__exact', 'id__exact')
+
+
+def shard_de_id(user_id):
+    """Hash estable: id global módulo N (ids secuenciales -> reparto parejo)."""
+    aliases = settings.USUARIOS_SHARDS_ALIAS
+    return aliases[int(user_id) % len(aliases)]
+
+
+def db_de_usuario(user_id):
+    """Base donde están el usuario y sus tokens."""
+    if settings.USUARIOS_SHARDS and user_id is not None:
+        return shard_de_id(user_id)
+    return 'default'
+
+
+def shard_para_filtro(filtros):
+    """
+    Shard que resuelve un filtro por id, username o email, o None si el
+    filtro no lo determina (p. ej. un listado, que hay que repartir).
+    """
+    for campo in CAMPOS_ID:
+        if campo in filtros:
+            try:
+                return shard_de_id(filtros[campo])
+            except (TypeError, ValueError):
+                return None
+
+    # UniqueValidator filtra con username__exact
+    for campo in ('username', 'username__exact', 'email', 'email__exact'):
+        if campo in filtros:
+            ids = DirectorioUsuario.objects.filter(
+                **{campo: filtros[campo]}
+            ).values_list('pk', flat=True)
+            shards = {shard_de_id(pk) for pk in ids}
+            return shards.pop() if len(shards) == 1 else None
+    return None
+
+
+def _usuario_unico(**filtro):
+    """Usuario (con su rol) que cumple `filtro` si es uno solo, o None."""
+    if settings.USUARIOS_SHARDS:
+        ids = list(DirectorioUsuario.objects.filter(**filtro).values_list('pk', flat=True)[:2])
+        if len(ids) != 1:
+            return None
+        filtro = {'pk': ids[0]}
+    usuarios = list(Usuario.objects.select_related('rol_usuario').filter(**filtro)[:2])
+    return usuarios[0] if len(usuarios) == 1 else None
+
+
+def buscar_por_identificador(valor):
+    """
+    Usuarios (con su rol) que `valor` puede identificar, de a uno: primero
+    el de ese username y, solo si se pide el siguiente (no existe o la
+    contraseña no coincide), el de ese email. Cada paso es una búsqueda
+    por índice; un email compartido por varios usuarios no identifica a
+    ninguno.
+    """
+    usuario = _usuario_unico(username=valor)
+    if usuario is not None:
+        yield usuario
+    por_email = _usuario_unico(email=valor)
+    if por_email is not None and (usuario is None or por_email.pk != usuario.pk):
+        yield por_email
+
+
+# Señales (se conectan en UsuariosConfig.ready solo con sharding)
+
+def _usuario_eliminado(sender, instance, **kwargs):
+    DirectorioUsuario.objects.filter(pk=instance.pk).delete()
+    # Las filas de otras apps que apuntan al usuario están en 'default',
+    # fuera del alcance del borrado en cascada del shard
+    for relacion in Usuario._meta.related_objects:
+        modelo = relacion.related_model
+        if relacion.on_delete is CASCADE and modelo._meta.label_lower not in MODELOS_SHARD:
+            modelo._base_manager.using('default').filter(
+                **{relacion.field.name: instance.pk}
+            ).delete()
+
+
+def _rol_guardado(sender, instance, using, **kwargs):
+    if using != 'default':
+        return
+    for alias in settings.USUARIOS_SHARDS_ALIAS:
+        Rol(pk=instance.pk, name=instance.name, descripcion=instance.descripcion).save(using=alias)
+
+
+def _rol_eliminado(sender, instance, using, **kwargs):
+    if using != 'default':
+        return
+    for alias in settings.USUARIOS_SHARDS_ALIAS:
+        Rol.objects.using(alias).filter(pk=instance.pk).delete()
+
+
+def conectar_senales():
+    post_delete.connect(_usuario_eliminado, sender=Usuario, dispatch_uid='shards_usuario_eliminado')
+    post_save.connect(_rol_guardado, sender=Rol, dispatch_uid='shards_rol_guardado')
+    post_delete.connect(_rol_eliminado, sender=Rol, dispatch_uid='shards_rol_eliminado')
@@ -1,3 +1,134 @@
-from django.test import TestCase
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest import mock
 
-# Create your tests here.
+import jwt
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.exceptions import TokenBackendError
+
+from .claves_jwt import BackendClavesJWT, almacen
+from .models import FamiliaToken, Rol, Usuario
+from .tokens import RefreshTokenUsuario
+
+
+def crear_usuario():
+    rol = Rol.objects.create(name="Estudiante")
+    return Usuario.objects.create_user(
+        username="estudiante", email="estudiante@test.com", password="Clave12345!",
+        rol_usuario=rol
+    )
+
+
+class RefrescoConcurrenteTests(TransactionTestCase):
+    """Varios refresh a la vez con el mismo token rotan una sola vez."""
+
+    def setUp(self):
+        cache.clear()
+        self.usuario = crear_usuario()
+
+    def test_refresh_concurrente_un_solo_par(self):
+        refresh = str(RefreshTokenUsuario.for_user(self.usuario))
+        respuestas = []
+        barrera = threading.Barrier(4)
+
+        def refrescar():
+            barrera.wait()
+            try:
+                respuestas.append(APIClient().post('/api/auth/refresh/', {'refresh': refresh}, format='json'))
+            finally:
+                connection.close()
+
+        hilos = [threading.Thread(target=refrescar) for _ in range(4)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        self.assertEqual([r.status_code for r in respuestas], [200] * 4)
+        self.assertEqual(len({r.data['refresh'] for r in respuestas}), 1)
+        familia = FamiliaToken.objects.get()
+        self.assertEqual(familia.generacion, 1)
+        self.assertIsNone(familia.revocada_en)
+
+
+class RefrescoTests(APITestCase):
+    """Ventana de gracia del refresh (usuarios/refresco.py) y revocación de la familia."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.usuario = crear_usuario()
+
+    def setUp(self):
+        cache.clear()
+        self.refresh = str(RefreshTokenUsuario.for_user(self.usuario))
+
+    def refrescar(self, refresh):
+        return self.client.post('/api/auth/refresh/', {'refresh': refresh}, format='json')
+
+    def test_refresh_repetido_en_la_ventana_mismo_par(self):
+        primera = self.refrescar(self.refresh)
+        segunda = self.refrescar(self.refresh)
+        self.assertEqual(primera.status_code, 200)
+        self.assertEqual(segunda.status_code, 200)
+        self.assertEqual(primera.data, segunda.data)
+
+    @override_settings(REFRESH_VENTANA_GRACIA=0)
+    def test_reutilizar_token_rotado_revoca_la_familia(self):
+        nuevo = self.refrescar(self.refresh).data['refresh']
+        self.assertEqual(self.refrescar(self.refresh).status_code, 401)
+        # El token robado se descubrió: el legítimo tampoco sirve
+        self.assertEqual(self.refrescar(nuevo).status_code, 401)
+        self.assertEqual(FamiliaToken.objects.get().motivo, FamiliaToken.MOTIVO_REUTILIZACION)
+
+    def test_refresh_tras_logout(self):
+        nuevo = self.refrescar(self.refresh).data
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {nuevo['access']}")
+        self.assertEqual(self.client.post('/api/auth/logout/', {'refresh': nuevo['refresh']}).status_code, 200)
+        self.client.credentials()
+        # Ni el token anterior (dentro de la ventana) ni el nuevo
+        self.assertEqual(self.refrescar(self.refresh).status_code, 401)
+        self.assertEqual(self.refrescar(nuevo['refresh']).status_code, 401)
+
+    def test_refresh_en_la_ventana_con_usuario_inactivo(self):
+        self.assertEqual(self.refrescar(self.refresh).status_code, 200)
+        Usuario.objects.filter(pk=self.usuario.pk).update(is_active=False)
+        self.assertEqual(self.refrescar(self.refresh).status_code, 401)
+
+    def test_refresh_en_la_ventana_con_usuario_dado_de_baja(self):
+        self.assertEqual(self.refrescar(self.refresh).status_code, 200)
+        Usuario.objects.dar_de_baja(self.usuario)
+        self.assertEqual(self.refrescar(self.refresh).status_code, 401)
+
+
+class TokensHS256Tests(TestCase):
+    """Tokens sin kid firmados con SIGNING_KEY (usuarios/claves_jwt.py)."""
+
+    CAMBIO = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+    def token(self, emitido):
+        return jwt.encode(
+            {'token_type': 'access', 'user_id': 1, 'jti': 'x', 'iat': int(emitido.timestamp()),
+             'exp': int((emitido + timedelta(days=365)).timestamp())},
+            settings.SECRET_KEY, algorithm='HS256',
+        )
+
+    def test_rechazado_sin_fecha_de_cambio(self):
+        backend = BackendClavesJWT(almacen)
+        with self.assertRaises(TokenBackendError):
+            backend.decode(self.token(self.CAMBIO - timedelta(days=1)))
+
+    def test_emitido_antes_del_cambio(self):
+        backend = BackendClavesJWT(almacen, hs256_hasta=self.CAMBIO)
+        with mock.patch.object(backend, 'acepta_hs256', return_value=True):
+            self.assertEqual(backend.decode(self.token(self.CAMBIO - timedelta(days=1)))['user_id'], 1)
+            with self.assertRaises(TokenBackendError):
+                backend.decode(self.token(self.CAMBIO + timedelta(seconds=1)))
+
+    def test_rechazado_pasado_el_plazo(self):
+        backend = BackendClavesJWT(almacen, hs256_hasta=self.CAMBIO)
+        self.assertTrue(backend.acepta_hs256(self.CAMBIO + timedelta(days=6)))
+        self.assertFalse(backend.acepta_hs256(self.CAMBIO + timedelta(days=7)))
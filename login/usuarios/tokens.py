@@ -0,0 +1,157 @@
+import logging
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, BlacklistMixin, RefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .claves_jwt import backend
+from .models import FamiliaToken
+from .shards import db_de_usuario
+
+logger = logging.getLogger(__name__)
+
+CLAIM_FAMILIA = 'fam'
+CLAIM_GENERACION = 'gen'
+# [id, nombre] del rol al emitir; lo copian el access token y las rotaciones
+CLAIM_ROL = 'rol'
+
+
+class AccessTokenUsuario(AccessToken):
+    """Access token firmado con las claves de usuarios.claves_jwt."""
+    _token_backend = backend
+
+
+class RefreshTokenUsuario(RefreshToken):
+    """
+    Refresh token de una familia (FamiliaToken) en la base del usuario.
+
+    Emitir, rotar y revocar cuestan una escritura cada uno y verificar
+    ninguna: la revocación se comprueba en el UPDATE condicional de la
+    rotación. Presentar una generación ya rotada se trata como robo y
+    revoca la familia completa.
+
+    Los tokens emitidos antes de las familias (sin claim 'fam') siguen
+    usando la lista negra de simplejwt hasta que vencen; al rotarlos
+    pasan a una familia nueva.
+    """
+    _token_backend = backend
+    access_token_class = AccessTokenUsuario
+    # El access token no hereda la familia ni la generación
+    no_copy_claims = RefreshToken.no_copy_claims + (CLAIM_FAMILIA, CLAIM_GENERACION)
+
+    @classmethod
+    def for_user(cls, user):
+        token = super(BlacklistMixin, cls).for_user(user)
+        # Solo si el rol ya está cargado: emitir no debe consultar la base
+        if type(user).rol_usuario.is_cached(user) and user.rol_usuario is not None:
+            token[CLAIM_ROL] = [user.rol_usuario.pk, user.rol_usuario.name]
+        token._iniciar_familia(user.pk)
+        return token
+
+    def _db(self):
+        return db_de_usuario(self.payload.get(api_settings.USER_ID_CLAIM))
+
+    def _iniciar_familia(self, user_id):
+        familia = FamiliaToken.objects.using(self._db()).create(
+            usuario_id=user_id,
+            expira=datetime_from_epoch(self.payload['exp']),
+        )
+        self[CLAIM_FAMILIA] = str(familia.pk)
+        self[CLAIM_GENERACION] = 0
+
+    @property
+    def de_familia(self):
+        return CLAIM_FAMILIA in self.payload
+
+    @property
+    def clave_gracia(self):
+        """
+        Clave del último par emitido en la cache de refresco
+        (usuarios/refresco.py). Es por familia para que revocar la borre.
+        """
+        if self.de_familia:
+            return f'refresh:{self[CLAIM_FAMILIA]}'
+        return f'refresh:{self[api_settings.JTI_CLAIM]}'
+
+    def sigue_vigente(self):
+        """La sesión no se cerró y el usuario sigue activo y sin dar de baja."""
+        if self.de_familia:
+            return FamiliaToken.objects.db_manager(self._db()).vigente(self.payload[CLAIM_FAMILIA])
+        try:
+            self.check_blacklist()
+        except TokenError:
+            return False
+        return get_user_model().objects.filter(
+            **{api_settings.USER_ID_FIELD: self.payload.get(api_settings.USER_ID_CLAIM)},
+            is_active=True
+        ).exists()
+
+    def check_blacklist(self):
+        if self.de_familia:
+            return
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if BlacklistedToken.objects.using(self._db()).filter(token__jti=jti).exists():
+            raise TokenError("El token está en la lista negra")
+
+    def rotar(self):
+        """
+        Convertir este token en el siguiente de su familia (nuevo jti, exp
+        e iat). Falla con TokenError si no era la generación vigente.
+        """
+        familia_id = self.payload.get(CLAIM_FAMILIA)
+        generacion = self.payload.get(CLAIM_GENERACION)
+        if not self.de_familia:
+            self._blacklist_antiguo()
+
+        self.set_jti()
+        self.set_exp()
+        self.set_iat()
+
+        if familia_id is None:
+            self._iniciar_familia(self.payload.get(api_settings.USER_ID_CLAIM))
+            return
+
+        familias = FamiliaToken.objects.db_manager(self._db())
+        if familias.rotar(familia_id, generacion, datetime_from_epoch(self.payload['exp'])):
+            self[CLAIM_GENERACION] = generacion + 1
+            return
+
+        # Generación vieja: alguien más tiene (o tuvo) este token
+        if familias.revocar_por_reutilizacion(familia_id, generacion, settings.REFRESH_VENTANA_GRACIA):
+            cache.delete(self.clave_gracia)
+            logger.warning(
+                "Reutilización de refresh token: familia %s revocada", familia_id,
+                extra={'evento': 'refresh_reutilizado',
+                       'usuario_id': self.payload.get(api_settings.USER_ID_CLAIM)}
+            )
+        raise TokenError("El token ya fue usado o la sesión fue cerrada")
+
+    def revocar(self, motivo=FamiliaToken.MOTIVO_LOGOUT):
+        """
+        Cerrar la sesión: revoca la familia entera con un UPDATE y borra el
+        par que la ventana de gracia guardaba para reenviar.
+        """
+        if not self.de_familia:
+            self._blacklist_antiguo()
+        else:
+            FamiliaToken.objects.db_manager(self._db()).revocar(self.payload[CLAIM_FAMILIA], motivo)
+        cache.delete(self.clave_gracia)
+
+    def _blacklist_antiguo(self):
+        user_id = self.payload.get(api_settings.USER_ID_CLAIM)
+        user = get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+        token, _ = OutstandingToken.objects.using(self._db()).get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM],
+            defaults={
+                'user': user,
+                'created_at': self.current_time,
+                'token': str(self),
+                'expires_at': datetime_from_epoch(self.payload['exp']),
+            },
+        )
+        BlacklistedToken.objects.using(self._db()).get_or_create(token=token)
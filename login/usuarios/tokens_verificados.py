@@ -0,0 +1,132 @@
+"""
+Cache LRU de access tokens ya verificados (settings.TOKENS_VERIFICADOS).
+
+El frontend reutiliza el mismo access token hasta que vence, y cada
+petición volvía a decodificarlo y a comprobar la firma. La cache guarda
+el token validado por el SHA-256 del token crudo hasta su 'exp'. Solo se
+evita la verificación: el usuario y su is_active se siguen comprobando
+en cada petición (JWTAuthentication.get_user).
+
+Es memoria del proceso. Al desactivar, dar de baja o eliminar un usuario
+(señales de Usuario y UsuarioEliminado) se quitan sus entradas con
+invalidar_usuario().
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from rest_framework_simplejwt.settings import api_settings
+
+from login.metrics import TOKENS_CACHE_AHORRO, TOKENS_CACHE_CONSULTAS
+
+
+class CacheTokens:
+    """LRU acotada: digest -> (token, exp, user_id), con índice por usuario."""
+
+    def __init__(self, tamano):
+        self.tamano = tamano
+        self._entradas = OrderedDict()
+        self._por_usuario = {}
+        self._lock = threading.Lock()
+        # Media móvil de lo que cuesta verificar, para estimar el ahorro
+        self._costo_verificar = 0.0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def _quitar(self, digest):
+        _token, _exp, user_id = self._entradas.pop(digest)
+        digests = self._por_usuario.get(user_id)
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._por_usuario[user_id]
+
+    def obtener(self, raw_token, verificar):
+        """Token validado desde la cache, o `verificar(raw_token)` y guardarlo."""
+        if not self.tamano:
+            return verificar(raw_token)
+
+        inicio = time.perf_counter()
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode()
+        digest = hashlib.sha256(raw_token).digest()
+        with self._lock:
+            entrada = self._entradas.get(digest)
+            if entrada is not None:
+                if entrada[1] > time.time():
+                    self._entradas.move_to_end(digest)
+                else:
+                    self._quitar(digest)
+                    entrada = None
+        if entrada is not None:
+            TOKENS_CACHE_CONSULTAS.incrementar(('hit',))
+            ahorro = self._costo_verificar - (time.perf_counter() - inicio)
+            if ahorro > 0:
+                TOKENS_CACHE_AHORRO.incrementar((), ahorro)
+            return entrada[0]
+
+        # Los tokens inválidos lanzan excepción y no se guardan
+        token = verificar(raw_token)
+        costo = time.perf_counter() - inicio
+        self._costo_verificar += (costo - self._costo_verificar) * 0.1
+        TOKENS_CACHE_CONSULTAS.incrementar(('miss',))
+
+        exp = token.payload.get('exp')
+        user_id = token.payload.get(api_settings.USER_ID_CLAIM)
+        if exp is None:
+            return token
+        with self._lock:
+            if digest in self._entradas:
+                self._quitar(digest)
+            self._entradas[digest] = (token, exp, user_id)
+            self._por_usuario.setdefault(user_id, set()).add(digest)
+            while len(self._entradas) > self.tamano:
+                self._quitar(next(iter(self._entradas)))
+        return token
+
+    def invalidar_usuario(self, user_id):
+        """Quitar todas las entradas de un usuario."""
+        # Los claims pueden traer el id como texto
+        with self._lock:
+            for clave in {user_id, str(user_id)}:
+                for digest in list(self._por_usuario.get(clave, ())):
+                    self._quitar(digest)
+
+    def vaciar(self):
+        with self._lock:
+            self._entradas.clear()
+            self._por_usuario.clear()
+
+
+cache_tokens = CacheTokens(settings.TOKENS_VERIFICADOS['TAMANO'])
+
+
+def invalidar_usuario(user_id):
+    cache_tokens.invalidar_usuario(user_id)
+
+
+def _usuario_guardado(sender, instance, **kwargs):
+    if not instance.is_active:
+        invalidar_usuario(instance.pk)
+
+
+def _usuario_eliminado(sender, instance, **kwargs):
+    invalidar_usuario(instance.pk)
+
+
+def _lapida_creada(sender, instance, created, **kwargs):
+    # La baja lógica es un UPDATE, sin señales de Usuario
+    if created:
+        invalidar_usuario(instance.usuario_id)
+
+
+def conectar_senales():
+    from .models import Usuario, UsuarioEliminado
+
+    post_save.connect(_usuario_guardado, sender=Usuario, dispatch_uid='tokens_usuario_guardado')
+    post_delete.connect(_usuario_eliminado, sender=Usuario, dispatch_uid='tokens_usuario_eliminado')
+    post_save.connect(_lapida_creada, sender=UsuarioEliminado, dispatch_uid='tokens_lapida_creada')
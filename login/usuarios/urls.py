@@ -1,13 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
+from .serializers import RefreshTokenSerializer
 from .views import LoginView, LogoutView, CurrentUserView
 
+# Bajo ASGI se pueden servir las versiones async (ver settings.API_ASYNC)
+if settings.API_ASYNC:
+    from .async_views import (
+        LoginAsyncView as LoginView,
+        LogoutAsyncView as LogoutView,
+        CurrentUserAsyncView as CurrentUserView,
+    )
+
 app_name = 'usuarios'
 
 urlpatterns = [
     # Autenticación
     path('auth/login/', LoginView.as_view(), name='login'),
     path('auth/logout/', LogoutView.as_view(), name='logout'),
-    path('auth/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('auth/refresh/', TokenRefreshView.as_view(serializer_class=RefreshTokenSerializer), name='token_refresh'),
     path('auth/me/', CurrentUserView.as_view(), name='current_user'),
 ]
\ No newline at end of file
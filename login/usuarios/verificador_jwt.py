@@ -0,0 +1,116 @@
+"""
+Verificación local de los access tokens de esta API, sin Django.
+
+Solo depende de PyJWT con cryptography, así que puede copiarse tal cual en
+otros servicios (o en despliegues separados de estudiantes y empresas):
+
+    verificador = VerificadorJWT('https://api.ejemplo.com/.well-known/jwks.json')
+    payload = verificador.verificar(token)  # TokenInvalido si no vale
+
+Las claves públicas quedan en memoria, así que verificar no hace llamadas
+de red. El JWKS se vuelve a pedir solo si llega un kid desconocido (una
+clave rotada), como mucho una vez cada `intervalo_minimo` segundos, o
+cuando vence `ttl`. Si el JWKS no responde se siguen usando las claves
+que ya se tenían. Con `jwks=` (p. ej. leído de un archivo) nunca se
+conecta.
+"""
+import json
+import logging
+import threading
+import time
+import urllib.request
+
+import jwt
+
+logger = logging.getLogger(__name__)
+
+
+class TokenInvalido(Exception):
+    """Token mal formado, con firma o kid no válidos, vencido o de otro tipo."""
+
+
+class VerificadorJWT:
+    def __init__(self, url_jwks=None, jwks=None, audiencia=None, emisor=None,
+                 tipo='access', ttl=24 * 60 * 60, intervalo_minimo=30, timeout=5, leeway=0):
+        if url_jwks is None and jwks is None:
+            raise ValueError("Se requiere url_jwks o jwks")
+        self.url_jwks = url_jwks
+        self.audiencia = audiencia
+        self.emisor = emisor
+        self.tipo = tipo
+        self.ttl = ttl
+        self.intervalo_minimo = intervalo_minimo
+        self.timeout = timeout
+        self.leeway = leeway
+
+        self._lock = threading.Lock()
+        self._claves = {}
+        self._vence = 0.0
+        self._pedido = None
+        if jwks is not None:
+            self._claves = self._leer(jwks)
+            self._vence = float('inf') if url_jwks is None else time.monotonic() + ttl
+
+    @staticmethod
+    def _leer(jwks):
+        claves = {}
+        for datos in jwks.get('keys', []):
+            try:
+                clave = jwt.PyJWK(datos)
+            except jwt.PyJWKError as e:
+                logger.warning("Clave del JWKS ignorada (%s): %s", datos.get('kid'), e)
+                continue
+            claves[clave.key_id] = clave
+        return claves
+
+    def _descargar(self):
+        self._pedido = time.monotonic()
+        try:
+            with urllib.request.urlopen(self.url_jwks, timeout=self.timeout) as respuesta:
+                claves = self._leer(json.load(respuesta))
+        except (OSError, ValueError) as e:
+            logger.warning("No se pudo obtener el JWKS de %s: %s", self.url_jwks, e)
+            return
+        self._claves = claves
+        self._vence = time.monotonic() + self.ttl
+
+    def _clave(self, kid):
+        clave = self._claves.get(kid)
+        if clave is not None and time.monotonic() < self._vence:
+            return clave
+        if self.url_jwks is None:
+            return clave
+        with self._lock:
+            ahora = time.monotonic()
+            vigente = kid in self._claves and ahora < self._vence
+            permitido = self._pedido is None or ahora - self._pedido >= self.intervalo_minimo
+            if not vigente and permitido:
+                self._descargar()
+            return self._claves.get(kid)
+
+    def verificar(self, token):
+        """Payload del token si es válido; si no, TokenInvalido."""
+        try:
+            kid = jwt.get_unverified_header(token).get('kid')
+        except jwt.InvalidTokenError as e:
+            raise TokenInvalido(str(e)) from e
+        clave = self._clave(kid)
+        if clave is None:
+            raise TokenInvalido(f"kid desconocido: {kid}")
+
+        try:
+            payload = jwt.decode(
+                token,
+                clave.key,
+                algorithms=[clave.algorithm_name],
+                audience=self.audiencia,
+                issuer=self.emisor,
+                leeway=self.leeway,
+                options={'verify_aud': self.audiencia is not None, 'require': ['exp']},
+            )
+        except jwt.InvalidTokenError as e:
+            raise TokenInvalido(str(e)) from e
+
+        if self.tipo is not None and payload.get('token_type') != self.tipo:
+            raise TokenInvalido("Tipo de token incorrecto")
+        return payload
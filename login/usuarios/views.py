@@ -2,11 +2,14 @@ from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
-from rest_framework_simplejwt.views import TokenRefreshView
+from django.conf import settings
 from django.contrib.auth import login
-from .serializers import LoginSerializer, UsuarioSerializer, TokenResponseSerializer
+from django.utils.cache import patch_cache_control
+from .serializers import LoginSerializer, TokenResponseSerializer
 from .models import Usuario
+from .perfiles import datos_usuario
+from .claves_jwt import almacen
+from .tokens import RefreshTokenUsuario
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,7 +18,8 @@ logger = logging.getLogger(__name__)
 class LoginView(APIView):
     """
     Vista para autenticar usuarios.
-    Acepta username/email + password y retorna tokens JWT + datos del usuario.
+    Acepta username/email + password y retorna tokens JWT + datos del usuario
+    (perfil de sesión; ?perfil=completo para el usuario entero).
     Permite acceso sin autenticación (AllowAny).
     """
     permission_classes = [AllowAny]
@@ -30,19 +34,22 @@ class LoginView(APIView):
             user = serializer.validated_data['user']
             
             # Generar tokens JWT
-            refresh = RefreshToken.for_user(user)
+            refresh = RefreshTokenUsuario.for_user(user)
             
             # Datos de respuesta
             response_data = {
                 'refresh': str(refresh),
                 'access': str(refresh.access_token),
-                'user': UsuarioSerializer(user).data
+                'user': datos_usuario(request, user)
             }
             
             # Opcional: Crear sesión en Django (si se necesita para admin)
             login(request, user)
             
-            logger.info(f"Login exitoso: {user.username} ({user.rol_usuario.name})")
+            logger.info(
+                "Login exitoso: %s (%s)", user.username, user.rol_usuario.name,
+                extra={'evento': 'login_exitoso', 'usuario': user.username}
+            )
             
             return Response(response_data, status=status.HTTP_200_OK)
         
@@ -61,9 +68,12 @@ class LogoutView(APIView):
         try:
             refresh_token = request.data.get("refresh")
             if refresh_token:
-                token = RefreshToken(refresh_token)
-                token.blacklist()  # Requiere activar blacklist en settings
-                logger.info(f"Logout exitoso: {request.user.username}")
+                token = RefreshTokenUsuario(refresh_token)
+                token.revocar()  # Revoca la familia: todos los refresh de la sesión
+                logger.info(
+                    "Logout exitoso: %s", request.user.username,
+                    extra={'evento': 'logout_exitoso', 'usuario': request.user.username}
+                )
                 return Response(
                     {"message": "Sesión cerrada correctamente"},
                     status=status.HTTP_200_OK
@@ -74,7 +84,7 @@ class LogoutView(APIView):
                     status=status.HTTP_400_BAD_REQUEST
                 )
         except Exception as e:
-            logger.error(f"Error en logout: {str(e)}")
+            logger.error("Error en logout: %s", e, extra={'evento': 'logout_error'})
             return Response(
                 {"error": "Error al cerrar sesión"},
                 status=status.HTTP_400_BAD_REQUEST
@@ -83,11 +93,26 @@ class LogoutView(APIView):
 
 class CurrentUserView(APIView):
     """
-    Vista para obtener los datos del usuario actual.
+    Vista para obtener los datos del usuario actual (perfil de sesión;
+    ?perfil=completo para el usuario entero).
     Requiere autenticación.
     """
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        serializer = UsuarioSerializer(request.user)
-        return Response(serializer.data, status=status.HTTP_200_OK)
\ No newline at end of file
+        # El rol sale del claim del token: no se consulta la tabla de roles
+        return Response(datos_usuario(request, request.user, request.auth), status=status.HTTP_200_OK)
+
+class JWKSView(APIView):
+    """
+    Claves públicas de firma de los JWT (RFC 7517), para que otros
+    servicios validen tokens sin llamar a esta API. Cacheable: las claves
+    nuevas se publican antes de usarse (JWT_CLAVES['PUBLICACION_PREVIA']).
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        response = Response(almacen.jwks(), status=status.HTTP_200_OK)
+        patch_cache_control(response, public=True, max_age=settings.JWT_CLAVES['JWKS_MAX_AGE'])
+        return response